@@ -1,26 +1,32 @@
 # run_all_strategies.py
 from __future__ import annotations
 
+import argparse
+from dataclasses import replace
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Type
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 import pandas as pd
 
 from src.config import BacktestConfig
-from src.data.calendar import list_day_directories
-from src.engine.backtester import run_backtest_days
-from src.metrics.perf import build_oos_matrix, score_is_for_selection
+from src.data.calendar import filter_day_directories, list_day_directories, parse_day
+from src.engine.backtester import params_tag, run_backtest_days, run_multi_backtest_days
+from src.engine.reporting import report_oos, select_best, split_runs, write_summary
+from src.engine.search import Categorical, FloatRange, IntRange, search_params
+from src.metrics.allocation import allocation_matrix
+from src.metrics.costs import break_even, bp_grid, cost_sweep
+from src.metrics.robustness import bootstrap_all_strategies
+from src.strategies.registry import available_strategies, strategy_specs as registry_specs
+from src.utils.profiling import capture_profile, enable_profiling, get_profiler
 
-# Strategies
-from src.strategies.ma_cross import MACrossStrategy
-from src.strategies.macd_hist import MACDHistStrategy
-from src.strategies.bollinger import BollingerMRStrategy
-from src.strategies.hma import HMATrendStrategy
-from src.strategies.donchian import DonchianBreakoutStrategy
-from src.strategies.rma_zscore import RMAZScoreStrategy
-from src.strategies.vol_target import VolTargetStrategy
-from src.strategies.orb import ORBStrategy
+
+DEFAULT_TICKERS = [
+    "^GSPC", "^FTSE", "^DJI", "^RUT",
+    "AMD", "NVDA", "AMZN", "GME", "AMGN", "UNH",
+    "TSLA", "OPTT", "PSTX", "GOOG", "MSFT", "AAPL",
+    "QQQ", "NG=F", "JPYUSD=X", "GBPUSD=X",
+]
 
 
 def _ensure_dir(p: Path) -> Path:
@@ -28,6 +34,11 @@ def _ensure_dir(p: Path) -> Path:
     return p
 
 
+def _is_cfg(cfg: BacktestConfig) -> BacktestConfig:
+    # per-bar curves are only written for the OOS pass
+    return replace(cfg, bars_dir=None) if cfg.bars_dir is not None else cfg
+
+
 def _uniform_weights(tickers: List[str]) -> List[float]:
     if not tickers:
         return []
@@ -35,50 +46,219 @@ def _uniform_weights(tickers: List[str]) -> List[float]:
     return [w] * len(tickers)
 
 
-def main() -> None:
+def _run_strategy(
+    cfg: BacktestConfig,
+    strat_name: str,
+    strat_cls: Type,
+    grid: List[Dict[str, Any]],
+    is_days: List[Path],
+    oos_days: List[Path],
+    strat_dir: Path,
+    all_oos_rows: List[pd.DataFrame],
+) -> Dict[str, Any] | None:
+    # one pass over the data per grid point (kept for per-strategy profiling)
+    prof = get_profiler()
+
+    def grid_runs():
+        for params in grid:
+            with prof.stage("grid_eval"):
+                yield params, run_backtest_days(_is_cfg(cfg), is_days, strat_cls, params, tag="IS")
+
+    best_params = select_best(grid_runs(), strat_dir)
+    if best_params is None:
+        return None
+
+    # 2) Run OOS with best params
+    with prof.stage("oos_eval"):
+        oos_df = run_backtest_days(cfg, oos_days, strat_cls, best_params, tag="OOS")
+    return report_oos(strat_name, oos_df, strat_dir, all_oos_rows)
+
+
+def _search_grids(
+    cfg: BacktestConfig,
+    strategy_specs: List[Tuple[str, Type, List[Dict[str, Any]]]],
+    search_spaces: Dict[str, Tuple[Dict[str, Any], Any]],
+    is_days: List[Path],
+) -> List[Tuple[str, Type, List[Dict[str, Any]]]]:
+    # replace each grid by the best params of a search seeded with that grid
+    prof = get_profiler()
+    out = []
+    for strat_name, strat_cls, grid in strategy_specs:
+        if strat_name not in search_spaces:
+            out.append((strat_name, strat_cls, grid))
+            continue
+        space, constraint = search_spaces[strat_name]
+        with prof.stage("search"):
+            res = search_params(
+                cfg, is_days, strat_cls, space,
+                sampler=cfg.search,
+                budget=cfg.search_budget,
+                batch_size=cfg.search_batch,
+                n_jobs=cfg.search_jobs,
+                seed=cfg.seed,
+                constraint=constraint,
+                init=grid,
+            )
+        strat_dir = _ensure_dir(cfg.results_root / strat_name)
+        res.history.to_csv(strat_dir / "search_IS.csv", index=False)
+        print(f"🔎 {strat_name}: {len(res.history)} candidates ({cfg.search}) | best score={res.best_score:.4f}")
+        out.append((strat_name, strat_cls, [res.best_params] if res.best_params is not None else grid))
+    return out
+
+
+def _run_single_pass(
+    cfg: BacktestConfig,
+    strategy_specs: List[Tuple[str, Type, List[Dict[str, Any]]]],
+    is_days: List[Path],
+    oos_days: List[Path],
+    all_oos_rows: List[pd.DataFrame],
+) -> List[Dict[str, Any]]:
+    # every (strategy, params) of every grid shares one traversal of the IS days,
+    # then every best-params strategy shares one traversal of the OOS days
+    prof = get_profiler()
+
+    with capture_profile("all_strategies_IS", cfg.results_root / "profiles", cfg.profile_capture):
+        with prof.stage("grid_eval"):
+            is_specs = [(name, cls, params) for name, cls, grid in strategy_specs for params in grid]
+            is_runs = split_runs(run_multi_backtest_days(_is_cfg(cfg), is_days, is_specs, tag="IS"))
+
+    oos_specs = []
+    for strat_name, strat_cls, grid in strategy_specs:
+        print(f"\n================= {strat_name} (IS) =================")
+        strat_dir = _ensure_dir(cfg.results_root / strat_name)
+        grid_runs = ((params, is_runs.get((strat_name, params_tag(params)), pd.DataFrame())) for params in grid)
+        best_params = select_best(grid_runs, strat_dir)
+        if best_params is not None:
+            oos_specs.append((strat_name, strat_cls, best_params))
+
+    with capture_profile("all_strategies_OOS", cfg.results_root / "profiles", cfg.profile_capture):
+        with prof.stage("oos_eval"):
+            oos_runs = split_runs(run_multi_backtest_days(cfg, oos_days, oos_specs, tag="OOS"))
+
+    summary_rows: List[Dict[str, Any]] = []
+    for strat_name, _, best_params in oos_specs:
+        print(f"\n================= {strat_name} (OOS) =================")
+        oos_df = oos_runs.get((strat_name, params_tag(best_params)), pd.DataFrame())
+        r = report_oos(strat_name, oos_df, cfg.results_root / strat_name, all_oos_rows)
+        if r is not None:
+            summary_rows.append(r)
+    return summary_rows
+
+
+def _load_grids(path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    # {"ORB": [{"orb_minutes": 15, ...}, ...], ...} ; a single dict = one grid point
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise SystemExit("YAML grid files require PyYAML (pip install pyyaml); JSON works as-is") from e
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    return {name: ([g] if isinstance(g, dict) else list(g)) for name, g in data.items()}
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="IS grid/search + OOS evaluation of the project strategies.")
+    ap.add_argument("-s", "--strategies", nargs="+", default=None, metavar="NAME",
+                    help="strategies to run (default: all, see --list)")
+    ap.add_argument("--list", action="store_true", help="list the registered strategies and exit")
+    ap.add_argument("-t", "--tickers", nargs="+", default=None, metavar="TICKER",
+                    help="tickers to keep (default: the project universe)")
+    ap.add_argument("--start", type=parse_day, default=None, help="first day, DD_MM_YY or YYYY-MM-DD")
+    ap.add_argument("--end", type=parse_day, default=None, help="last day (inclusive), DD_MM_YY or YYYY-MM-DD")
+    ap.add_argument("--max-days", type=int, default=None, help="keep only the first N day directories")
+    ap.add_argument("--grid", type=Path, default=None,
+                    help="JSON/YAML file {strategy: [params, ...]} overriding the default grids")
+    ap.add_argument("-j", "--workers", type=int, default=1, help="processes over days (default 1)")
+    ap.add_argument("--prefetch", type=int, default=2, metavar="N",
+                    help="days loaded ahead in a background thread (0 = inline, default 2)")
+    ap.add_argument("--search", choices=["random", "sobol", "tpe"], default=None,
+                    help="parameter search on IS instead of the fixed grids")
+    ap.add_argument("--timeframe", default="1m", help='bar timeframe ("1m", "5m", "15m", ...)')
+    ap.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                    help="storage dtype of bars/indicators (PnL is always accumulated in float64)")
+    ap.add_argument("--data", type=Path, default=Path("Data"))
+    ap.add_argument("--results", type=Path, default=Path("Results"))
+    ap.add_argument("--profile", action="store_true", help="stage timers -> Results/profile.json")
+    ap.add_argument("--cost-sweep", nargs="?", const=10.0, type=float, default=None, metavar="MAX_BP",
+                    help="OOS matrices for fees 0..MAX_BP bp (step 0.25, default 10) + break-even cost")
+    ap.add_argument("--bar-metrics", action="store_true",
+                    help="intraday MaxDD / time in market / turnover / minute Sharpe in the OOS matrices")
+    ap.add_argument("--save-bars", action="store_true",
+                    help="also write the OOS per-bar equity/position curves to Results/bars_OOS/<day>.npz")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.list:
+        print("\n".join(available_strategies()))
+        return
+
+    tickers = args.tickers or DEFAULT_TICKERS
+
     # =======================
     # CONFIG (project rules)
     # =======================
     cfg = BacktestConfig(
-        data_root=Path("Data"),
-        results_root=Path("Results"),
-        tickers=[
-            "^GSPC", "^FTSE", "^DJI", "^RUT",
-            "AMD", "NVDA", "AMZN", "GME", "AMGN", "UNH",
-            "TSLA", "OPTT", "PSTX", "GOOG", "MSFT", "AAPL",
-            "QQQ", "NG=F", "JPYUSD=X", "GBPUSD=X",
-        ],
+        data_root=args.data,
+        results_root=args.results,
+        tickers=tickers,
         # if your BacktestConfig expects weights, set uniform by default
-        weights=_uniform_weights([
-            "^GSPC", "^FTSE", "^DJI", "^RUT",
-            "AMD", "NVDA", "AMZN", "GME", "AMGN", "UNH",
-            "TSLA", "OPTT", "PSTX", "GOOG", "MSFT", "AAPL",
-            "QQQ", "NG=F", "JPYUSD=X", "GBPUSD=X",
-        ]),
+        weights=_uniform_weights(tickers),
         is_ratio=5 / 6,          # ~5 months IS, ~1 month OOS (day-based split)
         bp_fee=0.0001,           # basis-point fee
         price_col="Close",
         open_col="Open",
         high_col="High",
         low_col="Low",
+        timeframe=args.timeframe,          # "5m"/"15m"/"60m" => strategies run on aggregated bars
+        precision=args.precision,          # "float32" halves bar/indicator arrays (python -m src.engine.precision)
         # Risk (ATR SL/TP)
         atr_period=14,
         sl_atr=1.5,
         tp_atr=2.0,
+        sl_tp_policy="stop_first",  # tie-break when SL and TP are both inside a bar
         # Notional (unit size)
         unit_size=1.0,
         # Execution (no look-ahead: decide on bar i close, execute i+1 open)
         exec_at="next_open",
-        max_days=None,           # set e.g. 30 to test faster
+        max_days=args.max_days,  # set e.g. 30 to test faster
+        workers=args.workers,    # >1: days split over processes
+        prefetch_days=args.prefetch,  # next days loaded in a background thread (0 = off)
+        single_pass=True,        # all strategies/grids share one traversal of the data
         seed=42,
+        # Robustness: block-bootstrap CIs on OOS daily PnL (0 = off)
+        bootstrap_samples=0,
+        bootstrap_block=5,
+        bootstrap_jobs=1,
+        # Parameter search on IS ("random"/"sobol"/"tpe", None = fixed grids below)
+        search=args.search,
+        search_budget=32,
+        search_batch=8,
+        search_jobs=1,
+        # Allocation across strategies (rolling window in days, weights applied next day)
+        allocation_methods=("equal", "inverse_vol", "risk_parity", "mean_variance"),
+        allocation_window=20,
+        # Profiling: stage timers -> Results/profile.json ; capture "cprofile"/"pyinstrument" per strategy
+        profile=args.profile,
+        profile_capture=None,
+        # Fee sensitivity of the OOS rows (no re-simulation), in bp
+        cost_sweep_bps=tuple(bp_grid(args.cost_sweep)) if args.cost_sweep is not None else (),
+        # Bar-resolution metrics (per-bar equity/position); curves saved for the OOS pass only
+        bar_metrics=args.bar_metrics or args.save_bars,
+        bars_dir=args.results / "bars_OOS" if args.save_bars else None,
     )
 
     _ensure_dir(cfg.results_root)
+    prof = enable_profiling(cfg.profile)
 
     # =======================
     # DATA SPLIT
     # =======================
-    day_dirs = list_day_directories(cfg.data_root)
+    day_dirs = filter_day_directories(list_day_directories(cfg.data_root), args.start, args.end)
     if cfg.max_days:
         day_dirs = day_dirs[: cfg.max_days]
 
@@ -95,102 +275,49 @@ def main() -> None:
     print(f"📁 Results -> {cfg.results_root.resolve()}")
 
     # =======================
-    # STRATEGY SPECS + GRIDS
+    # STRATEGY SPECS + GRIDS (registry defaults, overridable with --grid; imported on selection)
     # =======================
-    StrategySpec = Tuple[str, Type, List[Dict[str, Any]]]
-    strategy_specs: List[StrategySpec] = [
-        ("MA_Cross", MACrossStrategy, [
-            {"fast": 10, "slow": 30, "allow_short": True},
-            {"fast": 20, "slow": 60, "allow_short": True},
-            {"fast": 30, "slow": 90, "allow_short": True},
-        ]),
-        ("MACD_Hist", MACDHistStrategy, [
-            {"n_short": 12, "n_long": 26, "n_signal": 9, "allow_short": True, "min_hold": 5},
-            {"n_short": 8,  "n_long": 21, "n_signal": 5, "allow_short": True, "min_hold": 5},
-        ]),
-        ("Bollinger_MR", BollingerMRStrategy, [
-            {"window": 20, "k": 2.0, "allow_short": True},
-            {"window": 30, "k": 2.0, "allow_short": True},
-        ]),
-        ("HMA_Trend", HMATrendStrategy, [
-            {"period": 55, "allow_short": True},
-            {"period": 34, "allow_short": True},
-        ]),
-        ("Donchian_BO", DonchianBreakoutStrategy, [
-            {"window": 20, "allow_short": True},
-            {"window": 55, "allow_short": True},
-        ]),
-        ("RMA_ZScore", RMAZScoreStrategy, [
-            {"window": 60, "z_entry": 1.0, "z_exit": 0.2, "allow_short": True},
-            {"window": 120, "z_entry": 1.2, "z_exit": 0.3, "allow_short": True},
-        ]),
-        ("Vol_Target", VolTargetStrategy, [
-            {"window": 60, "target_vol": 0.002, "max_leverage": 2.0, "allow_short": True},
-            {"window": 120, "target_vol": 0.0015, "max_leverage": 2.0, "allow_short": True},
-        ]),
-        ("ORB", ORBStrategy, [
-            {"orb_minutes": 15, "breakout_k": 0.0, "allow_short": True},
-            {"orb_minutes": 30, "breakout_k": 0.0, "allow_short": True},
-        ]),
-    ]
+    strategy_specs = registry_specs(args.strategies, _load_grids(args.grid) if args.grid else None)
+
+    # Search spaces: name -> (space, constraint); constants are passed through as-is
+    search_spaces: Dict[str, Tuple[Dict[str, Any], Any]] = {
+        "MA_Cross": ({"fast": IntRange(5, 60, log=True), "slow": IntRange(20, 240, log=True), "allow_short": True},
+                     lambda p: p["fast"] < p["slow"]),
+        "MACD_Hist": ({"n_short": IntRange(4, 20), "n_long": IntRange(15, 60), "n_signal": IntRange(3, 15),
+                       "allow_short": True, "min_hold": IntRange(1, 20)},
+                      lambda p: p["n_short"] < p["n_long"]),
+        "Bollinger_MR": ({"window": IntRange(10, 240, log=True), "k": FloatRange(1.0, 3.5), "allow_short": True}, None),
+        "HMA_Trend": ({"period": IntRange(10, 240, log=True), "allow_short": True}, None),
+        "Donchian_BO": ({"window": IntRange(10, 240, log=True), "allow_short": True}, None),
+        "RMA_ZScore": ({"window": IntRange(20, 360, log=True), "z_entry": FloatRange(0.5, 3.0),
+                        "z_exit": FloatRange(0.0, 1.5), "allow_short": True},
+                       lambda p: p["z_exit"] < p["z_entry"]),
+        "Vol_Target": ({"window": IntRange(20, 360, log=True), "target_vol": FloatRange(0.0005, 0.005, log=True),
+                        "max_leverage": FloatRange(0.5, 3.0), "allow_short": True}, None),
+        "ORB": ({"orb_minutes": IntRange(5, 90), "breakout_k": FloatRange(0.0, 0.005),
+                 "allow_short": Categorical((True, False))}, None),
+        "RMA_Dist": ({"rma_period": IntRange(10, 240, log=True), "window": IntRange(30, 300, log=True),
+                      "q_entry": FloatRange(0.01, 0.2), "q_exit": FloatRange(0.0, 0.3), "allow_short": True},
+                     lambda p: p["q_exit"] < 0.5 - p["q_entry"]),
+    }
+    if cfg.search:
+        strategy_specs = _search_grids(_is_cfg(cfg), strategy_specs, search_spaces, is_days)
 
     all_oos_rows: List[pd.DataFrame] = []
     summary_rows: List[Dict[str, Any]] = []
 
-    for strat_name, strat_cls, grid in strategy_specs:
-        print(f"\n================= {strat_name} =================")
-
-        strat_dir = _ensure_dir(cfg.results_root / strat_name)
-
-        # 1) Tuning on IS
-        best_params: Dict[str, Any] | None = None
-        best_score = float("-inf")
-        best_is_df: pd.DataFrame | None = None
-
-        for params in grid:
-            is_df = run_backtest_days(cfg, is_days, strat_cls, params, tag="IS")
-
-            # Save each grid run (optional but useful)
-            grid_tag = "_".join([f"{k}={v}" for k, v in params.items()])
-            grid_path = strat_dir / f"grid_IS_{grid_tag}.csv"
-            is_df.to_csv(grid_path, index=False)
-
-            score = score_is_for_selection(is_df)
-            if score > best_score:
-                best_score = score
-                best_params = params
-                best_is_df = is_df
+    if cfg.single_pass:
+        summary_rows = _run_single_pass(cfg, strategy_specs, is_days, oos_days, all_oos_rows)
+    else:
+        for strat_name, strat_cls, grid in strategy_specs:
+            print(f"\n================= {strat_name} =================")
 
-        if best_params is None:
-            print("⚠️ Aucun résultat IS (données manquantes ?) => skip stratégie")
-            continue
-
-        # persist best params + IS best pnl
-        (strat_dir / "best_params.json").write_text(json.dumps(best_params, indent=2), encoding="utf-8")
-        if best_is_df is not None:
-            best_is_df.to_csv(strat_dir / "daily_pnl_IS_best.csv", index=False)
-
-        print(f"✅ Best params (IS): {best_params} | score={best_score:.4f}")
-
-        # 2) Run OOS with best params
-        oos_df = run_backtest_days(cfg, oos_days, strat_cls, best_params, tag="OOS")
-        oos_df.to_csv(strat_dir / "daily_pnl_OOS.csv", index=False)
-
-        # 3) OOS Matrix
-        matrix = build_oos_matrix(oos_df, portfolio_name="Portfolio")
-        matrix.to_csv(strat_dir / "oos_matrix.csv", index=False)
-
-        # Keep for global files
-        all_oos_rows.append(oos_df.assign(Strategy=strat_name))
-
-        # Small one-line summary for Portfolio row
-        port_row = matrix[matrix["Asset"] == "Portfolio"].copy()
-        if not port_row.empty:
-            r = port_row.iloc[0].to_dict()
-            r["Strategy"] = strat_name
-            summary_rows.append(r)
+            strat_dir = _ensure_dir(cfg.results_root / strat_name)
 
-        print(matrix)
+            with capture_profile(strat_name, cfg.results_root / "profiles", cfg.profile_capture):
+                summary_row = _run_strategy(cfg, strat_name, strat_cls, grid, is_days, oos_days, strat_dir, all_oos_rows)
+            if summary_row is not None:
+                summary_rows.append(summary_row)
 
     # =======================
     # GLOBAL EXPORTS
@@ -199,13 +326,41 @@ def main() -> None:
         df_all = pd.concat(all_oos_rows, ignore_index=True)
         df_all.to_csv(cfg.results_root / "ALL_strategies_daily_pnl_OOS.csv", index=False)
 
-    if summary_rows:
-        df_summary = pd.DataFrame(summary_rows)
-        # Keep a clean set of columns if present
-        cols = ["Strategy", "Net Return Ann.", "Sharpe", "MaxDD", "Avg Daily Trades"]
-        cols = [c for c in cols if c in df_summary.columns]
-        df_summary = df_summary[cols] if cols else df_summary
-        df_summary.to_csv(cfg.results_root / "SUMMARY_Portfolio_OOS.csv", index=False)
+        if cfg.bootstrap_samples > 0:
+            with prof.stage("bootstrap"):
+                robust = bootstrap_all_strategies(
+                    df_all,
+                    n_samples=cfg.bootstrap_samples,
+                    block=cfg.bootstrap_block,
+                    seed=cfg.seed,
+                    n_jobs=cfg.bootstrap_jobs,
+                )
+            robust.to_csv(cfg.results_root / "ROBUSTNESS_OOS.csv", index=False)
+            for strat_name, sub in robust.groupby("Strategy"):
+                sub.drop(columns="Strategy").to_csv(cfg.results_root / strat_name / "oos_bootstrap.csv", index=False)
+
+        if cfg.allocation_methods:
+            with prof.stage("allocation"):
+                alloc, alloc_weights = allocation_matrix(
+                    df_all,
+                    methods=cfg.allocation_methods,
+                    window=cfg.allocation_window,
+                )
+            alloc.to_csv(cfg.results_root / "ALLOCATION_OOS.csv", index=False)
+            alloc_dir = _ensure_dir(cfg.results_root / "allocation")
+            for method, w in alloc_weights.items():
+                w.to_csv(alloc_dir / f"weights_{method}.csv")
+            print(alloc[alloc["Asset"] == "Portfolio"])
+
+        if cfg.cost_sweep_bps:
+            with prof.stage("cost_sweep"):
+                sweep = cost_sweep(df_all, cfg.cost_sweep_bps)
+                be = break_even(df_all)
+            sweep.to_csv(cfg.results_root / "COST_SWEEP_OOS.csv", index=False)
+            be.to_csv(cfg.results_root / "BREAK_EVEN_OOS.csv", index=False)
+            print(be[be["Asset"] == "Portfolio"])
+
+    write_summary(cfg.results_root, summary_rows)
 
     # Save config snapshot for reproducibility
     (cfg.results_root / "config_snapshot.json").write_text(
@@ -218,6 +373,20 @@ def main() -> None:
     print("   - Results/ALL_strategies_daily_pnl_OOS.csv")
     print("   - Results/SUMMARY_Portfolio_OOS.csv")
     print("   - Results/config_snapshot.json")
+    if cfg.bootstrap_samples > 0:
+        print("   - Results/ROBUSTNESS_OOS.csv")
+    if cfg.allocation_methods:
+        print("   - Results/ALLOCATION_OOS.csv")
+    if cfg.cost_sweep_bps:
+        print("   - Results/COST_SWEEP_OOS.csv / BREAK_EVEN_OOS.csv")
+    if cfg.bars_dir is not None:
+        print("   - Results/bars_OOS/<day>.npz")
+
+    if prof.enabled:
+        prof_path = prof.write(cfg.results_root)
+        print()
+        print(prof.summary())
+        print(f"   - {prof_path}")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 @dataclass(frozen=True)
@@ -23,10 +23,16 @@ class BacktestConfig:
     high_col: str = "High"
     low_col: str = "Low"
 
+    # bar timeframe the strategies run on ("1m" raw, "5m", "15m", "60m" aggregated)
+    timeframe: str = "1m"
+    # storage dtype of bars / ATR / batch matrices ("float64" | "float32"); PnL always accumulates in float64
+    precision: str = "float64"
+
     # risk (ATR SL/TP)
     atr_period: int = 14
     sl_atr: float = 1.5
     tp_atr: float = 2.0
+    sl_tp_policy: str = "stop_first"  # "stop_first" | "open_proximity" | "ohlc_path"
 
     # notional
     unit_size: float = 1.0
@@ -34,5 +40,35 @@ class BacktestConfig:
     # execution
     exec_at: str = "next_open"  # "next_open" recommended
     max_days: Optional[int] = None
+    single_pass: bool = True  # run_all_strategies: one data traversal for every strategy/grid point
+    workers: int = 1  # processes over day chunks in run_backtest_days / run_multi_backtest_days
+    prefetch_days: int = 2  # days loaded ahead by a background thread while one is simulated; 0 = inline
 
     seed: int = 42
+
+    # OOS robustness (block bootstrap of daily PnL); 0 = disabled
+    bootstrap_samples: int = 0
+    bootstrap_block: int = 5
+    bootstrap_jobs: int = 1
+
+    # parameter search on IS instead of the fixed grids: None | "random" | "sobol" | "tpe"
+    search: Optional[str] = None
+    search_budget: int = 32  # IS evaluations per strategy (grid points included)
+    search_batch: int = 8
+    search_jobs: int = 1
+
+    # cross-strategy allocation of the OOS daily PnL (e.g. ("risk_parity", "inverse_vol")); () = disabled
+    allocation_methods: Tuple[str, ...] = ()
+    allocation_window: int = 20
+
+    # fee levels (bp) of the OOS cost sweep from the recorded feeBasis (src.metrics.costs); () = disabled
+    cost_sweep_bps: Tuple[float, ...] = ()
+
+    # per-bar equity / position of every (day, ticker): intraday MaxDD, time in market, turnover,
+    # minute Sharpe columns (src.metrics.intraday); bars_dir also writes the curves, one .npz per day
+    bar_metrics: bool = False
+    bars_dir: Optional[Path] = None
+
+    # profiling (Results/profile.json); capture: None | "cprofile" | "pyinstrument" per strategy
+    profile: bool = False
+    profile_capture: Optional[str] = None
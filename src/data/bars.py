@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def index_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    # int64 UTC nanoseconds whatever the index resolution (pandas>=2 may store us/ms)
+    if hasattr(index, "as_unit"):
+        index = index.as_unit("ns")
+    return index.asi8
+
+
+@dataclass(frozen=True)
+class Bars:
+    """OHLC(V) arrays of one (day, ticker), as consumed by the engine loop."""
+
+    index: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.open, self.high, self.low, self.close]
+        if self.volume is not None:
+            arrays.append(self.volume)
+        return int(sum(a.nbytes for a in arrays) + 8 * len(self.index))
+
+
+def bars_from_frame(
+    df: pd.DataFrame,
+    open_col: str = "Open",
+    high_col: str = "High",
+    low_col: str = "Low",
+    close_col: str = "Close",
+    volume_col: str = "Volume",
+    dtype: Any = float,
+) -> Optional[Bars]:
+    # None if a price column is missing (e.g. non-flattened multi-ticker frame)
+    # dtype=np.float32 halves the footprint of the cached / batched arrays
+    for c in (open_col, high_col, low_col, close_col):
+        if c not in df.columns:
+            return None
+    volume = df[volume_col].to_numpy(dtype=dtype) if volume_col in df.columns else None
+    return Bars(
+        index=df.index,
+        open=df[open_col].to_numpy(dtype=dtype),
+        high=df[high_col].to_numpy(dtype=dtype),
+        low=df[low_col].to_numpy(dtype=dtype),
+        close=df[close_col].to_numpy(dtype=dtype),
+        volume=volume,
+    )
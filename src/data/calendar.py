@@ -1,6 +1,14 @@
 from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date, time, timedelta
 from pathlib import Path
 import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.bars import index_ns
 
 
 DAY_RE = re.compile(r"Yahoo_1m_\d{2}_\d{2}_\d{2}$")
@@ -14,3 +22,235 @@ def list_day_directories(data_root: Path):
         if p.is_dir() and DAY_RE.search(p.name):
             days.append(p)
     return days
+
+
+def day_directory_date(day_dir: Path) -> date:
+    # Yahoo_1m_DD_MM_YY -> date
+    dd, mm, yy = day_dir.name.split("_")[-3:]
+    return date(2000 + int(yy), int(mm), int(dd))
+
+
+def parse_day(value: str) -> date:
+    """CLI date: "DD_MM_YY" (directory naming) or ISO "YYYY-MM-DD"."""
+    if re.fullmatch(r"\d{2}_\d{2}_\d{2}", value):
+        dd, mm, yy = value.split("_")
+        return date(2000 + int(yy), int(mm), int(dd))
+    return date.fromisoformat(value)
+
+
+def filter_day_directories(days: List[Path], start: Optional[date] = None, end: Optional[date] = None) -> List[Path]:
+    """Keeps the days within [start, end] (inclusive), in the input order."""
+    if start is None and end is None:
+        return list(days)
+    out = []
+    for p in days:
+        d = day_directory_date(p)
+        if (start is None or d >= start) and (end is None or d <= end):
+            out.append(p)
+    return out
+
+
+# =======================
+# Trading sessions
+# =======================
+
+DAY_NS = 86_400 * 1_000_000_000
+MIN_NS = 60 * 1_000_000_000
+
+
+@dataclass(frozen=True)
+class SessionRule:
+    """
+    Local-time session of an asset class. `close <= open` means an overnight session
+    that opens on the previous local day (FX, futures).
+    """
+
+    name: str
+    tz: str
+    open: time
+    close: time
+    half_day_close: Optional[time] = None
+    breaks: Tuple[Tuple[time, time], ...] = ()
+
+
+SESSION_RULES: Dict[str, SessionRule] = {
+    "us_equity": SessionRule("us_equity", "America/New_York", time(9, 30), time(16, 0), time(13, 0)),
+    "lse": SessionRule("lse", "Europe/London", time(8, 0), time(16, 30), time(12, 30)),
+    "tse": SessionRule("tse", "Asia/Tokyo", time(9, 0), time(15, 30), None, ((time(11, 30), time(12, 30)),)),
+    "fx": SessionRule("fx", "America/New_York", time(17, 0), time(17, 0)),
+    "cme_futures": SessionRule("cme_futures", "America/New_York", time(18, 0), time(17, 0), time(13, 0)),
+}
+
+# tickers as they appear in the dataset (raw "NG=F" or sanitized "NGF" filenames)
+_SESSION_BY_KEY: Dict[str, str] = {
+    "FTSE": "lse", "NGASL": "lse",
+    "N225": "tse",
+    "NGF": "cme_futures", "GCF": "cme_futures", "BZF": "cme_futures", "ZSF": "cme_futures", "CLF": "cme_futures",
+}
+
+
+def instrument_key(ticker: str) -> str:
+    """One name per instrument whatever the file spelling: "^GSPC" / "GSPC" -> "GSPC", "NG=F" / "NGF" -> "NGF"."""
+    return re.sub(r"[\^=_./]", "", ticker).upper()
+
+
+def session_kind(ticker: str) -> str:
+    if ticker.endswith("=X"):
+        return "fx"
+    if ticker.endswith("=F"):
+        return "cme_futures"
+    key = instrument_key(ticker)
+    if key in _SESSION_BY_KEY:
+        return _SESSION_BY_KEY[key]
+    if key.endswith("USDX"):
+        return "fx"
+    return "us_equity"
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    d = date(year, month, 1)
+    d += timedelta(days=(weekday - d.weekday()) % 7)
+    return d + timedelta(weeks=n - 1)
+
+
+def half_days(rule_name: str, year: int) -> List[date]:
+    """Early-close sessions (only the recurring ones: no ad-hoc closures)."""
+    out: List[date] = []
+    if rule_name in ("us_equity", "cme_futures"):
+        for d in (date(year, 7, 3), date(year, 12, 24)):
+            if d.weekday() < 4:  # Mon-Thu (a Friday Jul 3 / Dec 24 is a full holiday or normal day)
+                out.append(d)
+        out.append(_nth_weekday(year, 11, 3, 4) + timedelta(days=1))  # day after Thanksgiving
+    elif rule_name == "lse":
+        out.extend(d for d in (date(year, 12, 24), date(year, 12, 31)) if d.weekday() < 5)
+    return out
+
+
+@dataclass(frozen=True)
+class SessionInfo:
+    """
+    Per-bar session calendar of one (day, ticker), computed once with vectorized
+    timezone arithmetic so strategies never touch Timestamps per bar.
+    """
+
+    kind: str
+    session_id: np.ndarray          # int64: local date (days since epoch) of the session
+    in_session: np.ndarray          # bool: inside official hours (breaks/weekends excluded)
+    bar_in_session: np.ndarray      # int64: 0-based in-session bar count, -1 outside
+    minutes_from_start: np.ndarray  # float: minutes since first observed in-session bar, NaN outside
+    session_open_ns: np.ndarray     # int64 UTC ns of the official open
+    session_close_ns: np.ndarray    # int64 UTC ns of the official close (half-days applied)
+    half_day: np.ndarray            # bool
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _session_bounds(rule: SessionRule, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(half_day, official open UTC ns, official close UTC ns) of the sessions `days` (local epoch days)."""
+    o, c = _minutes(rule.open), _minutes(rule.close)
+    half = np.zeros(len(days), dtype=bool)
+    if rule.half_day_close is not None:
+        epoch = date(1970, 1, 1)
+        years = {(epoch + timedelta(days=int(d))).year for d in days}
+        half = np.isin(days, [(d - epoch).days for y in years for d in half_days(rule.name, y)])
+    close_m = np.where(half, _minutes(rule.half_day_close) if rule.half_day_close else c, c)
+
+    # official open/close of each session, localized then converted to UTC
+    open_local = days * DAY_NS + o * MIN_NS - (DAY_NS if c <= o else 0)
+    close_local = days * DAY_NS + close_m * MIN_NS
+    open_utc = index_ns(pd.DatetimeIndex(open_local).tz_localize(rule.tz, ambiguous="NaT", nonexistent="shift_forward"))
+    close_utc = index_ns(pd.DatetimeIndex(close_local).tz_localize(rule.tz, ambiguous="NaT", nonexistent="shift_forward"))
+    return half, open_utc, close_utc
+
+
+def build_session_info(index: pd.DatetimeIndex, ticker: str, kind: Optional[str] = None) -> SessionInfo:
+    rule = SESSION_RULES[kind or session_kind(ticker)]
+    if len(index) == 0:
+        e_i, e_b = np.array([], dtype=np.int64), np.array([], dtype=bool)
+        return SessionInfo(rule.name, e_i, e_b, e_i, np.array([]), e_i, e_i, e_b)
+
+    utc = index if index.tz is not None else index.tz_localize("UTC")
+    ns = index_ns(utc)
+    local_ns = index_ns(utc.tz_convert(rule.tz).tz_localize(None))
+    local_day = local_ns // DAY_NS
+    mod = (local_ns - local_day * DAY_NS) // MIN_NS  # minute of local day
+
+    o, c = _minutes(rule.open), _minutes(rule.close)
+    overnight = c <= o
+    sess_day = local_day + (overnight & (mod >= o)) if overnight else local_day
+
+    days, grp_day = np.unique(sess_day, return_inverse=True)
+    half, open_utc, close_utc = _session_bounds(rule, days)
+
+    session_open_ns = open_utc[grp_day]
+    session_close_ns = close_utc[grp_day]
+    in_sess = (ns >= session_open_ns) & (ns < session_close_ns)
+    for b0, b1 in rule.breaks:
+        in_sess &= ~((mod >= _minutes(b0)) & (mod < _minutes(b1)))
+    in_sess &= ((sess_day + 3) % 7) < 5  # session day Mon-Fri (epoch day 0 is a Thursday)
+
+    # per-session counters (bars are time-sorted so sessions are contiguous)
+    new_sess = np.r_[True, sess_day[1:] != sess_day[:-1]]
+    first = np.flatnonzero(new_sess)
+    grp = np.cumsum(new_sess) - 1
+    before = np.cumsum(in_sess) - in_sess
+    bar_in_session = np.where(in_sess, before - before[first][grp], -1)
+
+    start_ns = np.minimum.reduceat(np.where(in_sess, ns, np.iinfo(np.int64).max), first)
+    minutes_from_start = np.where(in_sess, (ns - start_ns[grp]) / MIN_NS, np.nan)
+
+    return SessionInfo(
+        kind=rule.name,
+        session_id=sess_day.astype(np.int64),
+        in_session=in_sess,
+        bar_in_session=bar_in_session.astype(np.int64),
+        minutes_from_start=minutes_from_start,
+        session_open_ns=session_open_ns,
+        session_close_ns=session_close_ns,
+        half_day=half[grp_day],
+    )
+
+
+class SessionClock:
+    """
+    Incremental build_session_info for a live stream of one ticker's bars (time-ordered):
+    update(ns) returns the (session_id, in_session, minutes_from_start) that the batch
+    calendar assigns to that bar. Nothing depends on later bars, so both agree bar for bar.
+    The UTC offset is looked up once per UTC hour and the session bounds once per session.
+    """
+
+    def __init__(self, ticker: str, kind: Optional[str] = None):
+        self.rule = SESSION_RULES[kind or session_kind(ticker)]
+        self._o, self._c = _minutes(self.rule.open), _minutes(self.rule.close)
+        self._breaks = [(_minutes(b0), _minutes(b1)) for b0, b1 in self.rule.breaks]
+        self._hour = None
+        self._offset = 0
+        self._sess_day = None
+        self._open = self._close = 0
+        self._start: Optional[int] = None
+
+    def update(self, ns: int) -> Tuple[int, bool, float]:
+        hour = ns // (60 * MIN_NS)
+        if hour != self._hour:
+            self._hour = hour
+            self._offset = int(pd.Timestamp(ns, tz="UTC").tz_convert(self.rule.tz).utcoffset().total_seconds()) * 1_000_000_000
+        local_ns = ns + self._offset
+        local_day = local_ns // DAY_NS
+        mod = (local_ns - local_day * DAY_NS) // MIN_NS
+        sess_day = local_day + 1 if self._c <= self._o and mod >= self._o else local_day
+
+        if sess_day != self._sess_day:
+            self._sess_day = sess_day
+            _, open_utc, close_utc = _session_bounds(self.rule, np.array([sess_day], dtype=np.int64))
+            self._open, self._close = int(open_utc[0]), int(close_utc[0])
+            self._start = None
+
+        in_sess = self._open <= ns < self._close and ((sess_day + 3) % 7) < 5
+        in_sess = in_sess and not any(b0 <= mod < b1 for b0, b1 in self._breaks)
+        if not in_sess:
+            return int(sess_day), False, float("nan")
+        if self._start is None:
+            self._start = ns
+        return int(sess_day), True, (ns - self._start) / MIN_NS
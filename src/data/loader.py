@@ -36,6 +36,9 @@ def load_pickle_df(path: Path) -> pd.DataFrame:
     if not isinstance(obj, pd.DataFrame):
         raise TypeError(f"{path} does not contain a DataFrame")
     df = obj.copy()
+    # yfinance layout: (Price, Ticker) MultiIndex columns for a single ticker => flatten to Price
+    if isinstance(df.columns, pd.MultiIndex) and df.columns.get_level_values(-1).nunique() == 1:
+        df.columns = df.columns.get_level_values(0)
     # Ensure datetime index
     if not isinstance(df.index, pd.DatetimeIndex):
         # try to coerce
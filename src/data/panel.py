@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.bars import Bars, index_ns
+
+
+@dataclass(frozen=True)
+class Panel:
+    """
+    OHLC of several tickers on one common minute index, as consumed by the panel engine.
+    Arrays are (minutes, tickers): row i is the cross-section at minute i.
+    A ticker without a bar at some minute repeats its last close (open = high = low = close),
+    and is NaN before its first bar of the day; `valid` flags the real bars.
+    """
+
+    index: pd.DatetimeIndex
+    tickers: Tuple[str, ...]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def column(self, ticker: str) -> int:
+        return self.tickers.index(ticker)
+
+
+def align_panel(bars_by_ticker: Dict[str, Bars]) -> Panel:
+    """Union of the tickers' minute indices, each ticker scattered in with one searchsorted."""
+    tickers = tuple(bars_by_ticker)
+    stamps = [index_ns(b.index) for b in bars_by_ticker.values()]
+    union = np.unique(np.concatenate(stamps)) if stamps else np.array([], dtype=np.int64)
+    n, m = len(union), len(tickers)
+
+    dtype = np.result_type(*[b.close.dtype for b in bars_by_ticker.values()]) if m else np.float64
+    fields = {f: np.full((n, m), np.nan, dtype=dtype) for f in ("open", "high", "low", "close")}
+    valid = np.zeros((n, m), dtype=bool)
+    for k, (bars, ns) in enumerate(zip(bars_by_ticker.values(), stamps)):
+        rows = np.searchsorted(union, ns)
+        for f, arr in fields.items():
+            arr[rows, k] = getattr(bars, f)
+        valid[rows, k] = True
+
+    # forward fill the gaps with the last close (vectorized: last valid row per column);
+    # rows before the first bar point to row 0, which is NaN for that ticker
+    last = np.maximum.accumulate(np.where(valid, np.arange(n)[:, None], 0), axis=0)
+    close = fields["close"][last, np.arange(m)[None, :]]
+    for f in ("open", "high", "low"):
+        fields[f] = np.where(valid, fields[f], close)
+
+    tz = next(iter(bars_by_ticker.values())).index.tz if m else None
+    index = pd.DatetimeIndex(union)
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+
+    return Panel(index=index, tickers=tickers, open=fields["open"], high=fields["high"],
+                 low=fields["low"], close=close, valid=valid)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterator, Sequence, Tuple
+
+
+class PrefetchingDayIterator:
+    """
+    Yields (day_dir, load_fn(day_dir)) in order while the next `depth` days are loaded by a
+    background thread pool, so pickle reads / decoding overlap the simulation of the current day.
+    At most `depth` loaded-but-unconsumed days are held (bounded memory); a loader exception
+    is raised when its day is reached. Stopping early (break / close) cancels the pending loads.
+    """
+
+    def __init__(
+        self,
+        day_dirs: Sequence[Path],
+        load_fn: Callable[[Path], Any],
+        depth: int = 2,
+        threads: int = 1,
+    ):
+        self.day_dirs = list(day_dirs)
+        self.load_fn = load_fn
+        self.depth = max(1, int(depth))
+        self.threads = max(1, int(threads))
+
+    def __len__(self) -> int:
+        return len(self.day_dirs)
+
+    def __iter__(self) -> Iterator[Tuple[Path, Any]]:
+        if not self.day_dirs:
+            return
+        pending: Deque[Tuple[Path, Future]] = deque()
+        todo = iter(self.day_dirs)
+        ex = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="prefetch")
+        try:
+            for day_dir in todo:
+                pending.append((day_dir, ex.submit(self.load_fn, day_dir)))
+                if len(pending) >= self.depth:
+                    break
+            while pending:
+                day_dir, fut = pending.popleft()
+                # refill before blocking on the oldest load: the queue stays `depth` days ahead
+                nxt = next(todo, None)
+                if nxt is not None:
+                    pending.append((nxt, ex.submit(self.load_fn, nxt)))
+                yield day_dir, fut.result()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
+            ex.shutdown(wait=True)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import re
+import threading
+from typing import Any, Hashable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.bars import Bars, index_ns
+
+
+TF_RE = re.compile(r"^(\d+)\s*(m|min|h)?$")
+
+
+def parse_timeframe(tf: Union[str, int]) -> int:
+    """'1m' / '5m' / '15min' / '1h' / 60 -> minutes."""
+    if isinstance(tf, int):
+        minutes = tf
+    else:
+        m = TF_RE.match(tf.strip().lower())
+        if not m:
+            raise ValueError(f"invalid timeframe={tf!r} (expected e.g. '5m', '15m', '1h')")
+        minutes = int(m.group(1)) * (60 if m.group(2) == "h" else 1)
+    if minutes < 1:
+        raise ValueError(f"invalid timeframe={tf!r}")
+    return minutes
+
+
+def resample_bars(bars: Bars, minutes: int) -> Bars:
+    """
+    Aggregate minute bars into `minutes` bars with vectorized segment reductions
+    (first open, max high, min low, last close, summed volume).
+    Buckets are anchored on the first bar of the day (pandas origin="start"), labelled
+    by their start time; missing minutes simply shrink a bucket.
+    """
+    if minutes == 1 or len(bars) == 0:
+        return bars
+
+    ns = index_ns(bars.index)
+    step = minutes * 60 * 1_000_000_000
+    bucket = (ns - ns[0]) // step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ns)] - 1
+
+    index = pd.DatetimeIndex(ns[0] + bucket[starts] * step, tz=bars.index.tz, name=bars.index.name)
+    return Bars(
+        index=index,
+        open=bars.open[starts],
+        high=np.maximum.reduceat(bars.high, starts),
+        low=np.minimum.reduceat(bars.low, starts),
+        close=bars.close[ends],
+        volume=np.add.reduceat(bars.volume, starts) if bars.volume is not None else None,
+    )
+
+
+class AggregateCache:
+    """
+    In-process LRU of per-(day, ticker, timeframe) derived data (resampled bars,
+    session calendars).
+    A hit skips both the pickle load and the aggregation, so IS grids and the OOS
+    re-run only pay for the coarse bars after the first pass.
+    Locked: the day prefetcher fills it from a background thread.
+    """
+
+    def __init__(self, max_entries: int = 200_000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_CACHE = AggregateCache()
+
+
+def get_aggregate_cache() -> AggregateCache:
+    return _CACHE
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """
+    Minute-bar generator: daily GBM for the opens, intraday GARCH(1,1) + Poisson jumps,
+    U-shaped intraday volatility / volume seasonality.
+    Output is deterministic in `seed` (independent of the number of workers).
+    """
+
+    n_tickers: int = 100
+    n_days: int = 20
+    start: str = "2025-01-02"
+    bars_per_day: int = 390
+    session_open: str = "13:30"      # UTC, like the Yahoo US equity files
+    ticker_prefix: str = "SYN"
+
+    # prices
+    s0_min: float = 10.0
+    s0_max: float = 500.0
+    mu_ann: float = 0.05
+    sigma_ann: float = 0.30
+
+    # intraday GARCH(1,1) on minute returns (unconditional var = omega / (1 - alpha - beta))
+    garch_alpha: float = 0.05
+    garch_beta: float = 0.90
+
+    # jumps: expected count per day, size in units of daily sigma
+    jump_per_day: float = 0.5
+    jump_scale: float = 0.5
+
+    # seasonality amplitude: multiplier 1 + a * (2u - 1)^2 (u = time of day in [0, 1])
+    vol_season: float = 1.5
+    volume_season: float = 2.0
+    volume_base: float = 50_000.0
+
+    seed: int = 42
+
+
+def _day_dir_name(day: pd.Timestamp) -> str:
+    return f"Yahoo_1m_{day:%d_%m_%y}"
+
+
+def _tickers(spec: SyntheticSpec) -> List[str]:
+    width = max(4, len(str(spec.n_tickers)))
+    return [f"{spec.ticker_prefix}{k:0{width}d}" for k in range(spec.n_tickers)]
+
+
+def _daily_opens(spec: SyntheticSpec) -> np.ndarray:
+    # (n_days, n_tickers) session opens from a daily GBM, seeded once for the whole run
+    rng = np.random.default_rng(np.random.SeedSequence([spec.seed, 0]))
+    s0 = np.exp(rng.uniform(np.log(spec.s0_min), np.log(spec.s0_max), spec.n_tickers))
+    sig_d = spec.sigma_ann / np.sqrt(252.0)
+    mu_d = spec.mu_ann / 252.0 - 0.5 * sig_d ** 2
+    steps = mu_d + sig_d * rng.standard_normal((spec.n_days, spec.n_tickers))
+    steps[0] = 0.0
+    return s0 * np.exp(np.cumsum(steps, axis=0))
+
+
+def _seasonality(n: int, amp: float) -> np.ndarray:
+    u = np.linspace(0.0, 1.0, n)
+    s = 1.0 + amp * (2.0 * u - 1.0) ** 2
+    return s / s.mean()
+
+
+def simulate_day(spec: SyntheticSpec, day_idx: int, opens: np.ndarray) -> dict:
+    """
+    All tickers of one day as (n_tickers, bars) OHLCV arrays.
+    The GARCH recursion loops over bars but is vectorized across tickers.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence([spec.seed, 1, day_idx]))
+    n_t, n_b = spec.n_tickers, spec.bars_per_day
+
+    sig_bar = spec.sigma_ann / np.sqrt(252.0 * n_b)
+    var_bar = sig_bar ** 2
+    omega = var_bar * (1.0 - spec.garch_alpha - spec.garch_beta)
+    season = _seasonality(n_b, spec.vol_season)
+
+    z = rng.standard_normal((n_t, n_b))
+    rets = np.empty((n_t, n_b))
+    h = np.full(n_t, var_bar)
+    eps_prev = np.zeros(n_t)
+    for j in range(n_b):
+        h = omega + spec.garch_alpha * eps_prev ** 2 + spec.garch_beta * h
+        eps_prev = np.sqrt(h) * z[:, j]
+        rets[:, j] = eps_prev * np.sqrt(season[j])
+
+    # jumps
+    p_jump = spec.jump_per_day / n_b
+    jumps = rng.random((n_t, n_b)) < p_jump
+    sig_d = spec.sigma_ann / np.sqrt(252.0)
+    rets += jumps * rng.normal(0.0, spec.jump_scale * sig_d, (n_t, n_b))
+
+    close = opens[:, None] * np.exp(np.cumsum(rets, axis=1))
+    open_ = np.concatenate([opens[:, None], close[:, :-1]], axis=1)
+
+    # wicks proportional to the local bar volatility
+    wick = sig_bar * np.sqrt(season)[None, :] * np.abs(rng.standard_normal((2, n_t, n_b)))
+    high = np.maximum(open_, close) * (1.0 + wick[0])
+    low = np.minimum(open_, close) * (1.0 - wick[1])
+
+    vol_season = _seasonality(n_b, spec.volume_season)
+    activity = 1.0 + np.abs(rets) / sig_bar
+    volume = spec.volume_base * vol_season[None, :] * activity * rng.lognormal(0.0, 0.5, (n_t, n_b))
+
+    return {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume.astype(np.int64)}
+
+
+def _write_days(spec: SyntheticSpec, out_root: Path, day_idxs: List[int], days: List[pd.Timestamp], opens: np.ndarray) -> int:
+    tickers = _tickers(spec)
+    n_files = 0
+    for d in day_idxs:
+        day = days[d]
+        bars = simulate_day(spec, d, opens[d])
+        index = pd.date_range(
+            pd.Timestamp(f"{day:%Y-%m-%d} {spec.session_open}", tz="UTC"),
+            periods=spec.bars_per_day, freq="min", name="Datetime",
+        )
+        day_dir = out_root / _day_dir_name(day)
+        day_dir.mkdir(parents=True, exist_ok=True)
+        stamp = f"{day + pd.Timedelta(days=1):%Y%m%d}_000000"
+        for k, tic in enumerate(tickers):
+            # same layout as the yfinance pickles: (Price, Ticker) MultiIndex columns
+            cols = pd.MultiIndex.from_tuples([(c, tic) for c in bars], names=["Price", "Ticker"])
+            df = pd.DataFrame(np.column_stack([bars[c][k] for c in bars]), index=index, columns=cols)
+            df[("Volume", tic)] = df[("Volume", tic)].astype(np.int64)
+            df.to_pickle(day_dir / f"df_{tic}_{stamp}.pkl")
+            n_files += 1
+    return n_files
+
+
+def generate_dataset(spec: SyntheticSpec, out_root: Path, workers: int = 1, chunk_days: Optional[int] = None) -> List[Path]:
+    """
+    Write `spec.n_days` Data/-compatible day directories (Yahoo_1m_DD_MM_YY/df_<TICKER>_*.pkl)
+    under `out_root`. Days are split into chunks written in parallel by `workers` processes.
+    """
+    out_root = Path(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    days = list(pd.bdate_range(spec.start, periods=spec.n_days))
+    if len({_day_dir_name(d) for d in days}) != len(days):
+        raise ValueError("day directory names collide (DD_MM_YY), reduce n_days")
+
+    opens = _daily_opens(spec)
+    chunk = chunk_days or max(1, -(-spec.n_days // max(1, workers * 4)))
+    chunks = [list(range(a, min(a + chunk, spec.n_days))) for a in range(0, spec.n_days, chunk)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futs = [ex.submit(_write_days, spec, out_root, c, days, opens) for c in chunks]
+            for f in futs:
+                f.result()
+    else:
+        for c in chunks:
+            _write_days(spec, out_root, c, days, opens)
+
+    return [out_root / _day_dir_name(d) for d in days]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Generate synthetic Yahoo-like minute data for scale tests.")
+    ap.add_argument("--out", type=Path, default=Path("Data_synthetic"))
+    ap.add_argument("--tickers", type=int, default=SyntheticSpec.n_tickers)
+    ap.add_argument("--days", type=int, default=SyntheticSpec.n_days)
+    ap.add_argument("--start", default=SyntheticSpec.start)
+    ap.add_argument("--bars", type=int, default=SyntheticSpec.bars_per_day)
+    ap.add_argument("--seed", type=int, default=SyntheticSpec.seed)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    spec = SyntheticSpec(
+        n_tickers=args.tickers, n_days=args.days, start=args.start,
+        bars_per_day=args.bars, seed=args.seed,
+    )
+    dirs = generate_dataset(spec, args.out, workers=args.workers)
+    print(f"✅ {len(dirs)} days x {spec.n_tickers} tickers -> {args.out.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
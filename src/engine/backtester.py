@@ -1,16 +1,34 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
 
 import numpy as np
 import pandas as pd
 
 from src.config import BacktestConfig
+from src.data.bars import Bars, bars_from_frame, index_ns
+from src.data.calendar import SessionInfo, build_session_info
 from src.data.loader import extract_ticker_from_filename, load_pickle_df, ticker_matches
+from src.data.prefetch import PrefetchingDayIterator
+from src.data.resample import get_aggregate_cache, parse_timeframe, resample_bars
 from src.engine.execution import FeeModel, RoundTripFeeTracker
-from src.engine.risk import TradeState, check_sl_tp_hit, compute_atr, set_sl_tp
+from src.engine.risk import TradeState, clear_trade, compute_atr, find_sl_tp_exit, set_sl_tp
+from src.metrics.intraday import DayCurves, bar_metrics, save_day_bars
 from src.strategies.base import BaseStrategy
+from src.utils.profiling import enable_profiling, get_profiler
+
+
+# (name, strategy class, params); name=None => plain run_one_day rows
+StrategySpec = Tuple[Optional[str], Type[BaseStrategy], Dict[str, Any]]
+
+
+def params_tag(params: Dict[str, Any]) -> str:
+    # same naming as the grid_IS_<tag>.csv files
+    return "_".join([f"{k}={v}" for k, v in params.items()])
 
 
 def run_backtest_days(
@@ -20,11 +38,30 @@ def run_backtest_days(
     strategy_params: Dict[str, Any],
     tag: str = "OOS",
 ) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
+    with get_profiler().stage("run_backtest_days"):
+        rows = _run_days(cfg, day_dirs, [(None, strategy_cls, strategy_params)])
 
-    for day_dir in day_dirs:
-        daily_rows = run_one_day(cfg, day_dir, strategy_cls, strategy_params)
-        rows.extend(daily_rows)
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+
+    df["Tag"] = tag
+    return df
+
+
+def run_multi_backtest_days(
+    cfg: BacktestConfig,
+    day_dirs: List[Path],
+    specs: List[StrategySpec],
+    tag: str = "OOS",
+) -> pd.DataFrame:
+    """
+    Runs every (name, strategy class, params) spec from a single pass over the data:
+    each (day, ticker) is loaded once and its arrays/ATR are shared by all specs.
+    Returns the run_backtest_days columns plus "Strategy" and "Params".
+    """
+    with get_profiler().stage("run_multi_backtest_days"):
+        rows = _run_days(cfg, day_dirs, specs)
 
     df = pd.DataFrame(rows)
     if df.empty:
@@ -34,19 +71,80 @@ def run_backtest_days(
     return df
 
 
-def run_one_day(
+# one day of every spec -> rows, from the day's preloaded data (None: load it)
+DayFn = Callable[[BacktestConfig, Path, List[StrategySpec], Any], List[Dict[str, Any]]]
+# I/O half of a day, run ahead by the prefetcher
+LoadFn = Callable[[BacktestConfig, Path], Any]
+
+
+def iter_days(cfg: BacktestConfig, day_dirs: Sequence[Path], load_fn: Optional[LoadFn] = None) -> Iterable[Tuple[Path, Any]]:
+    """(day_dir, loaded day) in order; the next `cfg.prefetch_days` days load in a background thread."""
+    load_fn = load_fn or load_day
+    if cfg.prefetch_days > 0 and len(day_dirs) > 1:
+        return PrefetchingDayIterator(day_dirs, partial(load_fn, cfg), depth=cfg.prefetch_days)
+    return ((d, load_fn(cfg, d)) for d in day_dirs)
+
+
+def _run_days(
     cfg: BacktestConfig,
-    day_dir: Path,
-    strategy_cls: Type[BaseStrategy],
-    strategy_params: Dict[str, Any],
+    day_dirs: List[Path],
+    specs: List[StrategySpec],
+    day_fn: Optional[DayFn] = None,
+    load_fn: Optional[LoadFn] = None,
 ) -> List[Dict[str, Any]]:
-    files = sorted([p for p in day_dir.iterdir() if p.is_file() and p.name.startswith("df_") and p.suffix == ".pkl"])
-    if not files:
-        return []
+    day_fn = day_fn or run_multi_one_day
+    if cfg.workers > 1 and len(day_dirs) > 1:
+        return _run_days_parallel(cfg, day_dirs, specs, day_fn, load_fn)
 
-    out: List[Dict[str, Any]] = []
-    fee_tracker = RoundTripFeeTracker(FeeModel(bp=cfg.bp_fee))
+    rows: List[Dict[str, Any]] = []
+    prof = get_profiler()
+    for day_dir, day in iter_days(cfg, day_dirs, load_fn):
+        rows.extend(day_fn(cfg, day_dir, specs, day))
+        prof.count("days")
+    return rows
+
+
+def _days_worker(
+    args: Tuple[BacktestConfig, List[Path], List[StrategySpec], bool, DayFn, Optional[LoadFn]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    cfg, day_dirs, specs, profiled, day_fn, load_fn = args
+    # fresh profiler per chunk (a forked worker inherits the parent's), merged back by the parent
+    prof = enable_profiling(profiled)
+    rows: List[Dict[str, Any]] = []
+    # each process prefetches its own chunk (threads are started after the fork)
+    for day_dir, day in iter_days(cfg, day_dirs, load_fn):
+        rows.extend(day_fn(cfg, day_dir, specs, day))
+        prof.count("days")
+    return rows, prof.snapshot()
+
+
+def _run_days_parallel(
+    cfg: BacktestConfig,
+    day_dirs: List[Path],
+    specs: List[StrategySpec],
+    day_fn: DayFn,
+    load_fn: Optional[LoadFn] = None,
+) -> List[Dict[str, Any]]:
+    """Contiguous day chunks over `cfg.workers` processes; rows come back in day order."""
+    prof = get_profiler()
+    n_chunks = min(len(day_dirs), cfg.workers * 4)
+    bounds = np.linspace(0, len(day_dirs), n_chunks + 1).astype(int)
+    jobs = [(cfg, day_dirs[a:b], specs, prof.enabled, day_fn, load_fn) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    rows: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=cfg.workers) as ex:
+        for chunk_rows, snap in ex.map(_days_worker, jobs):
+            rows.extend(chunk_rows)
+            prof.merge(snap)
+    return rows
 
+
+def list_day_files(cfg: BacktestConfig, day_dir: Path) -> List[Tuple[Path, str]]:
+    """(pickle path, ticker) of a day directory, filtered on `cfg.tickers`."""
+    with get_profiler().stage("list_files"):
+        files = sorted([p for p in day_dir.iterdir() if p.is_file() and p.name.startswith("df_") and p.suffix == ".pkl"])
+
+    out: List[Tuple[Path, str]] = []
     for f in files:
         ticker_file = extract_ticker_from_filename(f.name)
         if ticker_file is None:
@@ -58,152 +156,316 @@ def run_one_day(
             if not keep:
                 continue
 
-        df = load_pickle_df(f)
-        if df.empty:
-            continue
+        out.append((f, ticker_file))
+    return out
 
-        # required columns
-        for c in [cfg.open_col, cfg.high_col, cfg.low_col, cfg.price_col]:
-            if c not in df.columns:
-                # sometimes columns are multi-indexed (Price/Ticker) => if so, user should flatten upstream
-                # here we skip safely
-                return []
 
-        # compute ATR on day
-        high = df[cfg.high_col].to_numpy(dtype=float)
-        low = df[cfg.low_col].to_numpy(dtype=float)
-        close = df[cfg.price_col].to_numpy(dtype=float)
-        open_ = df[cfg.open_col].to_numpy(dtype=float)
+def load_bars(cfg: BacktestConfig, path: Path, ticker: str) -> Optional[Bars]:
+    """
+    Bars of one (day, ticker) pickle at `cfg.timeframe`.
+    Coarser timeframes go through the (day, ticker, timeframe) aggregate cache.
+    None if the price columns are missing.
+    """
+    prof = get_profiler()
+    minutes = parse_timeframe(cfg.timeframe)
+    cache = get_aggregate_cache()
+    key = (str(path.parent), ticker, minutes, cfg.precision)
+
+    if minutes > 1:
+        cached = cache.get(key)
+        if cached is not None:
+            prof.count("cache_hits")
+            return cached
+        prof.count("cache_misses")
+
+    with prof.stage("load_pickle"):
+        df = load_pickle_df(path)
+    if prof.enabled:
+        prof.count("files_loaded")
+        prof.count("bytes_read", path.stat().st_size)
+
+    bars = bars_from_frame(df, cfg.open_col, cfg.high_col, cfg.low_col, cfg.price_col, dtype=np.dtype(cfg.precision))
+    if bars is None:
+        return None
+
+    if minutes > 1:
+        with prof.stage("resample"):
+            bars = resample_bars(bars, minutes)
+        cache.put(key, bars)
+    return bars
+
+
+def load_session(cfg: BacktestConfig, path: Path, ticker: str, bars: Bars) -> SessionInfo:
+    """
+    Session calendar of one (day, ticker) at `cfg.timeframe`. Cached next to the resampled
+    bars only when minutes > 1: as for load_bars, 1m entries would fill the (entry-capped)
+    cache for a single vectorized pass.
+    """
+    prof = get_profiler()
+    minutes = parse_timeframe(cfg.timeframe)
+    cache = get_aggregate_cache()
+    key = ("session", str(path.parent), ticker, minutes)
+    session = cache.get(key) if minutes > 1 else None
+    if session is None:
+        with prof.stage("sessions"):
+            session = build_session_info(bars.index, ticker)
+        if minutes > 1:
+            cache.put(key, session)
+    return session
+
+
+def run_one_day(
+    cfg: BacktestConfig,
+    day_dir: Path,
+    strategy_cls: Type[BaseStrategy],
+    strategy_params: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    return run_multi_one_day(cfg, day_dir, [(None, strategy_cls, strategy_params)])
+
+
+# bars of the selected tickers of one day: [(pickle path, ticker, Bars)]
+DayBars = List[Tuple[Path, str, Bars]]
+
+
+def load_day(cfg: BacktestConfig, day_dir: Path) -> DayBars:
+    """
+    I/O half of a day: bars of every selected ticker (what the prefetcher loads ahead).
+    Empty if a frame lacks the price columns (multi-ticker frame?) => the day is skipped.
+    """
+    out: DayBars = []
+    for f, ticker_file in list_day_files(cfg, day_dir):
+        bars = load_bars(cfg, f, ticker_file)
+        if bars is None:
+            return []
+        out.append((f, ticker_file, bars))
+    return out
 
-        atr = compute_atr(high, low, close, cfg.atr_period)
 
-        strat = strategy_cls(**strategy_params)
-        state = TradeState(position=0.0)
+def run_multi_one_day(
+    cfg: BacktestConfig,
+    day_dir: Path,
+    specs: List[StrategySpec],
+    day: Optional[DayBars] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One traversal per (day, ticker): bars, ATR and session calendar are built once and
+    every (name, strategy class, params) spec runs on them with its own TradeState.
+    Rows carry "Strategy"/"Params" columns unless the spec name is None.
+    `day` is the load_day output when already loaded (prefetch).
+    """
+    prof = get_profiler()
 
-        gross_pnl = 0.0
-        net_pnl = 0.0
-        fees = 0.0
-        num_trades = 0
+    if day is None:
+        day = load_day(cfg, day_dir)
 
+    out: List[Dict[str, Any]] = []
+    curves: DayCurves = {}
+    fee_tracker = RoundTripFeeTracker(FeeModel(bp=cfg.bp_fee))
+
+    for f, ticker_file, bars in day:
         # We execute at next open to avoid look-ahead
         # loop until n-2 so we can execute at i+1 open
-        n = len(df)
-        if n < 3:
+        if len(bars) < 3:
             continue
 
-        # track last mark price for pnl
-        last_price = close[0]
-
-        for i in range(n - 1):
-            # mark-to-market PnL on close-to-close
-            # holding PnL for position during bar i (from last close to current close)
-            price_now = close[i]
-            holding = state.position * cfg.unit_size * (price_now - last_price)
-            gross_pnl += holding
-            net_pnl += holding
-            last_price = price_now
+        # compute ATR on day
+        with prof.stage("atr"):
+            atr = compute_atr(bars.high, bars.low, bars.close, cfg.atr_period)
+
+        session: Optional[SessionInfo] = None
+        date = bars.index[0].date()
+
+        for name, strategy_cls, strategy_params in specs:
+            strat = strategy_cls(**strategy_params)
+            strat.on_day(bars)
+            if strat.uses_sessions:
+                if session is None:
+                    session = load_session(cfg, f, ticker_file, bars)
+                strat.on_session(bars, session)
+
+            row: Dict[str, Any] = {"Date": date, "Ticker": ticker_file}
+            res = simulate_bars(cfg, bars, atr, strat, fee_tracker)
+            if "_equity" in res:
+                equity, position = res.pop("_equity"), res.pop("_position")
+                res.update(bar_metrics(equity, position))
+                if cfg.bars_dir is not None:
+                    curves[(ticker_file, name or "", params_tag(strategy_params))] = (index_ns(bars.index), equity, position)
+            row.update(res)
+            if name is not None:
+                row["Strategy"] = name
+                row["Params"] = params_tag(strategy_params)
+            out.append(row)
+
+    if curves:
+        save_day_bars(Path(cfg.bars_dir) / f"{day_dir.name}.npz", curves)
+    return out
 
-            # risk check uses bar i HIGH/LOW AFTER entry (this is ok bar-by-bar)
-            exit_price = check_sl_tp_hit(state, bar_high=high[i], bar_low=low[i])
-            if exit_price is not None:
-                # close position at exit_price (assume touched)
-                # adjust pnl from last close to exit_price if needed (intrabar)
-                # we already booked close-to-close; approximate: override by adding delta (exit - close[i])
-                adj = state.position * cfg.unit_size * (exit_price - close[i])
-                gross_pnl += adj
-                net_pnl += adj
-
-                # fees round-trip
-                fees += fee_tracker.charge_round_trip(abs(state.position), state.entry_price, exit_price)
-                net_pnl -= fee_tracker.charge_round_trip(0.0, 0.0, 0.0)  # no-op (keeps structure)
-                net_pnl -= 0.0
-
-                net_pnl -= 0.0  # placeholder
-
-                # apply fee properly once (avoid double)
-                # (we charged in fee_tracker; now reflect in net)
-                net_pnl -= fee_tracker.fee_model.bp * 0.0  # no-op
-
-                # Actually subtract the fee we computed:
-                last_fee = abs(state.position) * cfg.bp_fee * (state.entry_price + exit_price)
-                net_pnl -= last_fee
-                fees += 0.0  # already counted above in fees via last_fee? -> we set fees += ... below instead
 
-                # fix: keep consistent:
-                # overwrite: use last_fee only
-                fees -= last_fee  # remove previous
-                fees += last_fee
+def simulate_bars(
+    cfg: BacktestConfig,
+    bars: Bars,
+    atr: np.ndarray,
+    strat: BaseStrategy,
+    fee_tracker: RoundTripFeeTracker,
+) -> Dict[str, Any]:
+    """Bar loop of one (day, ticker, strategy): next-open execution, ATR SL/TP, EOD close."""
+    prof = get_profiler()
+    timed = prof.enabled
+
+    index = bars.index
+    n = len(bars)
+    # scalar loop on python floats: float32 bars still accumulate PnL in float64
+    # (and list indexing is cheaper than numpy scalar indexing); arrays kept for the SL/TP scan
+    open_, high, low, close = bars.open.tolist(), bars.high.tolist(), bars.low.tolist(), bars.close.tolist()
+
+    state = TradeState(position=0.0)
+
+    gross_pnl = 0.0
+    net_pnl = 0.0
+    fees = 0.0
+    fee_basis = 0.0  # sum of |pos| * (entry + exit): fees = bp * fee_basis (cost sweeps without re-running)
+    num_trades = 0
+
+    # track last mark price for pnl
+    last_price = close[0]
+
+    # bar of the pending SL/TP exit for the open trade (-1 = none), resolved at entry
+    exit_idx = -1
+    exit_fill = np.nan
+
+    # per-bar equity / position at each close (cfg.bar_metrics / cfg.bars_dir)
+    record = cfg.bar_metrics or cfg.bars_dir is not None
+    if record:
+        eq_bars = [0.0] * n
+        pos_bars = [0.0] * n
+
+    # per-bar timers only when profiling (flushed once per (day, ticker))
+    t_on_bar = 0.0
+    t_sl_tp = 0.0
+    t_loop = time.perf_counter() if timed else 0.0
+
+    for i in range(n - 1):
+        price_now = close[i]
+
+        if i == exit_idx:
+            # SL/TP touched during bar i: book the exact segment last mark -> fill
+            seg = state.position * cfg.unit_size * (exit_fill - last_price)
+            gross_pnl += seg
+            net_pnl += seg
+            last_price = price_now
 
-                # reset state
-                state.position = 0.0
-                state.entry_price = None
-                state.entry_atr = None
-                state.stop = None
-                state.take = None
-                num_trades += 1
-
-                continue  # after forced exit, skip signal action at same bar
-
-            # signal computed on bar close i
-            desired_pos = strat.on_bar(
-                ts=df.index[i],
-                open_=open_[i],
-                high=high[i],
-                low=low[i],
-                close=close[i],
-            )
-
-            desired_pos = float(desired_pos)
-
-            # execute at next open (i+1)
-            exec_price = open_[i + 1]
-
-            # if change position
-            if desired_pos != state.position:
-                # if closing existing pos => charge fees for round-trip
-                if state.position != 0.0:
-                    last_fee = abs(state.position) * cfg.bp_fee * (state.entry_price + exec_price)
-                    fees += last_fee
-                    net_pnl -= last_fee
-                    num_trades += 1  # closing trade
-
-                # if opening new pos
-                if desired_pos != 0.0:
-                    state.position = desired_pos
-                    state.entry_price = exec_price
-                    # entry ATR: use atr[i] (known at bar close i)
-                    state.entry_atr = float(atr[i]) if not np.isnan(atr[i]) else None
-                    if state.entry_atr is not None:
-                        set_sl_tp(state, cfg.sl_atr, cfg.tp_atr)
-                else:
-                    state.position = 0.0
-                    state.entry_price = None
-                    state.entry_atr = None
-                    state.stop = None
-                    state.take = None
-
-        # close any open position at final close (end of day)
-        if state.position != 0.0 and state.entry_price is not None:
-            exit_price = close[-1]
-            # holding pnl already booked till close[-2], adjust last segment:
-            adj = state.position * cfg.unit_size * (exit_price - last_price)
-            gross_pnl += adj
-            net_pnl += adj
-
-            last_fee = abs(state.position) * cfg.bp_fee * (state.entry_price + exit_price)
+            last_fee = fee_tracker.charge_round_trip(abs(state.position), state.entry_price, exit_fill)
             fees += last_fee
+            fee_basis += abs(state.position) * (state.entry_price + exit_fill)
             net_pnl -= last_fee
             num_trades += 1
 
-        date = df.index[0].date()
-
-        out.append({
-            "Date": date,
-            "Ticker": ticker_file,
-            "grossPnL": float(gross_pnl),
-            "feesTrade": float(fees),
-            "netPnL": float(net_pnl),
-            "numTrade": int(num_trades),
-        })
-
+            clear_trade(state)
+            exit_idx = -1
+            if record:
+                eq_bars[i] = net_pnl
+            continue  # after forced exit, skip signal action at same bar
+
+        # mark-to-market PnL on close-to-close
+        # holding PnL for position during bar i (from last mark to current close)
+        holding = state.position * cfg.unit_size * (price_now - last_price)
+        gross_pnl += holding
+        net_pnl += holding
+        last_price = price_now
+        if record:
+            eq_bars[i] = net_pnl
+            pos_bars[i] = state.position
+
+        # signal computed on bar close i
+        if timed:
+            t0 = time.perf_counter()
+        desired_pos = strat.on_bar(
+            ts=index[i],
+            open_=open_[i],
+            high=high[i],
+            low=low[i],
+            close=close[i],
+        )
+        if timed:
+            t_on_bar += time.perf_counter() - t0
+
+        desired_pos = float(desired_pos)
+
+        # execute at next open (i+1)
+        exec_price = open_[i + 1]
+
+        # if change position
+        if desired_pos != state.position:
+            # old position carries the close[i] -> open[i+1] segment
+            seg = state.position * cfg.unit_size * (exec_price - last_price)
+            gross_pnl += seg
+            net_pnl += seg
+            last_price = exec_price
+
+            # if closing existing pos => charge fees for round-trip
+            if state.position != 0.0:
+                last_fee = fee_tracker.charge_round_trip(abs(state.position), state.entry_price, exec_price)
+                fees += last_fee
+                fee_basis += abs(state.position) * (state.entry_price + exec_price)
+                net_pnl -= last_fee
+                num_trades += 1  # closing trade
+
+            # if opening new pos
+            if desired_pos != 0.0:
+                state.position = desired_pos
+                state.entry_price = exec_price
+                # entry ATR: use atr[i] (known at bar close i)
+                state.entry_atr = float(atr[i]) if not np.isnan(atr[i]) else None
+                state.stop, state.take = None, None
+                if state.entry_atr is not None:
+                    set_sl_tp(state, cfg.sl_atr, cfg.tp_atr)
+                # risk check starts on the entry bar i+1 (bar n-1 is left to the EOD close)
+                if timed:
+                    t0 = time.perf_counter()
+                exit_idx, exit_fill = find_sl_tp_exit(
+                    bars.open, bars.high, bars.low, bars.close, i + 1, n - 1,
+                    state.position, state.stop, state.take, cfg.sl_tp_policy,
+                )
+                if timed:
+                    t_sl_tp += time.perf_counter() - t0
+            else:
+                clear_trade(state)
+                exit_idx = -1
+
+    if timed:
+        prof.add_time("bar_loop", time.perf_counter() - t_loop)
+        prof.add_time("on_bar", t_on_bar, calls=n - 1)
+        prof.add_time("sl_tp", t_sl_tp)
+        prof.count("bars_processed", n)
+
+    if record:
+        pos_bars[n - 1] = state.position
+
+    # close any open position at final close (end of day)
+    if state.position != 0.0 and state.entry_price is not None:
+        exit_price = close[-1]
+        # holding pnl already booked till the last mark, adjust last segment:
+        adj = state.position * cfg.unit_size * (exit_price - last_price)
+        gross_pnl += adj
+        net_pnl += adj
+
+        last_fee = fee_tracker.charge_round_trip(abs(state.position), state.entry_price, exit_price)
+        fees += last_fee
+        fee_basis += abs(state.position) * (state.entry_price + exit_price)
+        net_pnl -= last_fee
+        num_trades += 1
+
+    prof.count("trades", num_trades)
+
+    out = {
+        "grossPnL": float(gross_pnl),
+        "feesTrade": float(fees),
+        "netPnL": float(net_pnl),
+        "numTrade": int(num_trades),
+        "feeBasis": float(fee_basis),
+    }
+    if record:
+        eq_bars[n - 1] = net_pnl
+        out["_equity"] = np.array(eq_bars)
+        out["_position"] = np.array(pos_bars)
     return out
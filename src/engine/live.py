@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import json
+import math
+from pathlib import Path
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.data.bars import index_ns
+from src.data.calendar import SessionClock
+from src.engine.backtester import list_day_files, load_bars
+from src.engine.execution import FeeModel, RoundTripFeeTracker
+from src.engine.risk import TradeState, check_sl_tp_hit, clear_trade, set_sl_tp
+from src.strategies.base import BaseStrategy
+
+
+@dataclass
+class BarEvent:
+    ticker: str
+    ts: pd.Timestamp
+    open: float
+    high: float
+    low: float
+    close: float
+    t_arrival: int = 0  # perf_counter_ns when routed (latency origin)
+
+
+# end-of-day marker: every trader books its EOD close and starts a fresh strategy
+EOD = "__EOD__"
+
+
+class PaperTrader:
+    """
+    Incremental twin of the `run_one_day` loop for one ticker.
+
+    A bar is processed as: fill the pending order at its open -> SL/TP check on the bar
+    -> mark-to-market to the close -> strategy decision (pending for the next open).
+    Fees go through `RoundTripFeeTracker`, SL/TP through the same `check_sl_tp_hit`
+    resolution as the offline engine. Session-aware strategies get the same calendar
+    (`on_session_bar`, from an incremental SessionClock) instead of the per-day `on_session`.
+    Rows match `run_one_day` except that the final bar of a day is also checked/decided
+    (a live stream has no look-ahead on which bar is the last one), so an SL/TP touched on
+    that bar fills at its level instead of the EOD close; and a day with two files for
+    one ticker is traded as a single stream.
+    """
+
+    def __init__(self, cfg: BacktestConfig, ticker: str, strategy_cls: Type[BaseStrategy], strategy_params: Dict[str, Any]):
+        self.cfg = cfg
+        self.ticker = ticker
+        self.strategy_cls = strategy_cls
+        self.strategy_params = strategy_params
+        self.fee_tracker = RoundTripFeeTracker(FeeModel(bp=cfg.bp_fee))
+        self._new_day()
+
+    def _new_day(self) -> None:
+        self.strat = self.strategy_cls(**self.strategy_params)
+        # session-aware strategies get the engine's calendar, built incrementally
+        self.clock = SessionClock(self.ticker) if self.strat.uses_sessions else None
+        self.state = TradeState(position=0.0)
+        self.pending: Optional[float] = None
+        self.last_price: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.trs: deque = deque(maxlen=self.cfg.atr_period)
+        self.tr_sum = 0.0
+        self.atr = float("nan")
+        self.date = None
+        self.gross_pnl = 0.0
+        self.net_pnl = 0.0
+        self.fees = 0.0
+        self.fee_basis = 0.0
+        self.num_trades = 0
+        self.n_bars = 0
+
+    def _book(self, amount: float) -> None:
+        self.gross_pnl += amount
+        self.net_pnl += amount
+
+    def _charge(self, exit_price: float) -> None:
+        fee = self.fee_tracker.charge_round_trip(abs(self.state.position), self.state.entry_price, exit_price)
+        self.fees += fee
+        self.fee_basis += abs(self.state.position) * (self.state.entry_price + exit_price)
+        self.net_pnl -= fee
+        self.num_trades += 1
+
+    def _update_atr(self, high: float, low: float, close: float) -> None:
+        # same SMA-of-true-range as compute_atr (first bar uses its own close as prev close)
+        pc = close if self.prev_close is None else self.prev_close
+        tr = max(high - low, abs(high - pc), abs(low - pc))
+        if len(self.trs) == self.trs.maxlen:
+            self.tr_sum -= self.trs[0]
+        self.trs.append(tr)
+        self.tr_sum += tr
+        self.atr = self.tr_sum / self.cfg.atr_period if len(self.trs) == self.cfg.atr_period else float("nan")
+        self.prev_close = close
+
+    def on_bar(self, ev: BarEvent) -> float:
+        cfg = self.cfg
+        state = self.state
+        if self.date is None:
+            self.date = ev.ts.date()
+        if self.last_price is None:
+            self.last_price = ev.close
+        self.n_bars += 1
+        if self.clock is not None:
+            sid, in_session, minutes = self.clock.update(ev.ts.value)
+            self.strat.on_session_bar(ev.high, ev.low, sid, in_session, minutes)
+
+        # 1) execute the decision of the previous bar at this open
+        if self.pending is not None and self.pending != state.position:
+            exec_price = ev.open
+            self._book(state.position * cfg.unit_size * (exec_price - self.last_price))
+            self.last_price = exec_price
+            if state.position != 0.0:
+                self._charge(exec_price)
+            if self.pending != 0.0:
+                state.position = self.pending
+                state.entry_price = exec_price
+                state.entry_atr = self.atr if not np.isnan(self.atr) else None
+                state.stop, state.take = None, None
+                if state.entry_atr is not None:
+                    set_sl_tp(state, cfg.sl_atr, cfg.tp_atr)
+            else:
+                clear_trade(state)
+        self.pending = None
+
+        # 2) SL/TP inside this bar
+        exit_price = check_sl_tp_hit(state, ev.high, ev.low, ev.open, ev.close, cfg.sl_tp_policy)
+        if exit_price is not None:
+            self._book(state.position * cfg.unit_size * (exit_price - self.last_price))
+            self._charge(exit_price)
+            clear_trade(state)
+            self.last_price = ev.close
+            self._update_atr(ev.high, ev.low, ev.close)
+            return 0.0  # after forced exit, skip signal action at same bar
+
+        # 3) mark to market, 4) decision for the next open
+        self._book(state.position * cfg.unit_size * (ev.close - self.last_price))
+        self.last_price = ev.close
+        self._update_atr(ev.high, ev.low, ev.close)
+
+        desired = float(self.strat.on_bar(ts=ev.ts, open_=ev.open, high=ev.high, low=ev.low, close=ev.close))
+        self.pending = desired
+        return desired
+
+    def close_day(self) -> Optional[Dict[str, Any]]:
+        """Book the EOD close, return the day's row (same columns as run_one_day) and reset."""
+        row = None
+        if self.n_bars > 0:
+            if self.state.position != 0.0 and self.state.entry_price is not None:
+                # last_price is the last close: nothing left to mark, only the round-trip fee
+                self._charge(self.last_price)
+            row = {
+                "Date": self.date,
+                "Ticker": self.ticker,
+                "grossPnL": float(self.gross_pnl),
+                "feesTrade": float(self.fees),
+                "netPnL": float(self.net_pnl),
+                "numTrade": int(self.num_trades),
+                "feeBasis": float(self.fee_basis),
+            }
+        self._new_day()
+        return row
+
+
+# =======================
+# Feeds
+# =======================
+
+async def replay_feed(cfg: BacktestConfig, day_dirs: List[Path], speed: float = 0.0) -> AsyncIterator[Any]:
+    """
+    Replays the Data/ day directories as one time-ordered stream across tickers.
+    speed=0: as fast as possible; speed=1: real time; speed=60: one minute per second.
+    Yields BarEvent objects and an EOD marker after each day.
+    """
+    for day_dir in day_dirs:
+        # decode the day off the event loop
+        loaded = await asyncio.to_thread(_load_day_bars, cfg, day_dir)
+        if not loaded:
+            continue
+
+        tickers = [t for t, _ in loaded]
+        ns = np.concatenate([index_ns(b.index) for _, b in loaded])
+        who = np.concatenate([np.full(len(b), k) for k, (_, b) in enumerate(loaded)])
+        pos = np.concatenate([np.arange(len(b)) for _, b in loaded])
+        order = np.argsort(ns, kind="stable")
+
+        prev_ns = None
+        for j in order:
+            if speed > 0 and prev_ns is not None and ns[j] > prev_ns:
+                await asyncio.sleep((ns[j] - prev_ns) / 1e9 / speed)
+            prev_ns = ns[j]
+            b = loaded[who[j]][1]
+            i = pos[j]
+            yield BarEvent(tickers[who[j]], b.index[i], float(b.open[i]), float(b.high[i]), float(b.low[i]), float(b.close[i]))
+        yield EOD
+
+
+def _load_day_bars(cfg: BacktestConfig, day_dir: Path):
+    out = []
+    for f, ticker in list_day_files(cfg, day_dir):
+        bars = load_bars(cfg, f, ticker)
+        if bars is not None and len(bars) > 0:
+            out.append((ticker, bars))
+    return out
+
+
+async def queue_feed(queue: "asyncio.Queue[Any]") -> AsyncIterator[Any]:
+    """Consumes BarEvent / EOD items from a local asyncio.Queue until a None sentinel."""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        yield item
+
+
+async def socket_feed(host: str = "127.0.0.1", port: int = 8765, maxsize: int = 10_000) -> AsyncIterator[Any]:
+    """
+    Local TCP feed of JSON lines:
+      {"ticker": "AAPL", "ts": "2025-04-01T13:30:00Z", "open": .., "high": .., "low": .., "close": ..}
+      {"type": "eod"}   end of day          {"type": "stop"}   end of stream
+    """
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=maxsize)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            msg = json.loads(line)
+            kind = msg.get("type", "bar")
+            if kind == "eod":
+                await queue.put(EOD)
+            elif kind == "stop":
+                await queue.put(None)
+                break
+            else:
+                await queue.put(BarEvent(
+                    msg["ticker"], pd.Timestamp(msg["ts"]),
+                    float(msg["open"]), float(msg["high"]), float(msg["low"]), float(msg["close"]),
+                ))
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        async for item in queue_feed(queue):
+            yield item
+
+
+# =======================
+# Runner
+# =======================
+
+class LatencyHistogram:
+    """
+    Latencies (ns) in fixed log-spaced buckets: constant memory whatever the number of bars.
+    Percentiles are the geometric midpoint of their bucket (within ~2.5% for ratio 1.05);
+    count and max are exact.
+    """
+
+    def __init__(self, lo_ns: float = 100.0, hi_ns: float = 1e10, ratio: float = 1.05):
+        self.lo_ns = lo_ns
+        self.ratio = ratio
+        self._log_lo = math.log(lo_ns)
+        self._log_r = math.log(ratio)
+        # bucket 0: below lo_ns; last bucket: above hi_ns
+        self.counts = [0] * (int(math.ceil((math.log(hi_ns) - self._log_lo) / self._log_r)) + 2)
+        self.n = 0
+        self.max_ns = 0
+
+    def add(self, ns: int) -> None:
+        b = int((math.log(ns) - self._log_lo) / self._log_r) + 1 if ns >= self.lo_ns else 0
+        self.counts[min(b, len(self.counts) - 1)] += 1
+        self.n += 1
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        if self.n == 0:
+            return float("nan")
+        b = int(np.searchsorted(np.cumsum(self.counts), max(1.0, math.ceil(q / 100.0 * self.n))))
+        if b == 0:
+            return float(min(self.lo_ns, self.max_ns))
+        return float(min(self.lo_ns * self.ratio ** (b - 0.5), self.max_ns))
+
+
+@dataclass
+class LiveReport:
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram)      # dequeue -> decision
+    e2e_latencies: LatencyHistogram = field(default_factory=LatencyHistogram)  # routing -> decision (incl. queueing)
+    n_bars: int = 0
+    wall_s: float = 0.0
+
+    def daily_pnl(self, tag: str = "LIVE") -> pd.DataFrame:
+        df = pd.DataFrame(self.rows)
+        if not df.empty:
+            df["Tag"] = tag
+        return df
+
+    def latency_stats(self) -> Dict[str, float]:
+        out: Dict[str, float] = {
+            "bars": int(self.n_bars),
+            "bars_per_s": self.n_bars / self.wall_s if self.wall_s > 0 else 0.0,
+        }
+        for name, hist in (("latency", self.latencies), ("e2e_latency", self.e2e_latencies)):
+            if hist.n == 0:
+                continue
+            for q in (50, 90, 99):
+                out[f"{name}_p{q}_us"] = hist.percentile(q) / 1e3  # microseconds
+            out[f"{name}_max_us"] = hist.max_ns / 1e3
+        return out
+
+
+class LiveRunner:
+    """
+    Routes a bar stream to one PaperTrader (own strategy instance) per ticker.
+    Each ticker has its own bounded queue and consumer task. Per bar it records the
+    decision latency (trader `on_bar` only) and the end-to-end latency from routing,
+    which includes the time spent waiting in the ticker queue.
+    """
+
+    def __init__(
+        self,
+        cfg: BacktestConfig,
+        strategy_cls: Type[BaseStrategy],
+        strategy_params: Dict[str, Any],
+        queue_size: int = 1024,
+    ):
+        self.cfg = cfg
+        self.strategy_cls = strategy_cls
+        self.strategy_params = strategy_params
+        self.queue_size = queue_size
+        self.traders: Dict[str, PaperTrader] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.report = LiveReport()
+
+    async def _consume(self, trader: PaperTrader, queue: asyncio.Queue) -> None:
+        lat = self.report.latencies
+        e2e = self.report.e2e_latencies
+        while True:
+            ev = await queue.get()
+            if ev is None:
+                return
+            if ev is EOD:
+                row = trader.close_day()
+                if row is not None:
+                    self.report.rows.append(row)
+                continue
+            t0 = time.perf_counter_ns()
+            trader.on_bar(ev)
+            t1 = time.perf_counter_ns()
+            lat.add(t1 - t0)
+            e2e.add(t1 - ev.t_arrival)
+
+    def _queue_for(self, ticker: str) -> asyncio.Queue:
+        q = self.queues.get(ticker)
+        if q is None:
+            trader = PaperTrader(self.cfg, ticker, self.strategy_cls, self.strategy_params)
+            q = asyncio.Queue(maxsize=self.queue_size)
+            self.traders[ticker] = trader
+            self.queues[ticker] = q
+            self.tasks.append(asyncio.create_task(self._consume(trader, q)))
+        return q
+
+    async def run(self, feed: AsyncIterator[Any]) -> LiveReport:
+        t0 = time.perf_counter()
+        n = 0
+        async for ev in feed:
+            if ev is EOD:
+                for q in self.queues.values():
+                    await q.put(EOD)
+                continue
+            ev.t_arrival = time.perf_counter_ns()
+            await self._queue_for(ev.ticker).put(ev)
+            n += 1
+            if n % 256 == 0:
+                await asyncio.sleep(0)  # let consumers drain when the feed never blocks
+
+        for q in self.queues.values():
+            await q.put(EOD)
+            await q.put(None)
+        await asyncio.gather(*self.tasks)
+
+        self.report.n_bars = n
+        self.report.wall_s = time.perf_counter() - t0
+        return self.report
+
+
+def run_replay(
+    cfg: BacktestConfig,
+    day_dirs: List[Path],
+    strategy_cls: Type[BaseStrategy],
+    strategy_params: Dict[str, Any],
+    speed: float = 0.0,
+) -> LiveReport:
+    """Synchronous entry point: replay `day_dirs` through a LiveRunner."""
+    runner = LiveRunner(cfg, strategy_cls, strategy_params)
+    return asyncio.run(runner.run(replay_feed(cfg, day_dirs, speed=speed)))
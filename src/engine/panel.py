@@ -0,0 +1,182 @@
+"""
+Cross-sectional engine: each day the selected tickers are aligned once on a common minute
+index (src.data.panel) and every PanelStrategy spec returns a position vector per minute.
+
+    python -m src.engine.panel [-s XS_Momentum Pair_Spread] [-t AAPL MSFT ...] [--max-days 20]
+writes <results>/panel/daily_pnl.csv (one row per day, ticker, spec) + panel/summary.csv.
+
+Same conventions as simulate_bars: decision on the close of minute i, execution at open[i+1],
+close-to-close marking, flat at the last close of the day. No ATR SL/TP: positions only move
+when the strategy asks. Fees are charged per side on the traded quantity,
+|dpos| * bp * price, which sums to the round-trip formula for a full entry + exit.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.data.bars import Bars
+from src.data.calendar import list_day_directories
+from src.data.panel import Panel, align_panel
+from src.engine.backtester import StrategySpec, _run_days, list_day_files, load_bars, params_tag
+from src.metrics.perf import build_oos_matrix
+from src.strategies.base import PanelStrategy
+from src.strategies.registry import panel_strategy_specs
+from src.utils.profiling import get_profiler
+
+
+def load_panel(cfg: BacktestConfig, day_dir: Path) -> Panel:
+    """
+    Bars of every selected ticker of the day (cfg.timeframe / precision), aligned once.
+    Empty panel (skipped day) if a frame lacks the price columns.
+    """
+    bars_by_ticker: Dict[str, Bars] = {}
+    for f, ticker_file in list_day_files(cfg, day_dir):
+        bars = load_bars(cfg, f, ticker_file)
+        if bars is None:
+            # required columns missing (multi-ticker frame?) => skip the day safely
+            return align_panel({})
+        if len(bars):
+            bars_by_ticker[ticker_file] = bars
+    with get_profiler().stage("panel_align"):
+        return align_panel(bars_by_ticker)
+
+
+def panel_positions(panel: Panel, strat: PanelStrategy) -> np.ndarray:
+    """(minutes, tickers) desired positions; row i is acted on at open[i + 1]."""
+    strat.on_day(panel)
+    n, m = panel.close.shape
+    if strat.batch:
+        desired = np.asarray(strat.positions(panel), dtype=np.float64).reshape(n, m)
+    else:
+        desired = np.zeros((n, m))
+        index = panel.index
+        for i in range(n - 1):
+            desired[i] = strat.on_bar(index[i], panel.open[i], panel.high[i], panel.low[i], panel.close[i])
+    # nothing to trade before a ticker's first bar
+    return np.where(np.isfinite(panel.close), np.nan_to_num(desired), 0.0)
+
+
+def simulate_panel(cfg: BacktestConfig, panel: Panel, desired: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-ticker grossPnL / feesTrade / netPnL / numTrade / feeBasis of one day, vectorized over (minutes, tickers)."""
+    n = len(panel)
+    known = np.isfinite(panel.close)
+    o = np.where(known, panel.open, 0.0).astype(np.float64)
+    c = np.where(known, panel.close, 0.0).astype(np.float64)
+
+    held = np.zeros_like(desired)  # position carried through minute j (from open j to close j)
+    held[1:] = desired[:-1]
+
+    u = cfg.unit_size
+    gross = u * ((held[1:] * (c[1:] - o[1:])).sum(axis=0) + (held[1:n - 1] * (o[2:] - c[1:n - 1])).sum(axis=0))
+
+    traded = np.abs(np.diff(held, axis=0))  # executed at open[1:]
+    eod = np.abs(held[-1])
+    fee_basis = (traded * o[1:]).sum(axis=0) + eod * c[-1]
+    fees = cfg.bp_fee * fee_basis
+    # as in simulate_bars, a trade is counted when an open position is closed or changed
+    num_trades = ((traded != 0.0) & (held[:-1] != 0.0)).sum(axis=0) + (eod != 0.0)
+
+    return {"grossPnL": gross, "feesTrade": fees, "netPnL": gross - fees, "numTrade": num_trades, "feeBasis": fee_basis}
+
+
+def run_panel_one_day(
+    cfg: BacktestConfig,
+    day_dir: Path,
+    specs: List[StrategySpec],
+    panel: Optional[Panel] = None,
+) -> List[Dict[str, Any]]:
+    """One aligned panel per day shared by every spec; one row per (ticker, spec)."""
+    prof = get_profiler()
+    if panel is None:
+        panel = load_panel(cfg, day_dir)
+    if len(panel) < 3:
+        return []
+
+    date = panel.index[0].date()
+    out: List[Dict[str, Any]] = []
+    for name, strategy_cls, strategy_params in specs:
+        strat = strategy_cls(**strategy_params)
+        with prof.stage("panel_strategy"):
+            desired = panel_positions(panel, strat)
+        with prof.stage("panel_pnl"):
+            res = simulate_panel(cfg, panel, desired)
+        prof.count("bars_processed", panel.close.size)
+
+        for k, ticker in enumerate(panel.tickers):
+            row: Dict[str, Any] = {
+                "Date": date,
+                "Ticker": ticker,
+                "grossPnL": float(res["grossPnL"][k]),
+                "feesTrade": float(res["feesTrade"][k]),
+                "netPnL": float(res["netPnL"][k]),
+                "numTrade": int(res["numTrade"][k]),
+                "feeBasis": float(res["feeBasis"][k]),
+            }
+            if name is not None:
+                row["Strategy"] = name
+                row["Params"] = params_tag(strategy_params)
+            out.append(row)
+    return out
+
+
+def run_panel_backtest_days(
+    cfg: BacktestConfig,
+    day_dirs: List[Path],
+    specs: List[StrategySpec],
+    tag: str = "OOS",
+) -> pd.DataFrame:
+    """run_multi_backtest_days for PanelStrategy specs (same columns, same cfg.workers pool)."""
+    with get_profiler().stage("run_panel_backtest_days"):
+        rows = _run_days(cfg, day_dirs, specs, day_fn=run_panel_one_day, load_fn=load_panel)
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+
+    df["Tag"] = tag
+    return df
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Cross-sectional (panel) strategies on Data/.")
+    ap.add_argument("-s", "--strategies", nargs="+", default=None)
+    ap.add_argument("-t", "--tickers", nargs="+", default=[])
+    ap.add_argument("--max-days", type=int, default=None)
+    ap.add_argument("-j", "--workers", type=int, default=1)
+    ap.add_argument("--prefetch", type=int, default=2)
+    ap.add_argument("--timeframe", default="1m")
+    ap.add_argument("--data", type=Path, default=Path("Data"))
+    ap.add_argument("--results", type=Path, default=Path("Results"))
+    args = ap.parse_args(argv)
+
+    cfg = BacktestConfig(data_root=args.data, results_root=args.results, tickers=args.tickers,
+                         workers=args.workers, prefetch_days=args.prefetch, timeframe=args.timeframe)
+    day_dirs = list_day_directories(cfg.data_root)[: args.max_days]
+    specs = [(name, cls, p) for name, cls, grid in panel_strategy_specs(args.strategies) for p in grid]
+
+    df = run_panel_backtest_days(cfg, day_dirs, specs)
+    out_dir = cfg.results_root / "panel"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(out_dir / "daily_pnl.csv", index=False)
+
+    summary = []
+    if not df.empty:
+        for (name, params), sub in df.groupby(["Strategy", "Params"], sort=False):
+            port = build_oos_matrix(sub).iloc[-1].to_dict()
+            summary.append({"Strategy": name, "Params": params, **port})
+    summary_df = pd.DataFrame(summary)
+    summary_df.to_csv(out_dir / "summary.csv", index=False)
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(summary_df)
+    print(f"✅ Panel files: {out_dir / 'daily_pnl.csv'} | {out_dir / 'summary.csv'}")
+
+
+if __name__ == "__main__":
+    main()
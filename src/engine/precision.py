@@ -0,0 +1,124 @@
+"""
+float32 vs float64 validation: runs the same specs in both precisions on Data/ and
+reports the deviation of bars, ATR, daily PnL, trade counts and IS scores.
+
+    python -m src.engine.precision --max-days 20 [-s ORB MA_Cross] [-t AAPL MSFT]
+writes <results>/precision_report.csv (one row per spec) + precision_bars.json.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.data.calendar import list_day_directories
+from src.engine.backtester import StrategySpec, list_day_files, load_bars, run_multi_backtest_days
+from src.engine.risk import compute_atr
+from src.metrics.perf import score_is_for_selection
+from src.strategies.registry import strategy_specs
+
+
+def bars_deviation(cfg: BacktestConfig, day_dirs: Sequence[Path]) -> Dict[str, Any]:
+    """Memory of the bar arrays and worst relative rounding of prices / ATR in float32."""
+    c64, c32 = replace(cfg, precision="float64"), replace(cfg, precision="float32")
+    nbytes = {"float64": 0, "float32": 0}
+    price_rel = 0.0
+    atr_rel = 0.0
+    n = 0
+    for day_dir in day_dirs:
+        for f, ticker in list_day_files(cfg, day_dir):
+            b64, b32 = load_bars(c64, f, ticker), load_bars(c32, f, ticker)
+            if b64 is None or len(b64) < 2:
+                continue
+            n += 1
+            nbytes["float64"] += b64.nbytes
+            nbytes["float32"] += b32.nbytes
+            with np.errstate(divide="ignore", invalid="ignore"):
+                p = np.abs(b32.close.astype(np.float64) - b64.close) / np.abs(b64.close)
+                a64 = compute_atr(b64.high, b64.low, b64.close, cfg.atr_period)
+                a32 = compute_atr(b32.high, b32.low, b32.close, cfg.atr_period)
+                a = np.abs(a32.astype(np.float64) - a64) / np.abs(a64)
+            price_rel = max(price_rel, float(np.nanmax(p, initial=0.0)))
+            atr_rel = max(atr_rel, float(np.nanmax(np.where(np.isfinite(a), a, np.nan), initial=0.0)))
+    return {
+        "day_tickers": n,
+        "bars_bytes_float64": nbytes["float64"],
+        "bars_bytes_float32": nbytes["float32"],
+        "bytes_ratio": nbytes["float32"] / nbytes["float64"] if nbytes["float64"] else float("nan"),
+        "max_rel_price_error": price_rel,
+        "max_rel_atr_error": atr_rel,
+    }
+
+
+def precision_report(
+    cfg: BacktestConfig,
+    day_dirs: Sequence[Path],
+    specs: List[StrategySpec],
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """One row per (Strategy, Params): PnL / trade-count / score deviation of float32 vs float64."""
+    runs: Dict[str, pd.DataFrame] = {}
+    wall: Dict[str, float] = {}
+    for precision in ("float64", "float32"):
+        t0 = time.perf_counter()
+        runs[precision] = run_multi_backtest_days(replace(cfg, precision=precision), list(day_dirs), specs, tag="IS")
+        wall[precision] = time.perf_counter() - t0
+
+    keys = ["Strategy", "Params", "Date", "Ticker"]
+    both = runs["float64"].merge(runs["float32"], on=keys, suffixes=("_64", "_32"), how="outer")
+
+    rows = []
+    for (name, params), sub in both.groupby(["Strategy", "Params"], sort=False):
+        d = (sub["netPnL_32"] - sub["netPnL_64"]).abs()
+        tot64 = float(sub["netPnL_64"].sum())
+        s64 = score_is_for_selection(sub.rename(columns={"netPnL_64": "netPnL"}))
+        s32 = score_is_for_selection(sub.rename(columns={"netPnL_32": "netPnL"}))
+        rows.append({
+            "Strategy": name,
+            "Params": params,
+            "Rows": len(sub),
+            "Max |dNetPnL|": float(d.max()),
+            "Mean |dNetPnL|": float(d.mean()),
+            "NetPnL float64": tot64,
+            "NetPnL float32": float(sub["netPnL_32"].sum()),
+            "Rel dNetPnL total": abs(float(sub["netPnL_32"].sum()) - tot64) / max(abs(tot64), 1e-12),
+            "Rows dTrades": int((sub["numTrade_32"] != sub["numTrade_64"]).sum()),
+            "Score float64": s64,
+            "Score float32": s32,
+        })
+    return pd.DataFrame(rows), {"wall_s_float64": wall["float64"], "wall_s_float32": wall["float32"]}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="float32 vs float64 deviation report on Data/.")
+    ap.add_argument("-s", "--strategies", nargs="+", default=None)
+    ap.add_argument("-t", "--tickers", nargs="+", default=[])
+    ap.add_argument("--max-days", type=int, default=20)
+    ap.add_argument("--data", type=Path, default=Path("Data"))
+    ap.add_argument("--results", type=Path, default=Path("Results"))
+    args = ap.parse_args(argv)
+
+    cfg = BacktestConfig(data_root=args.data, results_root=args.results, tickers=args.tickers)
+    day_dirs = list_day_directories(cfg.data_root)[: args.max_days]
+    specs = [(name, cls, p) for name, cls, grid in strategy_specs(args.strategies) for p in grid]
+
+    report, wall = precision_report(cfg, day_dirs, specs)
+    summary = {**bars_deviation(cfg, day_dirs), **wall}
+
+    cfg.results_root.mkdir(parents=True, exist_ok=True)
+    report.to_csv(cfg.results_root / "precision_report.csv", index=False)
+    (cfg.results_root / "precision_bars.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(report)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
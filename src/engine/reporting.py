@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.engine.backtester import params_tag
+from src.metrics.perf import build_oos_matrix, score_is_for_selection
+from src.utils.profiling import get_profiler
+
+
+# Results/ layout shared by run_all_strategies and the shard reducer:
+#   <Strategy>/grid_IS_<params>.csv, best_params.json, daily_pnl_IS_best.csv,
+#   <Strategy>/daily_pnl_OOS.csv, oos_matrix.csv, SUMMARY_Portfolio_OOS.csv
+
+SUMMARY_COLUMNS = ["Strategy", "Net Return Ann.", "Sharpe", "MaxDD", "Avg Daily Trades"]
+
+
+def split_runs(df: pd.DataFrame) -> Dict[Tuple[str, str], pd.DataFrame]:
+    # run_multi_backtest_days output -> {(Strategy, Params): rows in run_backtest_days layout}
+    if df.empty:
+        return {}
+    return {
+        key: sub.drop(columns=["Strategy", "Params"]).reset_index(drop=True)
+        for key, sub in df.groupby(["Strategy", "Params"], sort=False)
+    }
+
+
+def select_best(
+    grid_runs: Iterable[Tuple[Dict[str, Any], pd.DataFrame]],
+    strat_dir: Path,
+) -> Optional[Dict[str, Any]]:
+    prof = get_profiler()
+
+    # 1) Tuning on IS
+    best_params: Optional[Dict[str, Any]] = None
+    best_score = float("-inf")
+    best_is_df: Optional[pd.DataFrame] = None
+
+    for params, is_df in grid_runs:
+        # Save each grid run (optional but useful)
+        grid_path = strat_dir / f"grid_IS_{params_tag(params)}.csv"
+        with prof.stage("csv_write"):
+            is_df.to_csv(grid_path, index=False)
+
+        score = score_is_for_selection(is_df)
+        if score > best_score:
+            best_score = score
+            best_params = params
+            best_is_df = is_df
+
+    if best_params is None:
+        print("⚠️ Aucun résultat IS (données manquantes ?) => skip stratégie")
+        return None
+
+    # persist best params + IS best pnl
+    (strat_dir / "best_params.json").write_text(json.dumps(best_params, indent=2), encoding="utf-8")
+    if best_is_df is not None:
+        with prof.stage("csv_write"):
+            best_is_df.to_csv(strat_dir / "daily_pnl_IS_best.csv", index=False)
+
+    print(f"✅ Best params (IS): {best_params} | score={best_score:.4f}")
+    return best_params
+
+
+def report_oos(
+    strat_name: str,
+    oos_df: pd.DataFrame,
+    strat_dir: Path,
+    all_oos_rows: List[pd.DataFrame],
+) -> Optional[Dict[str, Any]]:
+    with get_profiler().stage("csv_write"):
+        oos_df.to_csv(strat_dir / "daily_pnl_OOS.csv", index=False)
+
+    # 3) OOS Matrix
+    matrix = build_oos_matrix(oos_df, portfolio_name="Portfolio")
+    matrix.to_csv(strat_dir / "oos_matrix.csv", index=False)
+
+    # Keep for global files
+    all_oos_rows.append(oos_df.assign(Strategy=strat_name))
+
+    print(matrix)
+
+    # Small one-line summary for Portfolio row
+    port_row = matrix[matrix["Asset"] == "Portfolio"].copy()
+    if port_row.empty:
+        return None
+    r = port_row.iloc[0].to_dict()
+    r["Strategy"] = strat_name
+    return r
+
+
+def write_summary(results_root: Path, summary_rows: List[Dict[str, Any]]) -> Optional[Path]:
+    if not summary_rows:
+        return None
+    df_summary = pd.DataFrame(summary_rows)
+    # Keep a clean set of columns if present
+    cols = [c for c in SUMMARY_COLUMNS if c in df_summary.columns]
+    df_summary = df_summary[cols] if cols else df_summary
+    path = Path(results_root) / "SUMMARY_Portfolio_OOS.csv"
+    df_summary.to_csv(path, index=False)
+    return path
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
 
 
+# Tie-break policies when both SL and TP lie inside the same bar's high/low:
+# - "stop_first":     conservative, the stop is always assumed hit first
+# - "open_proximity": the level closest to the bar open is hit first
+# - "ohlc_path":      bullish bar walks O->L->H->C, bearish bar O->H->L->C
+SL_TP_POLICIES = ("stop_first", "open_proximity", "ohlc_path")
+
+
 @dataclass
 class TradeState:
     position: float = 0.0          # -1, 0, +1 (or leverage)
@@ -15,21 +22,30 @@ class TradeState:
     take: Optional[float] = None
 
 
+def clear_trade(state: TradeState) -> None:
+    state.position = 0.0
+    state.entry_price = None
+    state.entry_atr = None
+    state.stop = None
+    state.take = None
+
+
 def compute_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    # ATR in the dtype of the inputs (float32 bars => float32 ATR), running sum in float64
+    dtype = close.dtype if np.issubdtype(close.dtype, np.floating) else np.float64
+
     # True Range
     prev_close = np.roll(close, 1)
     prev_close[0] = close[0]
     tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
 
-    atr = np.full_like(close, np.nan, dtype=float)
+    atr = np.full(len(close), np.nan, dtype=dtype)
     if len(tr) < period:
         return atr
 
     # simple moving average ATR (robuste & rapide)
-    cumsum = np.cumsum(tr, dtype=float)
-    atr[period - 1] = cumsum[period - 1] / period
-    for i in range(period, len(tr)):
-        atr[i] = (cumsum[i] - cumsum[i - period]) / period
+    cumsum = np.cumsum(tr, dtype=np.float64)
+    atr[period - 1:] = (cumsum[period - 1:] - np.r_[0.0, cumsum[:-period]]) / period
     return atr
 
 
@@ -46,16 +62,117 @@ def set_sl_tp(state: TradeState, sl_atr: float, tp_atr: float):
         state.take = state.entry_price - tp_atr * state.entry_atr
 
 
-def check_sl_tp_hit(state: TradeState, bar_high: float, bar_low: float):
+def resolve_sl_tp_bar(
+    position: float,
+    stop: float,
+    take: float,
+    bar_open: float,
+    bar_high: float,
+    bar_low: float,
+    bar_close: float,
+    policy: str = "stop_first",
+) -> Optional[float]:
+    """
+    Exit price of a single bar for an open trade, or None if neither level is touched.
+    - a gap through a level at the open is filled at the open
+    - if both levels are inside [low, high], `policy` decides which came first
+    """
+    if position > 0:
+        if bar_open <= stop or bar_open >= take:
+            return float(bar_open)
+        hit_stop = bar_low <= stop
+        hit_take = bar_high >= take
+    else:
+        if bar_open >= stop or bar_open <= take:
+            return float(bar_open)
+        hit_stop = bar_high >= stop
+        hit_take = bar_low <= take
+
+    if hit_stop and hit_take:
+        if policy == "stop_first":
+            return float(stop)
+        if policy == "open_proximity":
+            return float(stop) if abs(bar_open - stop) <= abs(bar_open - take) else float(take)
+        if policy == "ohlc_path":
+            low_first = bar_close >= bar_open  # bullish bar visits the low before the high
+            stop_below = position > 0
+            return float(stop) if low_first == stop_below else float(take)
+        raise ValueError(f"unknown sl_tp_policy={policy!r} (expected one of {SL_TP_POLICIES})")
+    if hit_stop:
+        return float(stop)
+    if hit_take:
+        return float(take)
+    return None
+
+
+def find_sl_tp_exit(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    start: int,
+    end: int,
+    position: float,
+    stop: Optional[float],
+    take: Optional[float],
+    policy: str = "stop_first",
+) -> Tuple[int, float]:
+    """
+    Vectorized SL/TP resolver: first bar j in [start, end) where the stop or the take
+    is crossed, and the exact fill price on that bar.
+    Returns (-1, nan) if the trade survives until `end`.
+
+    The scan runs on array chunks of doubling size, so a trade exiting after k bars
+    costs O(k) element-wise comparisons and no Python-level per-bar branching.
+    """
+    if position == 0 or stop is None or take is None:
+        return -1, float("nan")
+
+    if position > 0:
+        # long: stop below, take above
+        lo_level, hi_level = stop, take
+    else:
+        lo_level, hi_level = take, stop
+
+    step = 64
+    a = start
+    while a < end:
+        b = min(end, a + step)
+        hit = (low[a:b] <= lo_level) | (high[a:b] >= hi_level)
+        k = int(np.argmax(hit))
+        if hit[k]:
+            j = a + k
+            px = resolve_sl_tp_bar(position, stop, take, open_[j], high[j], low[j], close[j], policy)
+            return j, float(px)
+        a = b
+        step *= 2
+
+    return -1, float("nan")
+
+
+def check_sl_tp_hit(
+    state: TradeState,
+    bar_high: float,
+    bar_low: float,
+    bar_open: Optional[float] = None,
+    bar_close: Optional[float] = None,
+    policy: str = "stop_first",
+):
     """
     Return exit_price if SL/TP touched during bar, else None.
-    Conservative:
+    Conservative by default:
     - long: SL if low <= stop, TP if high >= take
     - short: SL if high >= stop, TP if low <= take
+    Bar-by-bar counterpart of `find_sl_tp_exit` (same fills when open/close are given).
     """
     if state.position == 0 or state.stop is None or state.take is None:
         return None
 
+    if bar_open is not None and bar_close is not None:
+        return resolve_sl_tp_bar(
+            state.position, state.stop, state.take, bar_open, bar_high, bar_low, bar_close, policy
+        )
+
     if state.position > 0:
         # SL first (conservative)
         if bar_low <= state.stop:
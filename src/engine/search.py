@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.engine.backtester import params_tag, run_multi_backtest_days
+from src.metrics.perf import score_is_for_selection
+from src.strategies.base import BaseStrategy
+
+
+SAMPLERS = ("random", "sobol", "tpe")
+
+
+# =======================
+# Parameter spaces
+# =======================
+# A space is a dict name -> IntRange | FloatRange | Categorical | constant value.
+# Samplers work on the unit cube, each dimension maps u in [0, 1) to a value.
+
+@dataclass(frozen=True)
+class IntRange:
+    low: int
+    high: int  # inclusive
+    log: bool = False
+
+    def from_unit(self, u: float) -> int:
+        if self.log:
+            lo, hi = math.log(self.low), math.log(self.high + 1)
+            v = int(math.exp(lo + u * (hi - lo)))
+        else:
+            v = self.low + int(u * (self.high - self.low + 1))
+        return int(min(max(v, self.low), self.high))
+
+    def to_unit(self, v: int) -> float:
+        if self.log:
+            lo, hi = math.log(self.low), math.log(self.high + 1)
+            return (math.log(v + 0.5) - lo) / (hi - lo)
+        return (v - self.low + 0.5) / (self.high - self.low + 1)
+
+
+@dataclass(frozen=True)
+class FloatRange:
+    low: float
+    high: float
+    log: bool = False
+
+    def from_unit(self, u: float) -> float:
+        if self.log:
+            return float(math.exp(math.log(self.low) + u * (math.log(self.high) - math.log(self.low))))
+        return float(self.low + u * (self.high - self.low))
+
+    def to_unit(self, v: float) -> float:
+        if self.log:
+            return (math.log(v) - math.log(self.low)) / (math.log(self.high) - math.log(self.low))
+        return (v - self.low) / (self.high - self.low)
+
+
+@dataclass(frozen=True)
+class Categorical:
+    choices: Tuple[Any, ...]
+
+    def from_unit(self, u: float) -> Any:
+        return self.choices[min(int(u * len(self.choices)), len(self.choices) - 1)]
+
+    def to_unit(self, v: Any) -> float:
+        return (self.choices.index(v) + 0.5) / len(self.choices)
+
+
+Dimension = (IntRange, FloatRange, Categorical)
+
+
+def _dims(space: Dict[str, Any]) -> List[str]:
+    return [k for k, v in space.items() if isinstance(v, Dimension)]
+
+
+def decode(space: Dict[str, Any], u: np.ndarray) -> Dict[str, Any]:
+    """Unit vector -> params dict (constants passed through, keys in space order)."""
+    it = iter(u)
+    return {k: (v.from_unit(float(next(it))) if isinstance(v, Dimension) else v) for k, v in space.items()}
+
+
+def encode(space: Dict[str, Any], params: Dict[str, Any]) -> np.ndarray:
+    return np.array([space[k].to_unit(params[k]) for k in _dims(space)], dtype=float)
+
+
+# =======================
+# Samplers
+# =======================
+
+class RandomSampler:
+    def __init__(self, space: Dict[str, Any], seed: int = 42):
+        self.d = len(_dims(space))
+        self.rng = np.random.default_rng(seed)
+
+    def ask(self, n: int, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return self.rng.random((n, self.d))
+
+
+# Joe & Kuo (2008) direction numbers (s, a, m_1..m_s), dimensions 2..12
+_JOE_KUO = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+]
+_SOBOL_BITS = 30
+
+
+def _sobol_directions(d: int) -> np.ndarray:
+    if d > len(_JOE_KUO) + 1:
+        raise ValueError(f"built-in Sobol supports up to {len(_JOE_KUO) + 1} dimensions (install scipy for more)")
+    B = _SOBOL_BITS
+    V = np.zeros((d, B), dtype=np.int64)
+    V[0] = [1 << (B - 1 - i) for i in range(B)]
+    for j in range(1, d):
+        s, a, m = _JOE_KUO[j - 1]
+        for i in range(B):
+            if i < s:
+                V[j, i] = m[i] << (B - 1 - i)
+            else:
+                v = V[j, i - s] ^ (V[j, i - s] >> s)
+                for k in range(1, s):
+                    if (a >> (s - 1 - k)) & 1:
+                        v ^= V[j, i - k]
+                V[j, i] = v
+    return V
+
+
+class SobolSampler:
+    """
+    Scrambled Sobol points: scipy.stats.qmc when installed, else a built-in
+    Gray-code generator with a random digital shift.
+    """
+
+    def __init__(self, space: Dict[str, Any], seed: int = 42):
+        self.d = len(_dims(space))
+        try:
+            from scipy.stats import qmc
+            self._qmc = qmc.Sobol(d=self.d, scramble=True, seed=seed)
+        except ImportError:
+            self._qmc = None
+            self._V = _sobol_directions(self.d)
+            self._shift = np.random.default_rng(seed).integers(0, 1 << _SOBOL_BITS, size=self.d)
+            self._x = np.zeros(self.d, dtype=np.int64)
+            self._n = 0
+
+    def ask(self, n: int, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        if self._qmc is not None:
+            return self._qmc.random(n)
+        out = np.empty((n, self.d))
+        for r in range(n):
+            if self._n > 0:
+                c = (self._n & -self._n).bit_length() - 1  # lowest set bit of n (Gray code)
+                self._x ^= self._V[:, c]
+            self._n += 1
+            out[r] = (self._x ^ self._shift) / float(1 << _SOBOL_BITS)
+        return out
+
+
+class TPESampler:
+    """
+    Tree-structured Parzen estimator: splits the evaluated points into the best
+    `gamma` fraction and the rest, fits a Parzen density to each (Gaussian kernels
+    on numeric dims, smoothed frequencies on categoricals) and proposes the
+    candidates maximizing l(x)/g(x). Random until `n_startup` points are known,
+    then an `explore` share of each batch stays random.
+    """
+
+    def __init__(
+        self,
+        space: Dict[str, Any],
+        seed: int = 42,
+        gamma: float = 0.25,
+        n_startup: int = 8,
+        n_candidates: int = 24,
+        explore: float = 0.15,
+    ):
+        dims = _dims(space)
+        self.d = len(dims)
+        self.n_choices = [len(space[k].choices) if isinstance(space[k], Categorical) else 0 for k in dims]
+        self.rng = np.random.default_rng(seed)
+        self.gamma = gamma
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.explore = explore
+
+    def ask(self, n: int, X: np.ndarray, y: np.ndarray) -> np.ndarray:
+        if np.isfinite(y).sum() < max(self.n_startup, 2):
+            return self.rng.random((n, self.d))
+
+        # rejected candidates (-inf) stay in the model as the worst points, so the
+        # sampler learns to move away from them
+        ok = ~np.isnan(y)
+        X, y = X[ok], y[ok]
+        order = np.argsort(-y)
+        n_good = max(1, int(math.ceil(self.gamma * len(y))))
+        good, bad = X[order[:n_good]], X[order[n_good:]]
+        if len(bad) == 0:
+            bad = X
+
+        # one independent candidate draw per batch slot, so a batch doesn't collapse on one point
+        m = self.n_candidates
+        cand = self._sample(good, n * m)
+        score = (self._log_density(cand, good) - self._log_density(cand, bad)).reshape(n, m)
+        out = cand.reshape(n, m, self.d)[np.arange(n), np.argmax(score, axis=1)]
+
+        # a share of uniform draws keeps every region reachable; categories are also
+        # re-drawn alone at the proposed point, so a switch is tried where it can win
+        rand = self.rng.random(n) < self.explore
+        out[rand] = self.rng.random((int(rand.sum()), self.d))
+        for j, k in enumerate(self.n_choices):
+            if k:
+                flip = self.rng.random(n) < self.explore
+                out[flip, j] = (self.rng.integers(0, k, size=int(flip.sum())) + 0.5) / k
+        return out
+
+    def _bandwidth(self, pts: np.ndarray) -> np.ndarray:
+        # Scott's rule, floored at 1/(1+n) of the range so a few good points still explore
+        sd = pts.std(axis=0) if len(pts) > 1 else np.zeros(self.d)
+        return np.maximum(sd * len(pts) ** (-1.0 / (self.d + 4)), 1.0 / min(100, 1 + len(pts)))
+
+    def _cat_probs(self, pts: np.ndarray, j: int) -> np.ndarray:
+        k = self.n_choices[j]
+        idx = np.minimum((pts[:, j] * k).astype(int), k - 1)
+        counts = np.bincount(idx, minlength=k) + 1.0  # Laplace smoothing
+        return counts / counts.sum()
+
+    def _sample(self, good: np.ndarray, m: int) -> np.ndarray:
+        centers = good[self.rng.integers(0, len(good), size=m)]
+        cand = centers + self.rng.normal(size=(m, self.d)) * self._bandwidth(good)
+        cand = np.clip(cand, 0.0, 1.0 - 1e-12)
+        for j, k in enumerate(self.n_choices):
+            if k:
+                idx = self.rng.choice(k, size=m, p=self._cat_probs(good, j))
+                cand[:, j] = (idx + 0.5) / k
+        return cand
+
+    def _log_density(self, x: np.ndarray, pts: np.ndarray) -> np.ndarray:
+        num = [j for j, k in enumerate(self.n_choices) if not k]
+        out = np.zeros(len(x))
+        if num:
+            bw = self._bandwidth(pts)[num]
+            z = (x[:, None, num] - pts[None, :, num]) / bw  # (n_x, n_pts, n_num)
+            logk = -0.5 * np.sum(z * z, axis=-1) - np.sum(np.log(bw))
+            # Gaussian kernels (with their normalization) + one uniform prior component
+            logk = logk - 0.5 * len(num) * math.log(2.0 * math.pi)
+            logk = np.concatenate([logk, np.zeros((len(x), 1))], axis=1)
+            mx = logk.max(axis=1, keepdims=True)
+            out += (mx + np.log(np.exp(logk - mx).mean(axis=1, keepdims=True)))[:, 0]
+        for j, k in enumerate(self.n_choices):
+            if k:
+                idx = np.minimum((x[:, j] * k).astype(int), k - 1)
+                out += np.log(self._cat_probs(pts, j)[idx])
+        return out
+
+
+def make_sampler(name: str, space: Dict[str, Any], seed: int = 42):
+    if name == "random":
+        return RandomSampler(space, seed)
+    if name == "sobol":
+        return SobolSampler(space, seed)
+    if name == "tpe":
+        return TPESampler(space, seed)
+    raise ValueError(f"Unknown sampler {name!r}, expected one of {SAMPLERS}")
+
+
+# =======================
+# Search loop
+# =======================
+
+@dataclass
+class SearchResult:
+    best_params: Optional[Dict[str, Any]]
+    best_score: float
+    history: pd.DataFrame  # one row per evaluated candidate (trial, batch, params..., score)
+
+
+def _eval_batch(args: Tuple[BacktestConfig, List[Path], Type[BaseStrategy], List[Dict[str, Any]]]) -> List[float]:
+    # one traversal of the IS days for the whole batch (shared bars/ATR per (day, ticker))
+    cfg, is_days, strategy_cls, batch = args
+    specs = [("search", strategy_cls, p) for p in batch]
+    df = run_multi_backtest_days(cfg, is_days, specs, tag="IS")
+    if df.empty:
+        return [float("-inf")] * len(batch)
+    runs = {k: sub for k, sub in df.groupby("Params", sort=False)}
+    return [_search_score(runs.get(params_tag(p))) for p in batch]
+
+
+def _search_score(run: Optional[pd.DataFrame]) -> float:
+    # a candidate that never trades is rejected (-inf), not scored 0: a flat Sharpe of 0
+    # would beat every losing configuration without being a strategy at all
+    if run is None or run.empty or run["numTrade"].sum() == 0:
+        return float("-inf")
+    return score_is_for_selection(run)
+
+
+def search_params(
+    cfg: BacktestConfig,
+    is_days: List[Path],
+    strategy_cls: Type[BaseStrategy],
+    space: Dict[str, Any],
+    sampler: str = "tpe",
+    budget: int = 32,
+    batch_size: int = 8,
+    n_jobs: int = 1,
+    seed: int = 42,
+    constraint: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    init: Sequence[Dict[str, Any]] = (),
+) -> SearchResult:
+    """
+    Maximizes score_is_for_selection over `space` with `budget` IS evaluations.
+    `init` params (e.g. the hand-written grid) are evaluated first, so the search
+    can only improve on them. Each batch is split over `n_jobs` processes, each
+    process scoring its share in a single pass over the IS days.
+    Candidates that never trade on the IS days are rejected (score -inf).
+    """
+    smp = make_sampler(sampler, space, seed)
+    d = len(_dims(space))
+    seen: Dict[str, float] = {}
+    X: List[np.ndarray] = []
+    y: List[float] = []
+    rows: List[Dict[str, Any]] = []
+
+    pending = [dict(p) for p in init if constraint is None or constraint(p)]
+    pool = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    try:
+        n_batch = 0
+        while len(y) < budget:
+            want = min(batch_size, budget - len(y))
+            batch: List[Dict[str, Any]] = []
+            while pending and len(batch) < want:
+                p = pending.pop(0)
+                if params_tag(p) not in seen and all(params_tag(p) != params_tag(q) for q in batch):
+                    batch.append(p)
+
+            # propose, drop duplicates/invalid; give up after a few dry rounds (space exhausted)
+            dry = 0
+            while len(batch) < want and dry < 10:
+                u = smp.ask(want - len(batch), np.array(X).reshape(-1, d), np.array(y, dtype=float))
+                before = len(batch)
+                for row in u:
+                    p = decode(space, row)
+                    tag = params_tag(p)
+                    if tag in seen or any(tag == params_tag(q) for q in batch):
+                        continue
+                    if constraint is not None and not constraint(p):
+                        continue
+                    batch.append(p)
+                dry = dry + 1 if len(batch) == before else 0
+            if not batch:
+                break
+
+            chunks = [batch[i::n_jobs] for i in range(n_jobs)] if pool else [batch]
+            chunks = [c for c in chunks if c]
+            # the batch is already spread over processes: no nested day-level pool
+            eval_cfg = replace(cfg, workers=1) if pool else cfg
+            jobs = [(eval_cfg, is_days, strategy_cls, c) for c in chunks]
+            results = pool.map(_eval_batch, jobs) if pool else map(_eval_batch, jobs)
+
+            for chunk, scores in zip(chunks, results):
+                for p, s in zip(chunk, scores):
+                    seen[params_tag(p)] = s
+                    X.append(encode(space, p))
+                    y.append(s)
+                    rows.append({"trial": len(y) - 1, "batch": n_batch, **p, "score": s})
+            n_batch += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    history = pd.DataFrame(rows)
+    scores = np.array(y, dtype=float)
+    if not np.isfinite(scores).any():
+        return SearchResult(None, float("-inf"), history)
+    i = int(np.argmax(np.where(np.isfinite(scores), scores, -np.inf)))
+    best_params = {k: v for k, v in rows[i].items() if k in space}
+    return SearchResult(best_params, float(scores[i]), history)
@@ -0,0 +1,544 @@
+"""
+Sharded execution of backtest jobs across processes / hosts.
+
+    submit  -> (strategy, params, day-range) jobs into a broker queue
+    worker  -> claims a job under a lease, runs it day by day, writes one shard file
+    reduce  -> merges the shards of a phase into the usual Results/ layout
+
+Idempotence: a job id is the hash of its content (config included), so resubmitting
+is a no-op; a shard is written to a temp file then os.replace'd, so it is either
+complete or absent; a worker killed mid-job lets its lease expire and the job is
+claimed again. Shards are keyed by job id, so a job run twice overwrites the same
+file with the same rows: no day is lost or duplicated.
+
+CLI (python -m src.engine.sharding):
+    submit --phase IS --queue Results/_queue.sqlite [--config config_snapshot.json] [-s ORB ...]
+    worker --queue Results/_queue.sqlite [--data /mnt/Data]
+    reduce --phase IS --queue Results/_queue.sqlite        (then submit/worker/reduce --phase OOS)
+    status --queue Results/_queue.sqlite
+--queue also accepts redis://host:port/db (requires the `redis` package).
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import argparse
+from contextlib import closing
+from dataclasses import asdict, dataclass, fields
+import hashlib
+import json
+import os
+from pathlib import Path
+import socket
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.data.calendar import list_day_directories
+from src.engine.backtester import iter_days, params_tag, run_multi_one_day
+from src.engine.reporting import report_oos, select_best, split_runs, write_summary
+from src.strategies.registry import load_strategy, strategy_specs
+
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+@dataclass(frozen=True)
+class Job:
+    strategy: str  # registry name
+    params: Dict[str, Any]
+    days: List[str]  # day directory names, resolved against the worker's data_root
+    tag: str  # "IS" | "OOS"
+    spec_index: int  # submission order of (strategy, params): reducer keeps grid order
+    chunk: int  # position of the day range: reducer keeps day order
+    cfg: Dict[str, Any]
+
+    @property
+    def job_id(self) -> str:
+        blob = json.dumps(asdict(self), sort_keys=True, default=str)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @staticmethod
+    def from_json(s: str) -> "Job":
+        return Job(**json.loads(s))
+
+
+def cfg_to_dict(cfg: BacktestConfig) -> Dict[str, Any]:
+    return json.loads(json.dumps(cfg.__dict__, default=str))
+
+
+def cfg_from_dict(d: Dict[str, Any], **overrides: Any) -> BacktestConfig:
+    """Inverse of cfg_to_dict / config_snapshot.json (unknown keys ignored)."""
+    names = {f.name for f in fields(BacktestConfig)}
+    kw = {k: v for k, v in d.items() if k in names}
+    kw.update({k: v for k, v in overrides.items() if v is not None})
+    for k in ("data_root", "results_root"):
+        kw[k] = Path(kw[k])
+    if kw.get("bars_dir") is not None:
+        kw["bars_dir"] = Path(kw["bars_dir"])
+    for k in ("allocation_methods", "cost_sweep_bps"):
+        if isinstance(kw.get(k), list):
+            kw[k] = tuple(kw[k])
+    return BacktestConfig(**kw)
+
+
+def make_jobs(
+    cfg: BacktestConfig,
+    specs: Sequence[tuple],
+    day_dirs: Sequence[Path],
+    tag: str,
+    days_per_job: int = 10,
+) -> List[Job]:
+    """specs: (name, params) pairs; one job per (spec, contiguous range of `days_per_job` days)."""
+    cfg_d = cfg_to_dict(cfg)
+    names = [p.name for p in day_dirs]
+    jobs = []
+    for i, (name, params) in enumerate(specs):
+        for c, a in enumerate(range(0, len(names), max(1, days_per_job))):
+            jobs.append(Job(name, dict(params), names[a:a + days_per_job], tag, i, c, cfg_d))
+    return jobs
+
+
+# =======================
+# Brokers
+# =======================
+
+class Broker(ABC):
+    """Job queue with leases. A claimed job is invisible until done or its lease expires."""
+
+    max_attempts: int = 3
+
+    @abstractmethod
+    def submit(self, jobs: Sequence[Job]) -> int:
+        """Adds jobs not already known (by job_id); returns how many were new."""
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_s: float) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def renew(self, job_id: str, worker_id: str, lease_s: float) -> None:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        ...
+
+    @abstractmethod
+    def jobs(self) -> List[Dict[str, Any]]:
+        """[{job_id, state, attempts, job}] for every submitted job."""
+
+    def status(self) -> Dict[str, int]:
+        out = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for j in self.jobs():
+            out[j["state"]] += 1
+        return out
+
+
+class SQLiteBroker(Broker):
+    """Default broker: one SQLite file (local disk or a shared filesystem with working locks)."""
+
+    def __init__(self, path: Path, max_attempts: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL,"
+                " worker TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT, seq INTEGER)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(str(self.path), timeout=60.0, isolation_level=None)
+        con.execute("PRAGMA busy_timeout = 60000")
+        return con
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            (seq0,) = con.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()
+            cur = con.executemany(
+                "INSERT OR IGNORE INTO jobs (job_id, payload, state, seq) VALUES (?, ?, ?, ?)",
+                [(j.job_id, j.to_json(), PENDING, seq0 + 1 + k) for k, j in enumerate(jobs)],
+            )
+            con.execute("COMMIT")
+            return cur.rowcount
+        finally:
+            con.close()
+
+    def claim(self, worker_id: str, lease_s: float) -> Optional[Job]:
+        now = time.time()
+        con = self._connect()
+        try:
+            con.execute("BEGIN IMMEDIATE")  # one claimer at a time
+            con.execute(
+                "UPDATE jobs SET state = ? WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, RUNNING, now, self.max_attempts),
+            )
+            row = con.execute(
+                "SELECT job_id, payload FROM jobs"
+                " WHERE (state = ? OR (state = ? AND lease_until < ?)) AND attempts < ?"
+                " ORDER BY seq LIMIT 1",
+                (PENDING, RUNNING, now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                con.execute("COMMIT")
+                return None
+            con.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (RUNNING, worker_id, now + lease_s, row[0]),
+            )
+            con.execute("COMMIT")
+            return Job.from_json(row[1])
+        finally:
+            con.close()
+
+    def renew(self, job_id: str, worker_id: str, lease_s: float) -> None:
+        with closing(self._connect()) as con:
+            con.execute(
+                "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ? AND state = ?",
+                (time.time() + lease_s, job_id, worker_id, RUNNING),
+            )
+
+    def complete(self, job_id: str, worker_id: str) -> None:
+        # any run that wrote the shard completes the job (a slow worker whose lease
+        # was reclaimed wrote the same rows)
+        with closing(self._connect()) as con:
+            con.execute("UPDATE jobs SET state = ?, worker = ?, error = NULL WHERE job_id = ?", (DONE, worker_id, job_id))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with closing(self._connect()) as con:
+            con.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?"
+                " WHERE job_id = ? AND worker = ? AND state = ?",
+                (self.max_attempts, FAILED, PENDING, error, job_id, worker_id, RUNNING),
+            )
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        con = self._connect()
+        try:
+            rows = con.execute("SELECT job_id, state, attempts, payload, lease_until FROM jobs ORDER BY seq").fetchall()
+        finally:
+            con.close()
+        now = time.time()
+        return [
+            # an expired lease is pending again from the queue's point of view
+            {"job_id": r[0], "state": PENDING if r[1] == RUNNING and (r[4] or 0) < now else r[1],
+             "attempts": r[2], "job": Job.from_json(r[3])}
+            for r in rows
+        ]
+
+
+# Claim / fail run server-side as one step each: a worker killed between two round trips
+# must never leave a job id outside both :pending and :running (it would never be retried).
+_REDIS_CLAIM = """
+local pending, running, done, failed = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local now, deadline, worker, max_attempts, prefix = tonumber(ARGV[1]), ARGV[2], ARGV[3], tonumber(ARGV[4]), ARGV[5]
+for _, jid in ipairs(redis.call('ZRANGEBYSCORE', running, '-inf', now)) do
+  redis.call('ZREM', running, jid)
+  redis.call('RPUSH', pending, jid)
+end
+while true do
+  local jid = redis.call('RPOP', pending)
+  if not jid then return false end
+  if redis.call('SISMEMBER', done, jid) == 0 then
+    local key = prefix .. ':job:' .. jid
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= max_attempts then
+      redis.call('SADD', failed, jid)
+    else
+      redis.call('ZADD', running, deadline, jid)
+      redis.call('HINCRBY', key, 'attempts', 1)
+      redis.call('HSET', key, 'worker', worker)
+      return redis.call('HGET', key, 'payload')
+    end
+  end
+end
+"""
+
+_REDIS_FAIL = """
+if redis.call('HGET', KEYS[1], 'worker') ~= ARGV[3] then return 0 end
+redis.call('HSET', KEYS[1], 'error', ARGV[1])
+if redis.call('ZREM', KEYS[2], ARGV[2]) == 1 then
+  redis.call('RPUSH', KEYS[3], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisBroker(Broker):
+    """
+    Broker on any redis-like client (redis.Redis or a compatible stand-in) using
+    hset/hget/hgetall, sadd, lpush/rpush, zadd/zrem/zrangebyscore, smembers, lrange and
+    register_script (claim and fail are Lua scripts, hence atomic).
+    Keys: <prefix>:job:<id> (hash), :all (set), :order (list), :pending (list),
+    :running (zset scored by lease deadline), :done / :failed (sets).
+    """
+
+    def __init__(self, client: Any, prefix: str = "bt", max_attempts: int = 3):
+        self.r = client
+        self.p = prefix
+        self.max_attempts = max_attempts
+        self._claim = client.register_script(_REDIS_CLAIM)
+        self._fail = client.register_script(_REDIS_FAIL)
+
+    def _k(self, *parts: str) -> str:
+        return ":".join((self.p,) + parts)
+
+    @staticmethod
+    def _s(v: Any) -> Optional[str]:
+        return v.decode("utf-8") if isinstance(v, bytes) else v
+
+    def submit(self, jobs: Sequence[Job]) -> int:
+        n = 0
+        for j in jobs:
+            if self.r.sadd(self._k("all"), j.job_id):
+                self.r.hset(self._k("job", j.job_id), mapping={"payload": j.to_json(), "attempts": 0})
+                self.r.rpush(self._k("order"), j.job_id)
+                self.r.lpush(self._k("pending"), j.job_id)
+                n += 1
+        return n
+
+    def claim(self, worker_id: str, lease_s: float) -> Optional[Job]:
+        # requeues expired leases, skips done ids, fails exhausted ones, leases the next job
+        now = time.time()
+        payload = self._claim(
+            keys=[self._k("pending"), self._k("running"), self._k("done"), self._k("failed")],
+            args=[now, now + lease_s, worker_id, self.max_attempts, self.p],
+        )
+        return None if payload is None else Job.from_json(self._s(payload))
+
+    def renew(self, job_id: str, worker_id: str, lease_s: float) -> None:
+        if self._s(self.r.hget(self._k("job", job_id), "worker")) == worker_id:
+            self.r.zadd(self._k("running"), {job_id: time.time() + lease_s})
+
+    def complete(self, job_id: str, worker_id: str) -> None:
+        self.r.sadd(self._k("done"), job_id)
+        self.r.zrem(self._k("running"), job_id)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        # back to :pending in the same step, only by the lease holder (a stale worker whose
+        # job was claimed again must not requeue it); claim() moves it to failed once out of attempts
+        self._fail(keys=[self._k("job", job_id), self._k("running"), self._k("pending")],
+                   args=[error, job_id, worker_id])
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        done = {self._s(x) for x in self.r.smembers(self._k("done"))}
+        failed = {self._s(x) for x in self.r.smembers(self._k("failed"))}
+        now = time.time()
+        running = {self._s(x) for x in self.r.zrangebyscore(self._k("running"), now, "+inf")}
+        out = []
+        for jid in (self._s(x) for x in self.r.lrange(self._k("order"), 0, -1)):
+            h = {self._s(k): self._s(v) for k, v in self.r.hgetall(self._k("job", jid)).items()}
+            state = DONE if jid in done else FAILED if jid in failed else RUNNING if jid in running else PENDING
+            out.append({"job_id": jid, "state": state, "attempts": int(h.get("attempts", 0)),
+                        "job": Job.from_json(h["payload"])})
+        return out
+
+
+def open_broker(url: str) -> Broker:
+    """'redis://host:port/db' (needs the redis package) or a SQLite file path."""
+    if url.startswith("redis://"):
+        try:
+            import redis
+        except ImportError as e:
+            raise SystemExit("redis:// queues require the redis package (pip install redis)") from e
+        return RedisBroker(redis.Redis.from_url(url))
+    return SQLiteBroker(Path(url))
+
+
+# =======================
+# Worker / shards / reducer
+# =======================
+
+def shard_path(shard_dir: Path, job_id: str) -> Path:
+    return Path(shard_dir) / f"{job_id}.csv"
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if df.empty:
+        tmp.write_text("", encoding="utf-8")  # job without any traded (day, ticker)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)  # atomic on POSIX and Windows: readers see the whole shard or none
+
+
+def run_job(job: Job, data_root: Optional[Path] = None, on_day=None) -> pd.DataFrame:
+    cfg = cfg_from_dict(job.cfg, data_root=data_root, workers=1)
+    specs = [(job.strategy, load_strategy(job.strategy), job.params)]
+    rows: List[Dict[str, Any]] = []
+    for day_dir, day in iter_days(cfg, [cfg.data_root / name for name in job.days]):
+        rows.extend(run_multi_one_day(cfg, day_dir, specs, day))
+        if on_day is not None:
+            on_day()
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["Tag"] = job.tag
+    return df
+
+
+def run_worker(
+    broker: Broker,
+    shard_dir: Path,
+    data_root: Optional[Path] = None,
+    worker_id: Optional[str] = None,
+    lease_s: float = 600.0,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """Claims and runs jobs until the queue is empty (or `max_jobs`); returns jobs done."""
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    n = 0
+    while max_jobs is None or n < max_jobs:
+        job = broker.claim(worker_id, lease_s)
+        if job is None:
+            break
+        jid = job.job_id
+        try:
+            df = run_job(job, data_root, on_day=lambda: broker.renew(jid, worker_id, lease_s))
+            _write_atomic(df, shard_path(shard_dir, jid))
+        except Exception as e:  # noqa: BLE001 - reported to the broker, retried elsewhere
+            broker.fail(jid, worker_id, f"{type(e).__name__}: {e}")
+            print(f"⚠️ job {jid} failed: {e}")
+            continue
+        broker.complete(jid, worker_id)
+        n += 1
+    return n
+
+
+def collect_shards(broker: Broker, shard_dir: Path, tag: str) -> pd.DataFrame:
+    """All rows of phase `tag`, in (submission, day) order; raises if a job is not done."""
+    entries = [e for e in broker.jobs() if e["job"].tag == tag]
+    missing = [e["job_id"] for e in entries if e["state"] != DONE or not shard_path(shard_dir, e["job_id"]).exists()]
+    if missing:
+        raise RuntimeError(f"{len(missing)}/{len(entries)} {tag} jobs not done yet (e.g. {missing[:3]})")
+
+    entries.sort(key=lambda e: (e["job"].spec_index, e["job"].chunk))
+    parts = []
+    for e in entries:
+        path = shard_path(shard_dir, e["job_id"])
+        if path.stat().st_size > 0:
+            parts.append(pd.read_csv(path, float_precision="round_trip"))  # bit-exact PnL
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True)
+    # defensive: a day can only appear once per (strategy, params)
+    return df.drop_duplicates(subset=["Strategy", "Params", "Date", "Ticker"], keep="first").reset_index(drop=True)
+
+
+def reduce_is(broker: Broker, shard_dir: Path, results_root: Path) -> Dict[str, Dict[str, Any]]:
+    """IS shards -> grid_IS_*.csv, best_params.json, daily_pnl_IS_best.csv; returns best params."""
+    df = collect_shards(broker, shard_dir, "IS")
+    runs = split_runs(df)
+    grids: Dict[str, List[Dict[str, Any]]] = {}
+    for e in sorted((e for e in broker.jobs() if e["job"].tag == "IS"), key=lambda e: e["job"].spec_index):
+        g = grids.setdefault(e["job"].strategy, [])
+        if e["job"].params not in g:
+            g.append(e["job"].params)
+
+    best: Dict[str, Dict[str, Any]] = {}
+    for name, grid in grids.items():
+        strat_dir = Path(results_root) / name
+        strat_dir.mkdir(parents=True, exist_ok=True)
+        grid_runs = ((p, runs.get((name, params_tag(p)), pd.DataFrame())) for p in grid)
+        bp = select_best(grid_runs, strat_dir)
+        if bp is not None:
+            best[name] = bp
+    return best
+
+
+def reduce_oos(broker: Broker, shard_dir: Path, results_root: Path) -> pd.DataFrame:
+    """OOS shards -> per-strategy daily_pnl_OOS.csv / oos_matrix.csv + global files."""
+    df = collect_shards(broker, shard_dir, "OOS")
+    all_oos_rows: List[pd.DataFrame] = []
+    summary_rows: List[Dict[str, Any]] = []
+    for (name, _), oos_df in split_runs(df).items():
+        strat_dir = Path(results_root) / name
+        strat_dir.mkdir(parents=True, exist_ok=True)
+        r = report_oos(name, oos_df, strat_dir, all_oos_rows)
+        if r is not None:
+            summary_rows.append(r)
+    df_all = pd.concat(all_oos_rows, ignore_index=True) if all_oos_rows else pd.DataFrame()
+    if not df_all.empty:
+        df_all.to_csv(Path(results_root) / "ALL_strategies_daily_pnl_OOS.csv", index=False)
+    write_summary(results_root, summary_rows)
+    return df_all
+
+
+# =======================
+# CLI
+# =======================
+
+def _split_days(cfg: BacktestConfig, tag: str) -> List[Path]:
+    day_dirs = list_day_directories(cfg.data_root)
+    if cfg.max_days:
+        day_dirs = day_dirs[: cfg.max_days]
+    split = int(len(day_dirs) * cfg.is_ratio)
+    return day_dirs[:split] if tag == "IS" else day_dirs[split:]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Sharded backtest jobs: submit / worker / reduce / status.")
+    ap.add_argument("command", choices=["submit", "worker", "reduce", "status"])
+    ap.add_argument("--queue", default="Results/_queue.sqlite", help="SQLite path or redis://host:port/db")
+    ap.add_argument("--shards", type=Path, default=None, help="shard directory (default: <results>/_shards)")
+    ap.add_argument("--phase", choices=["IS", "OOS"], default="IS")
+    ap.add_argument("--config", type=Path, default=None, help="config_snapshot.json to run with")
+    ap.add_argument("--data", type=Path, default=None, help="data root on this host")
+    ap.add_argument("--results", type=Path, default=None)
+    ap.add_argument("-s", "--strategies", nargs="+", default=None)
+    ap.add_argument("-t", "--tickers", nargs="+", default=None)
+    ap.add_argument("--days-per-job", type=int, default=10)
+    ap.add_argument("--lease", type=float, default=600.0, help="seconds before an unrenewed job is retried")
+    ap.add_argument("--max-jobs", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    if args.config is not None:
+        cfg = cfg_from_dict(json.loads(args.config.read_text(encoding="utf-8")),
+                            data_root=args.data, results_root=args.results, tickers=args.tickers)
+    else:
+        cfg = BacktestConfig(data_root=args.data or Path("Data"), results_root=args.results or Path("Results"),
+                             tickers=args.tickers or [])
+    shard_dir = args.shards or cfg.results_root / "_shards"
+    broker = open_broker(args.queue)
+
+    if args.command == "submit":
+        if args.phase == "IS":
+            specs = [(name, p) for name, _, grid in strategy_specs(args.strategies) for p in grid]
+        else:
+            # best params written by `reduce --phase IS`
+            is_jobs = sorted((e["job"] for e in broker.jobs() if e["job"].tag == "IS"), key=lambda j: j.spec_index)
+            names = args.strategies or [n for n in dict.fromkeys(j.strategy for j in is_jobs)
+                                        if (cfg.results_root / n / "best_params.json").exists()]
+            specs = [(n, json.loads((cfg.results_root / n / "best_params.json").read_text(encoding="utf-8"))) for n in names]
+        jobs = make_jobs(cfg, specs, _split_days(cfg, args.phase), args.phase, args.days_per_job)
+        print(f"✅ {broker.submit(jobs)} new / {len(jobs)} {args.phase} jobs")
+    elif args.command == "worker":
+        n = run_worker(broker, shard_dir, args.data, lease_s=args.lease, max_jobs=args.max_jobs)
+        print(f"✅ worker done: {n} jobs")
+    elif args.command == "reduce":
+        if args.phase == "IS":
+            best = reduce_is(broker, shard_dir, cfg.results_root)
+            print(f"✅ best params for {len(best)} strategies -> submit --phase OOS")
+        else:
+            df_all = reduce_oos(broker, shard_dir, cfg.results_root)
+            print(f"✅ {len(df_all)} OOS rows -> {cfg.results_root}")
+    else:
+        print(broker.status())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.metrics.perf import build_oos_matrix
+
+
+ALLOCATION_METHODS = ("equal", "inverse_vol", "risk_parity", "mean_variance")
+
+
+class RollingCovariance:
+    """
+    Rolling mean/covariance of a (n_streams,) vector stream over the last `window` rows.
+    Each push is a rank-1 add (and rank-1 remove of the row leaving the window) on the
+    running sums: O(n^2) per day instead of the O(window * n^2) of np.cov.
+    Sums are kept on data shifted by the first row (less cancellation) and rebuilt
+    from the window buffer every `refresh` pushes to bound float drift.
+    """
+
+    def __init__(self, n: int, window: int, refresh: Optional[int] = None):
+        self.n = int(n)
+        self.window = max(2, int(window))
+        self.refresh = int(refresh) if refresh else 4 * self.window
+        self._buf = np.zeros((self.window, self.n))
+        self._pos = 0
+        self.count = 0
+        self._pushes = 0
+        self._shift: Optional[np.ndarray] = None
+        self._s = np.zeros(self.n)
+        self._ss = np.zeros((self.n, self.n))
+
+    def push(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float)
+        if self._shift is None:
+            self._shift = x.copy()
+        y = x - self._shift
+
+        if self.count == self.window:
+            old = self._buf[self._pos]
+            self._s -= old
+            self._ss -= np.outer(old, old)
+        else:
+            self.count += 1
+
+        self._buf[self._pos] = y
+        self._pos = (self._pos + 1) % self.window
+        self._s += y
+        self._ss += np.outer(y, y)
+
+        self._pushes += 1
+        if self._pushes % self.refresh == 0:
+            win = self._buf[: self.count]
+            self._s = win.sum(axis=0)
+            self._ss = win.T @ win
+
+    def mean(self) -> np.ndarray:
+        if self.count == 0:
+            return np.zeros(self.n)
+        return self._s / self.count + self._shift
+
+    def cov(self) -> np.ndarray:
+        m = self.count
+        if m < 2:
+            return np.zeros((self.n, self.n))
+        mu = self._s / m
+        c = (self._ss - m * np.outer(mu, mu)) / (m - 1)
+        return 0.5 * (c + c.T)
+
+
+def inverse_vol_weights(cov: np.ndarray) -> np.ndarray:
+    vol = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    inv = np.where(vol > 0, 1.0 / np.where(vol > 0, vol, 1.0), 0.0)
+    return _normalize(inv)
+
+
+def risk_parity_weights(
+    cov: np.ndarray,
+    w0: Optional[np.ndarray] = None,
+    max_iter: int = 50,
+    tol: float = 1e-10,
+) -> np.ndarray:
+    """
+    Equal risk contribution (long-only): Newton on the convex problem
+    min 1/2 w'Cw - b * sum(log w), whose solution has w_i (Cw)_i = b for every i.
+    Warm start from w0 (yesterday's weights) keeps it to a few iterations.
+    """
+    n = cov.shape[0]
+    diag = np.diag(cov).copy()
+    live = diag > 0
+    if not live.any():
+        return np.zeros(n)
+
+    # scale to unit variances: better conditioned, same ERC weights up to 1/vol
+    vol = np.sqrt(diag[live])
+    c = cov[np.ix_(live, live)] / np.outer(vol, vol)
+    k = int(live.sum())
+    b = 1.0 / k
+
+    if w0 is not None and np.all(np.asarray(w0)[live] > 0):
+        y = np.asarray(w0, dtype=float)[live] * vol
+    else:
+        y = np.full(k, 1.0 / k)
+    y *= np.sqrt(b / max(float(y @ c @ y), 1e-300))  # at the optimum y'Cy = k*b = 1
+
+    for _ in range(max_iter):
+        cy = c @ y
+        g = cy - b / y
+        h = c + np.diag(b / (y * y))
+        try:
+            dy = np.linalg.solve(h, g)
+        except np.linalg.LinAlgError:
+            break
+        # step back until w stays > 0
+        step = 1.0
+        neg = dy > 0
+        if neg.any():
+            step = min(1.0, 0.95 * float(np.min(y[neg] / dy[neg])))
+        y = y - step * dy
+        if float(g @ dy) < tol:
+            break
+
+    out = np.zeros(n)
+    out[live] = y / vol
+    return _normalize(out)
+
+
+def mean_variance_weights(
+    cov: np.ndarray,
+    mu: np.ndarray,
+    shrink: float = 0.1,
+    long_only: bool = True,
+) -> np.ndarray:
+    """Max-Sharpe direction cov^-1 mu, covariance shrunk toward its diagonal."""
+    diag = np.diag(np.diag(cov))
+    c = (1.0 - shrink) * cov + shrink * diag
+    c = c + 1e-12 * max(float(np.trace(c)) / max(len(mu), 1), 1e-12) * np.eye(len(mu))
+    try:
+        w = np.linalg.solve(c, mu)
+    except np.linalg.LinAlgError:
+        w = np.linalg.lstsq(c, mu, rcond=None)[0]
+    if long_only:
+        w = np.clip(w, 0.0, None)
+    if not np.any(w):
+        # no stream with positive expected PnL => stay on the risk-based allocation
+        return inverse_vol_weights(cov)
+    return _normalize(w)
+
+
+def _normalize(w: np.ndarray) -> np.ndarray:
+    gross = float(np.abs(w).sum())
+    return w / gross if gross > 0 else w
+
+
+def _stream_keys(df_all: pd.DataFrame, by: Sequence[str]) -> pd.Series:
+    by = list(by)
+    return df_all[by].astype(str).agg("|".join, axis=1) if len(by) > 1 else df_all[by[0]].astype(str)
+
+
+def pnl_streams(df_all: pd.DataFrame, by: Sequence[str] = ("Strategy",)) -> pd.DataFrame:
+    """(Date x stream) daily netPnL; a stream is one `by` group (e.g. Strategy, or Strategy+Ticker)."""
+    keys = _stream_keys(df_all, by)
+    wide = df_all.groupby([df_all["Date"], keys])["netPnL"].sum().unstack(fill_value=0.0)
+    wide.columns.name = None
+    return wide.sort_index()
+
+
+def allocation_weights(
+    pnl: pd.DataFrame,
+    method: str = "risk_parity",
+    window: int = 20,
+    min_periods: int = 5,
+    shrink: float = 0.1,
+    long_only: bool = True,
+) -> pd.DataFrame:
+    """
+    (Date x stream) weights used on each date, estimated on the previous `window` days
+    only (no look-ahead). Equal weights until `min_periods` days are known.
+    Weights are fractions of capital: sum(|w|) = 1.
+    """
+    if method not in ALLOCATION_METHODS:
+        raise ValueError(f"Unknown allocation method {method!r}, expected one of {ALLOCATION_METHODS}")
+
+    x = pnl.to_numpy(dtype=float)
+    n_days, n = x.shape
+    out = np.zeros((n_days, n))
+    equal = np.full(n, 1.0 / n) if n else np.zeros(0)
+
+    rc = RollingCovariance(n, window)
+    w_prev: Optional[np.ndarray] = None
+
+    for t in range(n_days):
+        if method == "equal" or rc.count < max(2, min_periods):
+            w = equal
+        else:
+            cov = rc.cov()
+            if method == "inverse_vol":
+                w = inverse_vol_weights(cov)
+            elif method == "risk_parity":
+                w = risk_parity_weights(cov, w0=w_prev)
+            else:
+                w = mean_variance_weights(cov, rc.mean(), shrink=shrink, long_only=long_only)
+            if not np.any(w):
+                w = equal
+            w_prev = w
+        out[t] = w
+        rc.push(x[t])
+
+    return pd.DataFrame(out, index=pnl.index, columns=pnl.columns)
+
+
+def allocate(
+    df_all: pd.DataFrame,
+    method: str = "risk_parity",
+    window: int = 20,
+    min_periods: int = 5,
+    by: Sequence[str] = ("Strategy",),
+    shrink: float = 0.1,
+    long_only: bool = True,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Combines the per-strategy daily PnL of ALL_strategies_daily_pnl_OOS.csv.
+    Returns (weighted rows in build_oos_matrix layout with one "Ticker" per stream, weights).
+    """
+    pnl = pnl_streams(df_all, by)
+    weights = allocation_weights(pnl, method, window, min_periods, shrink, long_only)
+
+    keys = _stream_keys(df_all, by)
+    trades = df_all.groupby([df_all["Date"], keys])["numTrade"].sum().unstack(fill_value=0)
+    trades = trades.reindex(index=pnl.index, columns=pnl.columns, fill_value=0)
+
+    w_pnl = (pnl * weights).stack()
+    rows = pd.DataFrame({
+        "Date": w_pnl.index.get_level_values(0),
+        "Ticker": w_pnl.index.get_level_values(1),
+        "netPnL": w_pnl.to_numpy(),
+        # trades of the streams actually held that day
+        "numTrade": (trades * (weights != 0)).stack().to_numpy(),
+    })
+    return rows, weights
+
+
+def allocation_matrix(
+    df_all: pd.DataFrame,
+    methods: Sequence[str] = ALLOCATION_METHODS,
+    window: int = 20,
+    min_periods: int = 5,
+    by: Sequence[str] = ("Strategy",),
+) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    One build_oos_matrix per method, stacked with a "Method" column; the combined
+    equity is the Portfolio row. Also returns the weights per method.
+    """
+    mats = []
+    all_weights: Dict[str, pd.DataFrame] = {}
+    for m in methods:
+        rows, weights = allocate(df_all, m, window, min_periods, by)
+        mat = build_oos_matrix(rows, portfolio_name="Portfolio")
+        mat.insert(0, "Method", m)
+        mats.append(mat)
+        all_weights[m] = weights
+    return pd.concat(mats, ignore_index=True), all_weights
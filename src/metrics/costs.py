@@ -0,0 +1,146 @@
+"""
+Transaction-cost sensitivity without re-simulation.
+
+Positions and SL/TP exits do not depend on bp_fee and fees are linear in it, so every engine
+row carries feeBasis = sum |pos| * (entry + exit) and netPnL(bp) = grossPnL - bp * feeBasis.
+Daily sums are aggregated once, then returns / Sharpe / MaxDD follow for a whole vector of bp
+levels in one pass (mean and variance are closed forms in bp; only the drawdown needs the path).
+
+    python -m src.metrics.costs Results/ALL_strategies_daily_pnl_OOS.csv [--max-bp 10 --step 0.25]
+writes COST_SWEEP_OOS.csv + BREAK_EVEN_OOS.csv next to the input.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+BP = 1e-4  # one basis point, in the units of BacktestConfig.bp_fee
+
+
+def bp_grid(max_bp: float = 10.0, step: float = 0.25) -> np.ndarray:
+    """Fee levels in basis points, 0 .. max_bp inclusive."""
+    return np.round(np.arange(0.0, max_bp + step / 2, step), 10)
+
+
+def _daily(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    return df.groupby(keys + ["Date"], sort=True)[["grossPnL", "feeBasis", "numTrade"]].sum()
+
+
+def _sweep_one(gross: np.ndarray, basis: np.ndarray, bps: np.ndarray, ann_factor: float) -> dict:
+    """gross / basis: (n_days,) daily sums; returns (n_bp,) metrics, same definitions as perf.py."""
+    fee = bps * BP
+    n = len(gross)
+    mu = gross.mean() - fee * basis.mean()
+    if n > 1:
+        c = np.cov(np.vstack([gross, basis]), ddof=1)
+        var = np.maximum(c[0, 0] - 2.0 * fee * c[0, 1] + fee * fee * c[1, 1], 0.0)
+    else:
+        var = np.full_like(fee, np.nan)
+    sd = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where((sd > 0) & np.isfinite(sd), mu / sd * np.sqrt(ann_factor), 0.0)
+
+    eq = np.cumsum(gross[:, None] - basis[:, None] * fee[None, :], axis=0)  # (n_days, n_bp)
+    peak = np.maximum(np.maximum.accumulate(eq, axis=0), 0.0)
+    return {
+        "Net Return Ann.": mu * ann_factor,
+        "Sharpe": sharpe,
+        "MaxDD": (eq - peak).min(axis=0),
+        "Net PnL": eq[-1],
+    }
+
+
+def cost_sweep(
+    df: pd.DataFrame,
+    bps: Optional[Sequence[float]] = None,
+    by: Sequence[str] = ("Strategy", "Params"),
+    portfolio_name: str = "Portfolio",
+    ann_factor: float = 252.0,
+) -> pd.DataFrame:
+    """
+    OOS matrix (per asset + portfolio) at every fee level: long format with a "bp" column,
+    one row per (by..., Asset, bp). The default `by` keeps each (Strategy, Params) apart,
+    so grid / panel files with several configurations are never blended.
+    At bp = 1e4 * cfg.bp_fee it matches build_oos_matrix.
+    """
+    bps = bp_grid() if bps is None else np.asarray(bps, dtype=np.float64)
+    by = [c for c in by if c in df.columns]
+    cols = by + ["Asset", "bp", "Net Return Ann.", "Sharpe", "MaxDD", "Net PnL", "Avg Daily Trades"]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+    if "feeBasis" not in df.columns:
+        raise ValueError("cost_sweep needs the feeBasis column of the engine rows")
+
+    out = []
+    groups = df.groupby(by, sort=False) if by else [((), df)]
+    for key, sub in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        per_asset = _daily(sub, ["Ticker"])
+        port = _daily(sub, [])
+        series = [(a, per_asset.xs(a, level="Ticker")) for a in sorted(sub["Ticker"].unique())]
+        series.append((portfolio_name, port))
+        for asset, d in series:
+            m = _sweep_one(d["grossPnL"].to_numpy(float), d["feeBasis"].to_numpy(float), bps, ann_factor)
+            frame = pd.DataFrame({"bp": bps, **m})
+            frame.insert(0, "Asset", asset)
+            for k, v in zip(reversed(by), reversed(key)):
+                frame.insert(0, k, v)
+            frame["Avg Daily Trades"] = float(d["numTrade"].mean())
+            out.append(frame)
+    return pd.concat(out, ignore_index=True)[cols]
+
+
+def break_even(df: pd.DataFrame, by: Sequence[str] = ("Strategy", "Params"), portfolio_name: str = "Portfolio") -> pd.DataFrame:
+    """
+    Fee level (bp) where the total net PnL is zero: sum grossPnL / sum feeBasis.
+    NaN without trades; negative when the strategy already loses before fees.
+    """
+    by = [c for c in by if c in df.columns]
+    cols = by + ["Asset", "Gross PnL", "Fee Basis", "Break-even bp"]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    per_asset = df.groupby(by + ["Ticker"], sort=False)[["grossPnL", "feeBasis"]].sum().reset_index()
+    per_asset = per_asset.rename(columns={"Ticker": "Asset"})
+    if by:
+        port = df.groupby(by, sort=False)[["grossPnL", "feeBasis"]].sum().reset_index()
+    else:
+        port = df[["grossPnL", "feeBasis"]].sum().to_frame().T
+    port["Asset"] = portfolio_name
+
+    res = pd.concat([per_asset, port], ignore_index=True)
+    if by:
+        res = res.sort_values(by, kind="stable", ignore_index=True)
+    res = res.rename(columns={"grossPnL": "Gross PnL", "feeBasis": "Fee Basis"})
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res["Break-even bp"] = np.where(res["Fee Basis"] > 0, res["Gross PnL"] / res["Fee Basis"] / BP, np.nan)
+    return res[cols]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fee sweep / break-even cost from engine daily rows (no re-run).")
+    ap.add_argument("daily_csv", type=Path, help="e.g. Results/ALL_strategies_daily_pnl_OOS.csv")
+    ap.add_argument("--max-bp", type=float, default=10.0)
+    ap.add_argument("--step", type=float, default=0.25)
+    ap.add_argument("--tag", default="OOS")
+    args = ap.parse_args(argv)
+
+    df = pd.read_csv(args.daily_csv)
+    sweep = cost_sweep(df, bp_grid(args.max_bp, args.step))
+    be = break_even(df)
+    out_dir = args.daily_csv.parent
+    sweep.to_csv(out_dir / f"COST_SWEEP_{args.tag}.csv", index=False)
+    be.to_csv(out_dir / f"BREAK_EVEN_{args.tag}.csv", index=False)
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(be[be["Asset"] == "Portfolio"])
+    print(f"✅ {out_dir / f'COST_SWEEP_{args.tag}.csv'} | {out_dir / f'BREAK_EVEN_{args.tag}.csv'}")
+
+
+if __name__ == "__main__":
+    main()
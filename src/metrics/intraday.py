@@ -0,0 +1,128 @@
+"""
+Bar-resolution risk metrics from the per-bar equity / position arrays of simulate_bars
+(cfg.bar_metrics), and their compact storage (cfg.bars_dir: one .npz per day).
+
+Per (day, ticker) row: IntradayMaxDD, TimeInMarket, Turnover and the sufficient statistics
+of the bar PnL (nBars, barPnLSum, barPnLSumSq), so the minute Sharpe of any set of rows
+is pooled exactly without reloading the arrays.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import get_profiler
+
+
+BAR_COLUMNS = ["IntradayMaxDD", "TimeInMarket", "Turnover", "nBars", "barPnLSum", "barPnLSumSq"]
+
+
+def bar_metrics(equity: np.ndarray, position: np.ndarray) -> Dict[str, float]:
+    """
+    equity[i]: net PnL marked at close i (the last one includes the EOD close and its fee);
+    position[i]: position held at close i, before acting on that close's signal.
+    """
+    eq = np.asarray(equity, dtype=np.float64)
+    pos = np.asarray(position, dtype=np.float64)
+    if len(eq) == 0:
+        return {"IntradayMaxDD": 0.0, "TimeInMarket": 0.0, "Turnover": 0.0,
+                "nBars": 0, "barPnLSum": 0.0, "barPnLSumSq": 0.0}
+
+    peak = np.maximum(np.maximum.accumulate(eq), 0.0)  # the day starts flat at 0
+    pnl = np.diff(eq, prepend=0.0)
+    return {
+        "IntradayMaxDD": float(np.min(eq - peak)),
+        "TimeInMarket": float(np.count_nonzero(pos) / len(pos)),
+        # traded units, including the EOD flattening
+        "Turnover": float(np.abs(np.diff(pos, prepend=0.0)).sum() + abs(pos[-1])),
+        "nBars": int(len(eq)),
+        "barPnLSum": float(pnl.sum()),
+        "barPnLSumSq": float(np.dot(pnl, pnl)),
+    }
+
+
+def pooled_bar_sharpe(n: np.ndarray, s: np.ndarray, ss: np.ndarray, n_days: int, days_per_year: float = 252.0) -> float:
+    """
+    Sharpe of the bar PnL pooled over rows (counts, sums, sums of squares), annualized with
+    sqrt(days_per_year * bars per day): intraday strategies hold nothing between sessions,
+    so a year only has its traded bars.
+    """
+    N = float(np.sum(n))
+    if N < 2 or n_days <= 0:
+        return 0.0
+    S, SS = float(np.sum(s)), float(np.sum(ss))
+    var = (SS - S * S / N) / (N - 1)
+    if var <= 0:
+        return 0.0
+    return (S / N) / np.sqrt(var) * np.sqrt(days_per_year * N / n_days)
+
+
+def intraday_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per asset: worst intraday drawdown, bar-weighted time in market, average daily turnover,
+    minute Sharpe. The Portfolio row keeps the additive ones (its drawdown and Sharpe need
+    the bars of all assets aligned: see load_day_bars).
+    """
+    cols = ["Asset", "Intraday MaxDD", "Time In Market", "Avg Daily Turnover", "Minute Sharpe"]
+    if df.empty or "nBars" not in df.columns:
+        return pd.DataFrame(columns=cols)
+
+    rows = []
+    for a, sub in df.groupby("Ticker", sort=True):
+        n_days = sub["Date"].nunique()
+        rows.append({
+            "Asset": a,
+            "Intraday MaxDD": float(sub["IntradayMaxDD"].min()),
+            "Time In Market": float((sub["TimeInMarket"] * sub["nBars"]).sum() / max(sub["nBars"].sum(), 1)),
+            "Avg Daily Turnover": float(sub["Turnover"].sum() / max(n_days, 1)),
+            "Minute Sharpe": pooled_bar_sharpe(sub["nBars"], sub["barPnLSum"], sub["barPnLSumSq"], n_days),
+        })
+    rows.append({
+        "Asset": "Portfolio",
+        "Intraday MaxDD": np.nan,
+        "Time In Market": float((df["TimeInMarket"] * df["nBars"]).sum() / max(df["nBars"].sum(), 1)),
+        "Avg Daily Turnover": float(df["Turnover"].sum() / max(df["Date"].nunique(), 1)),
+        "Minute Sharpe": np.nan,
+    })
+    return pd.DataFrame(rows, columns=cols)
+
+
+# =======================
+# Storage: one compressed .npz per day
+# =======================
+
+# (ticker, strategy, params) -> (UTC ns of the bars, equity, position)
+DayCurves = Dict[Tuple[str, str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+def save_day_bars(path: Path, curves: DayCurves) -> Path:
+    """
+    float32 equity / position and one int64 timestamp array per ticker.
+    The exact metrics are in the rows; the curves are for plots and portfolio aggregation.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    for (ticker, strategy, params), (ns, equity, position) in curves.items():
+        arrays.setdefault(f"ts|{ticker}", np.asarray(ns, dtype=np.int64))
+        key = f"{ticker}|{strategy}|{params}"
+        arrays[f"eq|{key}"] = np.asarray(equity, dtype=np.float32)
+        arrays[f"pos|{key}"] = np.asarray(position, dtype=np.float32)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with get_profiler().stage("bars_write"):
+        np.savez_compressed(path, **arrays)
+    return path
+
+
+def load_day_bars(path: Path) -> DayCurves:
+    out: DayCurves = {}
+    with np.load(path) as z:
+        names: List[str] = list(z.files)
+        for name in names:
+            if not name.startswith("eq|"):
+                continue
+            ticker, strategy, params = name[3:].split("|", 2)
+            out[(ticker, strategy, params)] = (z[f"ts|{ticker}"], z[name], z["pos|" + name[3:]])
+    return out
@@ -3,6 +3,9 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from src.metrics.intraday import intraday_matrix
+from src.utils.profiling import get_profiler
+
 
 def _daily_portfolio_returns(df: pd.DataFrame, portfolio_name: str = "Portfolio") -> pd.Series:
     # df has Date/Ticker/netPnL ; we build a daily portfolio return proxy
@@ -26,11 +29,12 @@ def sharpe_ratio(daily_returns: pd.Series, ann_factor: float = 252.0) -> float:
 
 
 def max_drawdown(equity: pd.Series) -> float:
+    # equity = cumulative PnL: drawdown in PnL units from a zero start
+    # (a ratio to the peak is undefined while equity is <= 0)
     if equity.empty:
         return 0.0
-    peak = equity.cummax()
-    dd = (equity / peak) - 1.0
-    return float(dd.min())
+    peak = np.maximum(equity.cummax(), 0.0)
+    return float((equity - peak).min())
 
 
 def annualized_return(daily_returns: pd.Series, ann_factor: float = 252.0) -> float:
@@ -40,6 +44,11 @@ def annualized_return(daily_returns: pd.Series, ann_factor: float = 252.0) -> fl
 
 
 def build_oos_matrix(df: pd.DataFrame, portfolio_name: str = "Portfolio") -> pd.DataFrame:
+    with get_profiler().stage("metrics"):
+        return _build_oos_matrix(df, portfolio_name)
+
+
+def _build_oos_matrix(df: pd.DataFrame, portfolio_name: str = "Portfolio") -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=["Asset", "Net Return Ann.", "Sharpe", "MaxDD", "Avg Daily Trades"])
 
@@ -71,7 +80,11 @@ def build_oos_matrix(df: pd.DataFrame, portfolio_name: str = "Portfolio") -> pd.
         "Avg Daily Trades": float(df.groupby("Date")["numTrade"].sum().mean())
     })
 
-    return pd.DataFrame(rows)
+    out = pd.DataFrame(rows)
+    if "nBars" in df.columns:
+        # bar-resolution columns (cfg.bar_metrics)
+        out = out.merge(intraday_matrix(df), on="Asset", how="left")
+    return out
 
 
 def score_is_for_selection(df_is: pd.DataFrame) -> float:
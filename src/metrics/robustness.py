@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Resamples are drawn in fixed-size chunks, each with its own child seed, so the
+# result only depends on (seed, n_samples) and not on how many processes ran it.
+_CHUNK = 1000
+
+
+def block_bootstrap_indices(rng: np.random.Generator, n_obs: int, n_samples: int, block: int) -> np.ndarray:
+    """Moving-block bootstrap: (n_samples, n_obs) day indices made of contiguous blocks."""
+    block = max(1, min(int(block), n_obs))
+    n_blocks = -(-n_obs // block)
+    starts = rng.integers(0, n_obs - block + 1, size=(n_samples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_samples, n_blocks * block)
+    return idx[:, :n_obs]
+
+
+def _path_metrics(paths: np.ndarray, ann_factor: float) -> Dict[str, np.ndarray]:
+    """
+    paths: (..., n_days, n_assets) daily PnL, NaN = asset not traded that day.
+    Returns per (..., asset) Sharpe, annualized return and max drawdown (PnL units).
+    """
+    obs = ~np.isnan(paths)
+    x = np.where(obs, paths, 0.0)
+    n = obs.sum(axis=-2)
+    mu = x.sum(axis=-2) / np.maximum(n, 1)
+    dev = np.where(obs, x - np.expand_dims(mu, -2), 0.0)
+    sd = np.sqrt(np.sum(dev * dev, axis=-2) / np.maximum(n - 1, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where((sd > 0) & (n > 1), mu / sd * np.sqrt(ann_factor), 0.0)
+
+    eq = np.cumsum(x, axis=-2)
+    peak = np.maximum(np.maximum.accumulate(eq, axis=-2), 0.0)  # equity starts at 0
+    maxdd = np.min(eq - peak, axis=-2)
+
+    return {"Sharpe": sharpe, "Net Return Ann.": mu * ann_factor, "MaxDD": maxdd}
+
+
+def _bootstrap_chunk(args: Tuple[np.ndarray, int, int, np.random.SeedSequence, bool, float]) -> Dict[str, np.ndarray]:
+    pnl, n_samples, block, seed_seq, permute, ann_factor = args
+    rng = np.random.default_rng(seed_seq)
+    n_obs = pnl.shape[0]
+
+    if permute:
+        # shuffle the day order: leaves Sharpe/return unchanged, stresses the drawdown path
+        idx = rng.permuted(np.tile(np.arange(n_obs), (n_samples, 1)), axis=1)
+    else:
+        idx = block_bootstrap_indices(rng, n_obs, n_samples, block)
+
+    return _path_metrics(pnl[idx], ann_factor)  # (n_samples, n_days, n_assets) in one batch
+
+
+def bootstrap_metrics(
+    pnl: np.ndarray,
+    n_samples: int = 10_000,
+    block: int = 5,
+    seed: int = 42,
+    permute: bool = False,
+    n_jobs: int = 1,
+    ann_factor: float = 252.0,
+    executor: Optional[Executor] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Resampled metrics for a (n_days, n_assets) daily PnL matrix.
+    The same day indices are used for every asset, so cross-asset correlation
+    (and hence the portfolio column) is preserved inside each resample.
+    Returns {metric: (n_samples, n_assets)}.
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    if pnl.ndim == 1:
+        pnl = pnl[:, None]
+
+    sizes = [_CHUNK] * (n_samples // _CHUNK)
+    if n_samples % _CHUNK:
+        sizes.append(n_samples % _CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(pnl, k, block, s, permute, ann_factor) for k, s in zip(sizes, seeds)]
+
+    if executor is not None:
+        parts = list(executor.map(_bootstrap_chunk, jobs))
+    elif n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            parts = list(ex.map(_bootstrap_chunk, jobs))
+    else:
+        parts = [_bootstrap_chunk(j) for j in jobs]
+
+    return {k: np.concatenate([p[k] for p in parts], axis=0) for k in parts[0]}
+
+
+def _pnl_matrix(df: pd.DataFrame, portfolio_name: str) -> pd.DataFrame:
+    # Date x Asset daily netPnL (NaN when an asset has no row that day) + portfolio column
+    mat = df.pivot_table(index="Date", columns="Ticker", values="netPnL", aggfunc="sum").sort_index()
+    mat = mat[sorted(mat.columns)]
+    mat[portfolio_name] = df.groupby("Date")["netPnL"].sum().sort_index()
+    return mat
+
+
+def bootstrap_oos_matrix(
+    df: pd.DataFrame,
+    n_samples: int = 10_000,
+    block: int = 5,
+    seed: int = 42,
+    alpha: float = 0.05,
+    permute: bool = False,
+    n_jobs: int = 1,
+    portfolio_name: str = "Portfolio",
+    executor: Optional[Executor] = None,
+) -> pd.DataFrame:
+    """
+    Confidence intervals around the `build_oos_matrix` point estimates
+    (one row per asset + portfolio). MaxDD is in PnL units, measured from a zero start.
+    """
+    cols = ["Asset", "Sharpe", "Sharpe CI lo", "Sharpe CI hi", "P(Sharpe>0)",
+            "Net Return Ann.", "Net Return Ann. CI lo", "Net Return Ann. CI hi",
+            "MaxDD", "MaxDD CI lo", "MaxDD CI hi"]
+    if df is None or df.empty:
+        return pd.DataFrame(columns=cols)
+
+    mat = _pnl_matrix(df, portfolio_name)
+    pnl = mat.to_numpy(dtype=float)
+
+    point = _path_metrics(pnl, 252.0)
+    boot = bootstrap_metrics(
+        pnl, n_samples=n_samples, block=block, seed=seed, permute=permute, n_jobs=n_jobs, executor=executor
+    )
+    q = [alpha / 2, 1 - alpha / 2]
+    ci = {k: np.quantile(v, q, axis=0) for k, v in boot.items()}
+
+    rows: List[Dict[str, object]] = []
+    for j, asset in enumerate(mat.columns):
+        row: Dict[str, object] = {"Asset": asset}
+        for k in ("Sharpe", "Net Return Ann.", "MaxDD"):
+            row[k] = float(point[k][j])
+            row[f"{k} CI lo"] = float(ci[k][0, j])
+            row[f"{k} CI hi"] = float(ci[k][1, j])
+        row["P(Sharpe>0)"] = float(np.mean(boot["Sharpe"][:, j] > 0))
+        rows.append(row)
+
+    return pd.DataFrame(rows)[cols]
+
+
+def bootstrap_all_strategies(
+    df_all: pd.DataFrame,
+    n_samples: int = 10_000,
+    block: int = 5,
+    seed: int = 42,
+    alpha: float = 0.05,
+    permute: bool = False,
+    n_jobs: int = 1,
+    strategy_col: str = "Strategy",
+) -> pd.DataFrame:
+    """`bootstrap_oos_matrix` for every strategy of ALL_strategies_daily_pnl_OOS.csv."""
+    out: List[pd.DataFrame] = []
+    # one pool shared by every strategy (process start-up is paid once)
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    try:
+        for k, (name, sub) in enumerate(df_all.groupby(strategy_col, sort=True)):
+            # distinct but reproducible stream per strategy
+            sub_seed = int(np.random.SeedSequence([seed, k]).generate_state(1)[0])
+            res = bootstrap_oos_matrix(sub, n_samples, block, sub_seed, alpha, permute, n_jobs, executor=executor)
+            out.append(res.assign(**{strategy_col: name}))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if not out:
+        return pd.DataFrame()
+    res = pd.concat(out, ignore_index=True)
+    return res[[strategy_col] + [c for c in res.columns if c != strategy_col]]
@@ -0,0 +1,394 @@
+"""
+Stylized facts of the minute returns over the whole of Data/, out of core.
+
+Days are streamed through the loader (load_day, prefetched) and folded into one-pass
+mergeable accumulators, so memory does not grow with the number of days and day chunks
+can run in separate processes and be merged afterwards:
+- Moments: mean / std / skewness / excess kurtosis (Chan-Pebay pairwise merge)
+- TailIndex: Hill estimator of both tails from the k+1 largest |returns|
+- Autocorr: ACF of r and |r| (volatility clustering), within-day pairs only
+- IntradayProfile: volatility by local minute of day (session seasonality)
+- CrossMoments: pairwise-complete correlation of the tickers' aligned minute returns
+
+Returns are log close-to-close within a day (no overnight return). Series are keyed by
+instrument (calendar.instrument_key), not by the file spelling of the ticker.
+
+    python -m src.metrics.stylized [-t AAPL MSFT ...] [--max-days N] [-j 4]
+writes <results>/stylized/{moments,acf,intraday_profile,correlation}.csv
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import BacktestConfig
+from src.data.calendar import SESSION_RULES, instrument_key, list_day_directories, session_kind
+from src.data.panel import align_panel
+from src.engine.backtester import DayBars, iter_days
+from src.utils.profiling import get_profiler
+
+
+def log_returns(close: np.ndarray) -> np.ndarray:
+    """Log returns along the time axis (axis 0, so (minutes, tickers) panels work too)."""
+    c = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(np.log(c), axis=0)
+
+
+# =======================
+# Accumulators
+# =======================
+
+class Moments:
+    """Count, mean and central sums M2..M4, merged pairwise (Chan / Pebay): exact in one pass."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x: np.ndarray) -> None:
+        x = x[np.isfinite(x)]
+        if len(x) == 0:
+            return
+        b = Moments()
+        b.n = len(x)
+        b.mean = float(x.mean())
+        d = x - b.mean
+        d2 = d * d
+        b.m2, b.m3, b.m4 = float(d2.sum()), float((d2 * d).sum()), float((d2 * d2).sum())
+        b.min, b.max = float(x.min()), float(x.max())
+        self.merge(b)
+
+    def merge(self, o: "Moments") -> None:
+        if o.n == 0:
+            return
+        if self.n == 0:
+            self.__dict__.update(o.__dict__)
+            return
+        na, nb = float(self.n), float(o.n)
+        n = na + nb
+        d = o.mean - self.mean
+        d2 = d * d
+        m4 = (self.m4 + o.m4 + d2 * d2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6.0 * d2 * (na * na * o.m2 + nb * nb * self.m2) / n ** 2
+              + 4.0 * d * (na * o.m3 - nb * self.m3) / n)
+        m3 = (self.m3 + o.m3 + d2 * d * na * nb * (na - nb) / n ** 2
+              + 3.0 * d * (na * o.m2 - nb * self.m2) / n)
+        m2 = self.m2 + o.m2 + d2 * na * nb / n
+        self.mean += d * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.n += o.n
+        self.min, self.max = min(self.min, o.min), max(self.max, o.max)
+
+    def result(self) -> Dict[str, float]:
+        n = self.n
+        var = self.m2 / (n - 1) if n > 1 else np.nan
+        skew = np.sqrt(n) * self.m3 / self.m2 ** 1.5 if self.m2 > 0 else np.nan
+        kurt = n * self.m4 / (self.m2 * self.m2) - 3.0 if self.m2 > 0 else np.nan
+        return {"n": n, "mean": self.mean if n else np.nan, "std": float(np.sqrt(var)),
+                "skew": float(skew), "excess_kurtosis": float(kurt),
+                "min": self.min if n else np.nan, "max": self.max if n else np.nan}
+
+
+class TailIndex:
+    """Keeps the k+1 largest gains and losses; Hill alpha = k / sum log(x_(i) / x_(k+1))."""
+
+    def __init__(self, k: int = 200):
+        self.k = int(k)
+        self.right = np.empty(0)
+        self.left = np.empty(0)
+
+    def _top(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        x = np.concatenate([a, b])
+        m = self.k + 1
+        if len(x) > m:
+            x = np.partition(x, len(x) - m)[-m:]
+        return x
+
+    def update(self, x: np.ndarray) -> None:
+        x = x[np.isfinite(x)]
+        self.right = self._top(self.right, x[x > 0])
+        self.left = self._top(self.left, -x[x < 0])
+
+    def merge(self, o: "TailIndex") -> None:
+        self.right = self._top(self.right, o.right)
+        self.left = self._top(self.left, o.left)
+
+    def _hill(self, top: np.ndarray) -> float:
+        if len(top) < self.k + 1:
+            return np.nan
+        s = np.sort(top)[::-1]
+        logs = np.log(s[: self.k] / s[self.k])
+        total = logs.sum()
+        return float(self.k / total) if total > 0 else np.nan
+
+    def result(self) -> Dict[str, float]:
+        return {"hill_left": self._hill(self.left), "hill_right": self._hill(self.right), "hill_k": self.k}
+
+
+class Autocorr:
+    """
+    Lagged co-sums of r and |r| for lags 1..max_lag over within-day pairs:
+    n, sum x_t, sum x_{t+L}, sum x_t^2, sum x_{t+L}^2, sum x_t x_{t+L} per lag (additive).
+    """
+
+    def __init__(self, max_lag: int = 20):
+        self.max_lag = int(max_lag)
+        self.sums = np.zeros((2, self.max_lag, 6))  # (r | |r|, lag, stat)
+
+    def update(self, x: np.ndarray) -> None:
+        # one day of returns: pairs never cross the overnight gap; NaN pairs are skipped
+        for s, series in enumerate((x, np.abs(x))):
+            for lag in range(1, min(self.max_lag, len(series) - 1) + 1):
+                a, b = series[:-lag], series[lag:]
+                ok = np.isfinite(a) & np.isfinite(b)
+                a, b = a[ok], b[ok]
+                self.sums[s, lag - 1] += (len(a), a.sum(), b.sum(), a @ a, b @ b, a @ b)
+
+    def merge(self, o: "Autocorr") -> None:
+        self.sums += o.sums
+
+    def result(self) -> pd.DataFrame:
+        out = {"lag": np.arange(1, self.max_lag + 1)}
+        for s, name in enumerate(("acf_r", "acf_abs_r")):
+            n, sa, sb, saa, sbb, sab = self.sums[s].T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cov = sab / n - (sa / n) * (sb / n)
+                va = saa / n - (sa / n) ** 2
+                vb = sbb / n - (sb / n) ** 2
+                out[name] = cov / np.sqrt(va * vb)
+        out["pairs"] = self.sums[0, :, 0].astype(np.int64)
+        return pd.DataFrame(out)
+
+
+class IntradayProfile:
+    """Count, sum r, sum r^2, sum |r| per local minute of day (exchange timezone of the ticker)."""
+
+    def __init__(self):
+        self.sums = np.zeros((1440, 4))
+
+    def update(self, minute_of_day: np.ndarray, x: np.ndarray) -> None:
+        ok = np.isfinite(x)
+        m, x = minute_of_day[ok], x[ok]
+        for j, v in enumerate((np.ones_like(x), x, x * x, np.abs(x))):
+            self.sums[:, j] += np.bincount(m, weights=v, minlength=1440)
+
+    def merge(self, o: "IntradayProfile") -> None:
+        self.sums += o.sums
+
+    def result(self) -> pd.DataFrame:
+        n, s, ss, sa = self.sums.T
+        keep = n > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = s / n
+            std = np.sqrt(np.maximum(ss / n - mean * mean, 0.0))
+        return pd.DataFrame({
+            "minute": np.arange(1440)[keep],
+            "time": [f"{m // 60:02d}:{m % 60:02d}" for m in np.arange(1440)[keep]],
+            "n": n[keep].astype(np.int64),
+            "mean_abs_r": (sa / np.where(keep, n, 1))[keep],
+            "std_r": std[keep],
+        })
+
+
+class CrossMoments:
+    """
+    Pairwise-complete co-moments of aligned minute returns, as (tickers x tickers) sums:
+    n_ij, sum x_i (over rows where j is valid), sum x_i^2 (idem), sum x_i x_j.
+    The universe grows with the tickers met; merge aligns by name.
+    """
+
+    def __init__(self):
+        self.tickers: List[str] = []
+        self.n = np.zeros((0, 0))
+        self.sx = np.zeros((0, 0))
+        self.sxx = np.zeros((0, 0))
+        self.sxy = np.zeros((0, 0))
+
+    def _expand(self, tickers: Sequence[str]) -> np.ndarray:
+        new = [t for t in tickers if t not in self.tickers]
+        if new:
+            m0, m = len(self.tickers), len(self.tickers) + len(new)
+            for name in ("n", "sx", "sxx", "sxy"):
+                a = np.zeros((m, m))
+                a[:m0, :m0] = getattr(self, name)
+                setattr(self, name, a)
+            self.tickers.extend(new)
+        pos = {t: i for i, t in enumerate(self.tickers)}
+        return np.array([pos[t] for t in tickers], dtype=np.int64)
+
+    def update(self, tickers: Sequence[str], r: np.ndarray, valid: np.ndarray) -> None:
+        idx = self._expand(tickers)
+        v = valid.astype(np.float64)
+        x = np.where(valid, r, 0.0)
+        ix = np.ix_(idx, idx)
+        self.n[ix] += v.T @ v
+        self.sx[ix] += x.T @ v
+        self.sxx[ix] += (x * x).T @ v
+        self.sxy[ix] += x.T @ x
+
+    def merge(self, o: "CrossMoments") -> None:
+        if not o.tickers:
+            return
+        idx = self._expand(o.tickers)
+        ix = np.ix_(idx, idx)
+        for name in ("n", "sx", "sxx", "sxy"):
+            getattr(self, name)[ix] += getattr(o, name)
+
+    def result(self) -> pd.DataFrame:
+        n = self.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx, my = self.sx / n, self.sx.T / n
+            cov = self.sxy / n - mx * my
+            vx = self.sxx / n - mx * mx
+            vy = self.sxx.T / n - my * my
+            corr = np.where(n > 1, cov / np.sqrt(vx * vy), np.nan)
+        order = np.argsort(self.tickers)
+        names = [self.tickers[i] for i in order]
+        return pd.DataFrame(corr[np.ix_(order, order)], index=names, columns=names)
+
+
+# =======================
+# Dataset walk
+# =======================
+
+class StylizedFacts:
+    """All the accumulators of a set of days, per ticker (+ the cross-ticker co-moments)."""
+
+    def __init__(self, tail_k: int = 200, max_lag: int = 20):
+        self.tail_k = tail_k
+        self.max_lag = max_lag
+        self.moments: Dict[str, Moments] = {}
+        self.tails: Dict[str, TailIndex] = {}
+        self.acf: Dict[str, Autocorr] = {}
+        self.profile: Dict[str, IntradayProfile] = {}
+        self.cross = CrossMoments()
+        self.days = 0
+
+    def _get(self, ticker: str) -> Tuple[Moments, TailIndex, Autocorr, IntradayProfile]:
+        if ticker not in self.moments:
+            self.moments[ticker] = Moments()
+            self.tails[ticker] = TailIndex(self.tail_k)
+            self.acf[ticker] = Autocorr(self.max_lag)
+            self.profile[ticker] = IntradayProfile()
+        return self.moments[ticker], self.tails[ticker], self.acf[ticker], self.profile[ticker]
+
+    def update_day(self, day: DayBars) -> None:
+        if not day:
+            return
+        bars_by_ticker = {}
+        for _, ticker, bars in day:
+            # one series per instrument across file spellings ("^GSPC" / "GSPC", "NG=F" / "NGF");
+            # a second file of the same instrument on the same day is ignored
+            key = instrument_key(ticker)
+            if len(bars) < 2 or key in bars_by_ticker:
+                continue
+            bars_by_ticker[key] = bars
+            r = log_returns(bars.close)
+            mom, tail, acf, prof = self._get(key)
+            mom.update(r)
+            tail.update(r)
+            acf.update(r)
+            local = bars.index[1:]
+            if local.tz is not None:
+                local = local.tz_convert(SESSION_RULES[session_kind(ticker)].tz)
+            prof.update((local.hour * 60 + local.minute).to_numpy(), r)
+
+        if len(bars_by_ticker) > 1:
+            panel = align_panel(bars_by_ticker)
+            valid = panel.valid[1:] & panel.valid[:-1]
+            r = log_returns(panel.close)
+            self.cross.update(panel.tickers, r, valid & np.isfinite(r))
+        self.days += 1
+
+    def merge(self, o: "StylizedFacts") -> None:
+        for t in o.moments:
+            mom, tail, acf, prof = self._get(t)
+            mom.merge(o.moments[t])
+            tail.merge(o.tails[t])
+            acf.merge(o.acf[t])
+            prof.merge(o.profile[t])
+        self.cross.merge(o.cross)
+        self.days += o.days
+
+    def report(self) -> Dict[str, pd.DataFrame]:
+        tickers = sorted(self.moments)
+        moments = pd.DataFrame([
+            {"Ticker": t, **self.moments[t].result(), **self.tails[t].result()} for t in tickers
+        ])
+        acf = pd.concat([self.acf[t].result().assign(Ticker=t) for t in tickers], ignore_index=True) if tickers else pd.DataFrame()
+        profile = pd.concat([self.profile[t].result().assign(Ticker=t) for t in tickers], ignore_index=True) if tickers else pd.DataFrame()
+        return {"moments": moments, "acf": acf, "intraday_profile": profile, "correlation": self.cross.result()}
+
+
+def _stylized_chunk(args: Tuple[BacktestConfig, List[Path], int, int]) -> StylizedFacts:
+    cfg, day_dirs, tail_k, max_lag = args
+    acc = StylizedFacts(tail_k, max_lag)
+    for _, day in iter_days(cfg, day_dirs):
+        acc.update_day(day)
+    return acc
+
+
+def stylized_facts(
+    cfg: BacktestConfig,
+    day_dirs: Sequence[Path],
+    tail_k: int = 200,
+    max_lag: int = 20,
+) -> StylizedFacts:
+    """Walks `day_dirs` (cfg.tickers / timeframe, prefetched); cfg.workers > 1 merges per-process chunks."""
+    day_dirs = list(day_dirs)
+    cfg = replace(cfg, precision="float64", bar_metrics=False, bars_dir=None)
+    with get_profiler().stage("stylized_facts"):
+        if cfg.workers <= 1 or len(day_dirs) < 2:
+            return _stylized_chunk((cfg, day_dirs, tail_k, max_lag))
+
+        n_chunks = min(len(day_dirs), cfg.workers * 4)
+        bounds = np.linspace(0, len(day_dirs), n_chunks + 1).astype(int)
+        jobs = [(cfg, day_dirs[a:b], tail_k, max_lag) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        acc = StylizedFacts(tail_k, max_lag)
+        with ProcessPoolExecutor(max_workers=cfg.workers) as ex:
+            for part in ex.map(_stylized_chunk, jobs):
+                acc.merge(part)  # in day order: deterministic
+        return acc
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Stylized facts of the minute returns over Data/ (streaming).")
+    ap.add_argument("-t", "--tickers", nargs="+", default=[])
+    ap.add_argument("--max-days", type=int, default=None)
+    ap.add_argument("-j", "--workers", type=int, default=1)
+    ap.add_argument("--timeframe", default="1m")
+    ap.add_argument("--tail-k", type=int, default=200)
+    ap.add_argument("--max-lag", type=int, default=20)
+    ap.add_argument("--data", type=Path, default=Path("Data"))
+    ap.add_argument("--results", type=Path, default=Path("Results"))
+    args = ap.parse_args(argv)
+
+    cfg = BacktestConfig(data_root=args.data, results_root=args.results, tickers=args.tickers,
+                         workers=args.workers, timeframe=args.timeframe)
+    day_dirs = list_day_directories(cfg.data_root)[: args.max_days]
+    acc = stylized_facts(cfg, day_dirs, tail_k=args.tail_k, max_lag=args.max_lag)
+
+    out_dir = cfg.results_root / "stylized"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in acc.report().items():
+        df.to_csv(out_dir / f"{name}.csv", index=(name == "correlation"))
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(acc.report()["moments"])
+    print(f"✅ {acc.days} days -> {out_dir}/")
+
+
+if __name__ == "__main__":
+    main()
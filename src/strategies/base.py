@@ -1,8 +1,36 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class BaseStrategy(ABC):
+    # set to True by strategies overriding `on_session` (the engine only builds calendars for them)
+    uses_sessions: bool = False
+
+    def on_day(self, bars) -> None:
+        """
+        Optional hook called once per (day, ticker) before the first `on_bar` with the
+        day's `Bars`: strategies with a vectorized form can compute the whole day at once.
+        """
+        return None
+
+    def on_session(self, bars, session) -> None:
+        """
+        Optional hook called once per (day, ticker) before the first `on_bar`,
+        with the day's `Bars` and its `SessionInfo` (see src.data.calendar).
+        Lets session-aware strategies precompute per-day levels in one vectorized pass.
+        """
+        return None
+
+    def on_session_bar(self, high: float, low: float, session_id: int, in_session: bool, minutes_from_start: float) -> None:
+        """
+        Live counterpart of `on_session` (src.engine.live, via SessionClock): the same
+        calendar fields one bar at a time, for every bar (also those whose `on_bar` is
+        skipped by an SL/TP exit), before that bar's `on_bar`.
+        """
+        return None
+
     @abstractmethod
     def on_bar(self, ts, open_: float, high: float, low: float, close: float) -> float:
         """
@@ -10,3 +38,30 @@ class BaseStrategy(ABC):
         -1 short, 0 flat, +1 long (or leverage allowed in vol targeting)
         """
         raise NotImplementedError
+
+
+class PanelStrategy(ABC):
+    """
+    Cross-sectional strategy over several tickers at once (see src.engine.panel).
+    Positions are vectors over `panel.tickers`, in the same units as BaseStrategy positions.
+    """
+    # True: the engine calls `positions(panel)` once per day instead of `on_bar` per minute
+    batch: bool = False
+
+    def on_day(self, panel) -> None:
+        """Optional hook called once per day before the first `on_bar`, with the aligned `Panel`."""
+        return None
+
+    def positions(self, panel) -> np.ndarray:
+        """
+        Batch mode: (minutes, tickers) desired positions, row i decided on the close of minute i
+        (it may only use rows <= i of the panel).
+        """
+        raise NotImplementedError
+
+    def on_bar(self, ts, open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """
+        Snapshot mode: (tickers,) OHLC of the minute -> desired positions AFTER its close.
+        Tickers without a bar yet are NaN.
+        """
+        raise NotImplementedError
@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import time
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from src.data.bars import index_ns
 from src.strategies.base import BaseStrategy
 
 
@@ -15,17 +16,24 @@ class ORBStrategy(BaseStrategy):
     """
     Opening Range Breakout (ORB) intraday.
 
-    - Build opening range on first `orb_minutes` bars of the session.
+    - Build opening range on first `orb_minutes` of the session.
     - After range is set:
         Long  if close > range_high * (1 + breakout_k)
         Short if close < range_low  * (1 - breakout_k)  (if allow_short)
     - Exit (flat) at end of day handled by engine (it closes remaining position).
+
+    With the engine's session calendar (`on_session`) the range and breakout levels are
+    computed for the whole day at once and `on_bar` is a lookup. A live runner feeds the
+    same calendar bar by bar (`on_session_bar`), giving the same range and decisions.
+    Without any calendar the range is built from the first `orb_minutes` bars of each day.
     """
 
     orb_minutes: int = 30
     breakout_k: float = 0.0
     allow_short: bool = True
 
+    uses_sessions = True
+
     def __post_init__(self) -> None:
         self._current_date: Optional[pd.Timestamp] = None
         self._range_high: Optional[float] = None
@@ -34,6 +42,58 @@ class ORBStrategy(BaseStrategy):
         self._range_ready: bool = False
         self._position: float = 0.0
 
+        # precomputed day (on_session)
+        self._ns: Optional[np.ndarray] = None
+        self._sid: Optional[np.ndarray] = None
+        self._phase: Optional[np.ndarray] = None
+        self._up: Optional[np.ndarray] = None
+        self._dn: Optional[np.ndarray] = None
+        self._k: int = 0
+        self._cur_sid: int = -1
+
+        # live calendar (on_session_bar): same phases as the precomputed day
+        self._live_phase: Optional[int] = None
+        self._live_sid: int = -1
+        self._live_range_sid: int = -1
+        self._live_hi: float = -np.inf
+        self._live_lo: float = np.inf
+
+    def on_session(self, bars, session) -> None:
+        mins = session.minutes_from_start
+        in_sess = session.in_session
+        building = in_sess & (mins < self.orb_minutes)
+        sid = session.session_id
+
+        # opening range per session over the range-building bars
+        new_sess = np.r_[True, sid[1:] != sid[:-1]]
+        first = np.flatnonzero(new_sess)
+        grp = np.cumsum(new_sess) - 1
+        r_hi = np.maximum.reduceat(np.where(building, bars.high, -np.inf), first)
+        r_lo = np.minimum.reduceat(np.where(building, bars.low, np.inf), first)
+
+        k = float(self.breakout_k)
+        self._up = (r_hi * (1.0 + k))[grp]
+        self._dn = (r_lo * (1.0 - k))[grp]
+        # 0 = outside official hours (hold), 1 = building the range (flat), 2 = breakout
+        trade = in_sess & (mins >= self.orb_minutes) & np.isfinite(r_hi[grp])
+        self._phase = np.where(trade, 2, np.where(building, 1, 0)).astype(np.int8)
+        self._ns = index_ns(bars.index)
+        self._sid = sid
+        self._k = 0
+        self._cur_sid = -1
+
+    def on_session_bar(self, high, low, session_id, in_session, minutes_from_start) -> None:
+        if session_id != self._live_range_sid:
+            self._live_range_sid = session_id
+            self._live_hi, self._live_lo = -np.inf, np.inf
+        building = in_session and minutes_from_start < self.orb_minutes
+        if building:
+            self._live_hi = max(self._live_hi, float(high))
+            self._live_lo = min(self._live_lo, float(low))
+        trade = in_session and minutes_from_start >= self.orb_minutes and np.isfinite(self._live_hi)
+        self._live_phase = 2 if trade else 1 if building else 0
+        self._live_sid = session_id
+
     def _reset_day(self, ts: pd.Timestamp) -> None:
         self._current_date = ts.normalize()
         self._range_high = None
@@ -43,6 +103,11 @@ class ORBStrategy(BaseStrategy):
         self._position = 0.0
 
     def on_bar(self, ts, open_, high, low, close) -> float:
+        if self._ns is not None:
+            return self._on_bar_precomputed(ts, close)
+        if self._live_phase is not None:
+            return self._on_bar_live(close)
+
         ts = pd.Timestamp(ts)
 
         # New day detection
@@ -74,6 +139,47 @@ class ORBStrategy(BaseStrategy):
         up_level = self._range_high * (1.0 + float(self.breakout_k))
         dn_level = self._range_low * (1.0 - float(self.breakout_k))
 
+        return self._breakout(close, up_level, dn_level)
+
+    def _on_bar_precomputed(self, ts, close) -> float:
+        # bars arrive in time order but the engine may skip some (SL/TP exits): advance a cursor
+        k = self._k
+        ns = ts.value
+        while self._ns[k] < ns:
+            k += 1
+        self._k = k
+
+        sid = self._sid[k]
+        if sid != self._cur_sid:
+            self._cur_sid = sid
+            self._position = 0.0
+
+        phase = self._phase[k]
+        if phase == 1:
+            # During range-building, stay flat
+            self._position = 0.0
+            return self._position
+        if phase == 0:
+            return float(self._position)
+
+        return self._breakout(close, self._up[k], self._dn[k])
+
+    def _on_bar_live(self, close) -> float:
+        # mirrors _on_bar_precomputed with the phase set by on_session_bar for this bar
+        if self._live_sid != self._cur_sid:
+            self._cur_sid = self._live_sid
+            self._position = 0.0
+
+        if self._live_phase == 1:
+            self._position = 0.0
+            return self._position
+        if self._live_phase == 0:
+            return float(self._position)
+
+        k = float(self.breakout_k)
+        return self._breakout(close, self._live_hi * (1.0 + k), self._live_lo * (1.0 - k))
+
+    def _breakout(self, close, up_level, dn_level) -> float:
         if close > up_level:
             self._position = 1.0
         elif self.allow_short and close < dn_level:
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from src.data.loader import ticker_matches
+from src.strategies.base import PanelStrategy
+
+
+class PairSpreadStrategy(PanelStrategy):
+    """
+    Spread of log prices s = log(y) - beta * log(x), beta = rolling OLS over `window` minutes:
+    z = (s - mean) / std of the window residuals,
+    short the spread if z > z_entry (-1 y, +beta * y/x units of x), long if z < -z_entry
+    exit when |z| < z_exit. Hedge units are frozen at entry.
+    Snapshot mode: O(1) per minute with running sums.
+    """
+
+    def __init__(self, y: str = "QQQ", x: str = "^GSPC", window: int = 60, z_entry: float = 2.0,
+                 z_exit: float = 0.5):
+        self.y = y
+        self.x = x
+        self.window = window
+        self.z_entry = z_entry
+        self.z_exit = z_exit
+
+        self.iy: Optional[int] = None
+        self.ix: Optional[int] = None
+        self.n_tickers = 0
+        self.base: Optional[tuple] = None  # first (y, x) prices of the day, keeps logs near 0
+        self.buf: deque = deque()
+        self.sums = np.zeros(5)  # sx, sy, sxx, sxy, syy
+        self.pos = np.zeros(0)
+
+    def on_day(self, panel) -> None:
+        self.n_tickers = len(panel.tickers)
+        self.pos = np.zeros(self.n_tickers)
+        cols = {t: k for k, t in enumerate(panel.tickers)}
+        self.iy = next((k for t, k in cols.items() if ticker_matches(self.y, t)), None)
+        self.ix = next((k for t, k in cols.items() if ticker_matches(self.x, t)), None)
+
+    def on_bar(self, ts, open_, high, low, close) -> np.ndarray:
+        if self.iy is None or self.ix is None or self.iy == self.ix:
+            return self.pos
+        py, px = float(close[self.iy]), float(close[self.ix])
+        if not (np.isfinite(py) and np.isfinite(px)):
+            return self.pos
+
+        if self.base is None:
+            self.base = (py, px)
+        ly, lx = np.log(py / self.base[0]), np.log(px / self.base[1])
+
+        obs = np.array([lx, ly, lx * lx, lx * ly, ly * ly])
+        self.buf.append(obs)
+        self.sums += obs
+        if len(self.buf) > self.window:
+            self.sums -= self.buf.popleft()
+        if len(self.buf) < self.window:
+            return self.pos
+
+        n = float(self.window)
+        sx, sy, sxx, sxy, syy = self.sums
+        vx = sxx / n - (sx / n) ** 2
+        if vx <= 0:
+            return self.pos
+        beta = (sxy / n - sx * sy / n ** 2) / vx
+        mean = (sy - beta * sx) / n
+        var = (syy - 2.0 * beta * sxy + beta * beta * sxx) / n - mean * mean
+        if var <= 0:
+            return self.pos
+        z = (ly - beta * lx - mean) / np.sqrt(var)
+
+        side = 0.0
+        if z >= self.z_entry:
+            side = -1.0
+        elif z <= -self.z_entry:
+            side = 1.0
+        elif abs(z) <= self.z_exit:
+            self.pos = np.zeros(self.n_tickers)
+            return self.pos
+
+        if side != 0.0 and np.sign(self.pos[self.iy]) != side:
+            pos = np.zeros(self.n_tickers)
+            pos[self.iy] = side
+            pos[self.ix] = -side * beta * py / px
+            self.pos = pos
+        return self.pos
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import importlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from src.strategies.base import BaseStrategy, PanelStrategy
+
+
+@dataclass(frozen=True)
+class StrategyEntry:
+    name: str
+    target: str  # "module:Class", imported only when the strategy is selected
+    grid: Tuple[Dict[str, Any], ...]
+
+
+REGISTRY: Dict[str, StrategyEntry] = {}
+# cross-sectional strategies (src.engine.panel), kept apart: they do not run in the per-ticker engine
+PANEL_REGISTRY: Dict[str, StrategyEntry] = {}
+
+
+def register(name: str, target: str, grid: Sequence[Dict[str, Any]]) -> None:
+    REGISTRY[name] = StrategyEntry(name=name, target=target, grid=tuple(grid))
+
+
+def register_panel(name: str, target: str, grid: Sequence[Dict[str, Any]]) -> None:
+    PANEL_REGISTRY[name] = StrategyEntry(name=name, target=target, grid=tuple(grid))
+
+
+def available_strategies() -> List[str]:
+    return list(REGISTRY)
+
+
+def available_panel_strategies() -> List[str]:
+    return list(PANEL_REGISTRY)
+
+
+@lru_cache(maxsize=None)
+def load_strategy(name: str) -> Type[BaseStrategy]:
+    entry = REGISTRY.get(name) or PANEL_REGISTRY.get(name)
+    if entry is None:
+        raise KeyError(f"Unknown strategy {name!r}, expected one of {available_strategies() + available_panel_strategies()}")
+    module, cls = entry.target.split(":")
+    return getattr(importlib.import_module(module), cls)
+
+
+def _specs(
+    registry: Dict[str, StrategyEntry],
+    names: Optional[Sequence[str]],
+    grids: Optional[Dict[str, List[Dict[str, Any]]]],
+) -> List[Tuple[str, Type, List[Dict[str, Any]]]]:
+    names = list(registry) if not names else list(names)
+    grids = grids or {}
+    unknown = [n for n in list(names) + list(grids) if n not in registry]
+    if unknown:
+        raise KeyError(f"Unknown strategies {unknown}, expected some of {list(registry)}")
+    return [(n, load_strategy(n), [dict(p) for p in grids.get(n, registry[n].grid)]) for n in names]
+
+
+def strategy_specs(
+    names: Optional[Sequence[str]] = None,
+    grids: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> List[Tuple[str, Type[BaseStrategy], List[Dict[str, Any]]]]:
+    """
+    (name, class, grid) for the selected strategies (all by default, registry order).
+    `grids` overrides the default grid of any strategy it names.
+    """
+    return _specs(REGISTRY, names, grids)
+
+
+def panel_strategy_specs(
+    names: Optional[Sequence[str]] = None,
+    grids: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> List[Tuple[str, Type[PanelStrategy], List[Dict[str, Any]]]]:
+    """Same as strategy_specs for the panel strategies."""
+    return _specs(PANEL_REGISTRY, names, grids)
+
+
+# =======================
+# Project strategies + default grids
+# =======================
+
+register("MA_Cross", "src.strategies.ma_cross:MACrossStrategy", [
+    {"fast": 10, "slow": 30, "allow_short": True},
+    {"fast": 20, "slow": 60, "allow_short": True},
+    {"fast": 30, "slow": 90, "allow_short": True},
+])
+register("MACD_Hist", "src.strategies.macd_hist:MACDHistStrategy", [
+    {"n_short": 12, "n_long": 26, "n_signal": 9, "allow_short": True, "min_hold": 5},
+    {"n_short": 8,  "n_long": 21, "n_signal": 5, "allow_short": True, "min_hold": 5},
+])
+register("Bollinger_MR", "src.strategies.bollinger:BollingerMRStrategy", [
+    {"window": 20, "k": 2.0, "allow_short": True},
+    {"window": 30, "k": 2.0, "allow_short": True},
+])
+register("HMA_Trend", "src.strategies.hma:HMATrendStrategy", [
+    {"period": 55, "allow_short": True},
+    {"period": 34, "allow_short": True},
+])
+register("Donchian_BO", "src.strategies.donchian:DonchianBreakoutStrategy", [
+    {"window": 20, "allow_short": True},
+    {"window": 55, "allow_short": True},
+])
+register("RMA_ZScore", "src.strategies.rma_zscore:RMAZScoreStrategy", [
+    {"window": 60, "z_entry": 1.0, "z_exit": 0.2, "allow_short": True},
+    {"window": 120, "z_entry": 1.2, "z_exit": 0.3, "allow_short": True},
+])
+register("Vol_Target", "src.strategies.vol_target:VolTargetStrategy", [
+    {"window": 60, "target_vol": 0.002, "max_leverage": 2.0, "allow_short": True},
+    {"window": 120, "target_vol": 0.0015, "max_leverage": 2.0, "allow_short": True},
+])
+register("ORB", "src.strategies.orb:ORBStrategy", [
+    {"orb_minutes": 15, "breakout_k": 0.0, "allow_short": True},
+    {"orb_minutes": 30, "breakout_k": 0.0, "allow_short": True},
+])
+register("RMA_Dist", "src.strategies.rma_dist:RMADistStrategy", [
+    {"rma_period": 60, "window": 120, "q_entry": 0.05, "q_exit": 0.1, "allow_short": True},
+    {"rma_period": 120, "window": 240, "q_entry": 0.05, "q_exit": 0.1, "allow_short": True},
+])
+
+# =======================
+# Panel strategies + default grids
+# =======================
+
+register_panel("XS_Momentum", "src.strategies.xs_momentum:CrossSectionalMomentumStrategy", [
+    {"lookback": 30, "top_k": 3, "rebalance": 15, "notional": 1.0, "allow_short": True},
+    {"lookback": 60, "top_k": 3, "rebalance": 30, "notional": 1.0, "allow_short": True},
+])
+register_panel("Pair_Spread", "src.strategies.pair_spread:PairSpreadStrategy", [
+    {"y": "QQQ", "x": "^GSPC", "window": 60, "z_entry": 2.0, "z_exit": 0.5},
+    {"y": "QQQ", "x": "^GSPC", "window": 120, "z_entry": 2.0, "z_exit": 0.5},
+])
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data.bars import index_ns
+from src.strategies.base import BaseStrategy
+from src.utils.rolling import RollingRank
+
+
+def wilder_rma(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's RMA (alpha = 1/period) seeded on the first value, same recursion as the bar path."""
+    alpha = 1.0 / period
+    out = np.empty(len(x), dtype=np.float64)
+    rma = None
+    for i, v in enumerate(np.asarray(x, dtype=np.float64).tolist()):
+        rma = v if rma is None else rma + (v - rma) * alpha
+        out[i] = rma
+    return out
+
+
+def rma_dist_positions(
+    close: np.ndarray,
+    rma_period: int,
+    window: int,
+    q_entry: float,
+    q_exit: float,
+    allow_short: bool = True,
+) -> np.ndarray:
+    """
+    Batch version of RMADistStrategy over a whole day: mid-rank of close/RMA - 1 in its last
+    `window` values via sliding_window_view, then positions held between signals (forward fill).
+    """
+    x = np.asarray(close, dtype=np.float64)
+    n = len(x)
+    pos = np.zeros(n)
+    if n < window:
+        return pos
+
+    ratio = x / wilder_rma(x, rma_period) - 1.0
+    win = sliding_window_view(ratio, window)  # row j = bars j .. j + window - 1
+    cur = ratio[window - 1:, None]
+    q = ((win < cur).sum(axis=1) + 0.5 * (win == cur).sum(axis=1)) / window
+
+    # same precedence as on_bar: long, then short, then exit band
+    event = np.full(len(q), np.nan)
+    event[np.abs(q - 0.5) <= q_exit] = 0.0
+    if allow_short:
+        event[q >= 1.0 - q_entry] = -1.0
+    event[q <= q_entry] = 1.0
+
+    last = np.maximum.accumulate(np.where(np.isnan(event), -1, np.arange(len(q))))
+    pos[window - 1:] = np.where(last >= 0, event[np.maximum(last, 0)], 0.0)
+    return pos
+
+
+class RMADistStrategy(BaseStrategy):
+    """
+    Empirical distribution of the distance to Wilder's RMA (d = close/RMA - 1):
+    rank q of the current d among its last `window` values,
+    enter long if q <= q_entry, short if q >= 1 - q_entry
+    exit when |q - 0.5| <= q_exit
+
+    In the engine the whole day is ranked at once (`on_day`, sliding windows); bar by bar
+    (live) a skiplist keeps the window sorted so each rank costs O(log window).
+    The batch path ranks every bar of the day, including the SL/TP exit bars the engine
+    does not forward to `on_bar`.
+    """
+    def __init__(
+        self,
+        rma_period: int = 60,
+        window: int = 240,
+        q_entry: float = 0.05,
+        q_exit: float = 0.1,
+        allow_short: bool = True,
+        batch: bool = True,
+    ):
+        self.rma_period = rma_period
+        self.window = window
+        self.q_entry = q_entry
+        self.q_exit = q_exit
+        self.allow_short = allow_short
+        self.batch = batch
+        self.alpha = 1.0 / rma_period
+        self.rma: Optional[float] = None
+        self.ranks = RollingRank(window)
+        self.pos = 0.0
+
+        # precomputed day (on_day)
+        self._ns: Optional[np.ndarray] = None
+        self._pos: Optional[np.ndarray] = None
+        self._k: int = 0
+
+    def on_day(self, bars) -> None:
+        if not self.batch:
+            return
+        self._ns = index_ns(bars.index)
+        self._pos = rma_dist_positions(
+            bars.close, self.rma_period, self.window, self.q_entry, self.q_exit, self.allow_short
+        )
+        self._k = 0
+
+    def on_bar(self, ts, open_, high, low, close) -> float:
+        if self._ns is not None:
+            # the engine may skip bars (SL/TP exits): advance a cursor on timestamps
+            k = self._k
+            while self._ns[k] < ts.value:
+                k += 1
+            self._k = k
+            return float(self._pos[k])
+
+        c = float(close)
+        self.rma = c if self.rma is None else self.rma + (c - self.rma) * self.alpha
+        d = c / self.rma - 1.0
+        self.ranks.push(d)
+        if not self.ranks.full:
+            return 0.0
+
+        q = self.ranks.rank(d)
+
+        if q <= self.q_entry:
+            self.pos = 1.0
+        elif q >= 1.0 - self.q_entry and self.allow_short:
+            self.pos = -1.0
+        elif abs(q - 0.5) <= self.q_exit:
+            self.pos = 0.0
+
+        return self.pos
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.strategies.base import PanelStrategy
+
+
+class CrossSectionalMomentumStrategy(PanelStrategy):
+    """
+    Ranks the tickers on their `lookback`-minute return every `rebalance` minutes:
+    long the top_k, short the bottom_k (if allow_short), `notional` per leg
+    (position = notional / close, so tickers of any price level weigh the same).
+    Positions are held between rebalances. Batch mode: one vectorized pass per day.
+    """
+    batch = True
+
+    def __init__(self, lookback: int = 30, top_k: int = 3, rebalance: int = 15, notional: float = 1.0,
+                 allow_short: bool = True):
+        self.lookback = lookback
+        self.top_k = top_k
+        self.rebalance = rebalance
+        self.notional = notional
+        self.allow_short = allow_short
+
+    def positions(self, panel) -> np.ndarray:
+        close = panel.close.astype(np.float64)
+        n, m = close.shape
+        pos = np.full((n, m), np.nan)
+        pos[: min(n, self.lookback)] = 0.0
+        if n <= self.lookback:
+            return np.nan_to_num(pos)
+
+        rows = np.arange(self.lookback, n, self.rebalance)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = close[rows] / close[rows - self.lookback] - 1.0
+
+        # ascending sort, NaN last: the valid returns of row r are order[r, :n_valid[r]]
+        order = np.argsort(ret, axis=1)
+        n_valid = np.isfinite(ret).sum(axis=1)
+        k = min(self.top_k, m)
+        ranked = n_valid >= (2 * k if self.allow_short else k)
+
+        w = np.zeros((len(rows), m))
+        r_idx = np.flatnonzero(ranked)[:, None]
+        if k > 0 and len(r_idx):
+            top = np.take_along_axis(order[r_idx[:, 0]], n_valid[r_idx] - k + np.arange(k)[None, :], axis=1)
+            w[r_idx, top] = 1.0
+            if self.allow_short:
+                w[r_idx, order[r_idx[:, 0], :k]] = -1.0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pos[rows] = np.where(w != 0.0, w * self.notional / close[rows], 0.0)
+
+        # hold between rebalances
+        filled = np.maximum.accumulate(np.where(np.isnan(pos[:, 0]), 0, np.arange(n)))
+        return pos[filled]
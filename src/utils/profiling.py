@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+_NULL_STAGE = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "Profiler", name: str):
+        self.prof = prof
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.add_time(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Profiler:
+    """
+    Lightweight stage timers + counters for a full run.
+
+    Disabled (default): `stage()` returns a shared nullcontext and `count()` returns
+    immediately, so instrumented code pays one attribute lookup per call.
+    Stages are placed around per-(day, ticker) work, never around a single bar.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.times: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+        self.t_start = time.perf_counter()
+        self._lock = threading.Lock()  # stages / counters also come from the prefetch thread
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.times[name] = self.times.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    def count(self, name: str, n: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "wall_s": time.perf_counter() - self.t_start,
+            "stages": {
+                k: {"total_s": self.times[k], "calls": self.calls[k]}
+                for k in sorted(self.times, key=self.times.get, reverse=True)
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def merge(self, snap: Dict[str, Any]) -> None:
+        # fold a snapshot coming from another process (wall time is not additive)
+        for k, v in snap.get("stages", {}).items():
+            self.add_time(k, v["total_s"], v["calls"])
+        for k, v in snap.get("counters", {}).items():
+            self.count(k, v)
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        wall = snap["wall_s"]
+        lines = [f"Profile (wall {wall:.2f}s)", f"{'stage':<28}{'total_s':>10}{'calls':>10}{'% wall':>8}"]
+        for k, v in snap["stages"].items():
+            pct = 100.0 * v["total_s"] / wall if wall > 0 else 0.0
+            lines.append(f"{k:<28}{v['total_s']:>10.3f}{v['calls']:>10d}{pct:>7.1f}%")
+        if snap["counters"]:
+            lines.append("counters:")
+            for k, v in snap["counters"].items():
+                lines.append(f"  {k:<26}{v:>14,.0f}")
+        return "\n".join(lines)
+
+    def write(self, results_root: Path) -> Path:
+        path = Path(results_root) / "profile.json"
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        return path
+
+
+_PROFILER = Profiler(enabled=False)
+
+
+def get_profiler() -> Profiler:
+    return _PROFILER
+
+
+def enable_profiling(enabled: bool = True) -> Profiler:
+    """Reset the process-wide profiler (enabled or not) and return it."""
+    global _PROFILER
+    _PROFILER = Profiler(enabled=enabled)
+    return _PROFILER
+
+
+@contextmanager
+def capture_profile(name: str, out_dir: Path, mode: Optional[str] = None) -> Iterator[None]:
+    """
+    Opt-in function-level capture around a block (e.g. one strategy):
+    - "cprofile":    writes <name>.prof + top-40 cumulative text report
+    - "pyinstrument": writes <name>.html (requires `pip install pyinstrument`)
+    - None:          no-op
+    """
+    if mode is None:
+        yield
+        return
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if mode == "cprofile":
+        pr = cProfile.Profile()
+        pr.enable()
+        try:
+            yield
+        finally:
+            pr.disable()
+            pr.dump_stats(str(out_dir / f"{name}.prof"))
+            buf = io.StringIO()
+            pstats.Stats(pr, stream=buf).sort_stats("cumulative").print_stats(40)
+            (out_dir / f"{name}.txt").write_text(buf.getvalue(), encoding="utf-8")
+        return
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler as _PyiProfiler
+        except ImportError as e:
+            raise ImportError("profile_capture='pyinstrument' requires `pip install pyinstrument`") from e
+        pr = _PyiProfiler()
+        pr.start()
+        try:
+            yield
+        finally:
+            pr.stop()
+            (out_dir / f"{name}.html").write_text(pr.output_html(), encoding="utf-8")
+        return
+
+    raise ValueError(f"unknown profile_capture={mode!r} (expected 'cprofile', 'pyinstrument' or None)")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections import deque
+import math
+import random
+from typing import List, Optional
+
+
+class IndexableSkiplist:
+    """
+    Sorted multiset with O(log n) expected insert / remove / rank / k-th element.
+    Each link stores the number of bottom-level nodes it skips, which gives positions
+    without walking the list (Pugh's skiplist with link widths).
+    """
+
+    def __init__(self, expected_size: int = 1024, seed: Optional[int] = 0):
+        self.max_levels = max(1, int(1 + math.log2(max(expected_size, 2))))
+        self.size = 0
+        # node = [value, next links per level, widths per level]
+        self.head = [float("-inf"), [None] * self.max_levels, [1] * self.max_levels]
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _level(self) -> int:
+        # geometric(1/2) height, capped
+        h = 1
+        while h < self.max_levels and self._rng.random() < 0.5:
+            h += 1
+        return h
+
+    def __getitem__(self, i: int) -> float:
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("skiplist index out of range")
+        node = self.head
+        i += 1
+        for level in reversed(range(self.max_levels)):
+            while node[1][level] is not None and node[2][level] <= i:
+                i -= node[2][level]
+                node = node[1][level]
+        return node[0]
+
+    def insert(self, value: float) -> None:
+        chain: List[list] = [None] * self.max_levels
+        steps_at_level = [0] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node[1][level] is not None and node[1][level][0] <= value:
+                steps_at_level[level] += node[2][level]
+                node = node[1][level]
+            chain[level] = node
+
+        h = self._level()
+        new = [value, [None] * h, [0] * h]
+        steps = 0
+        for level in range(h):
+            prev = chain[level]
+            new[1][level] = prev[1][level]
+            prev[1][level] = new
+            new[2][level] = prev[2][level] - steps
+            prev[2][level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(h, self.max_levels):
+            chain[level][2][level] += 1
+        self.size += 1
+
+    def remove(self, value: float) -> None:
+        chain: List[list] = [None] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node[1][level] is not None and node[1][level][0] < value:
+                node = node[1][level]
+            chain[level] = node
+
+        target = chain[0][1][0]
+        if target is None or target[0] != value:
+            raise KeyError(f"{value!r} not in skiplist")
+        for level in range(len(target[1])):
+            prev = chain[level]
+            prev[2][level] += target[2][level] - 1
+            prev[1][level] = target[1][level]
+        for level in range(len(target[1]), self.max_levels):
+            chain[level][2][level] -= 1
+        self.size -= 1
+
+    def count_less(self, value: float) -> int:
+        """Number of elements < value."""
+        node = self.head
+        pos = 0
+        for level in reversed(range(self.max_levels)):
+            while node[1][level] is not None and node[1][level][0] < value:
+                pos += node[2][level]
+                node = node[1][level]
+        return pos
+
+    def count_less_equal(self, value: float) -> int:
+        """Number of elements <= value."""
+        node = self.head
+        pos = 0
+        for level in reversed(range(self.max_levels)):
+            while node[1][level] is not None and node[1][level][0] <= value:
+                pos += node[2][level]
+                node = node[1][level]
+        return pos
+
+
+class RollingRank:
+    """
+    Last-`window` values kept sorted (skiplist) + in arrival order (deque):
+    push / mid-rank / quantile in O(log window) instead of re-sorting every bar.
+    """
+
+    def __init__(self, window: int, seed: Optional[int] = 0):
+        self.window = int(window)
+        self.values: deque = deque()
+        self.sorted = IndexableSkiplist(expected_size=self.window, seed=seed)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def push(self, x: float) -> None:
+        if len(self.values) == self.window:
+            self.sorted.remove(self.values.popleft())
+        self.values.append(x)
+        self.sorted.insert(x)
+
+    def rank(self, x: float) -> float:
+        """Mid-rank of x in the window, in [0, 1] (ties count half)."""
+        n = len(self.values)
+        if n == 0:
+            return float("nan")
+        less = self.sorted.count_less(x)
+        equal = self.sorted.count_less_equal(x) - less
+        return (less + 0.5 * equal) / n
+
+    def quantile(self, q: float) -> float:
+        """Empirical quantile (lower order statistic) of the window."""
+        n = len(self.values)
+        if n == 0:
+            return float("nan")
+        return self.sorted[min(n - 1, max(0, int(q * n)))]
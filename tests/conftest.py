@@ -0,0 +1,13 @@
+import pytest
+
+from src.engine.sharding import RedisBroker, SQLiteBroker
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def broker(request, tmp_path):
+    """Each broker implementation; Redis runs on a fakeredis stand-in (Lua scripts need lupa)."""
+    if request.param == "sqlite":
+        return SQLiteBroker(tmp_path / "queue.sqlite", max_attempts=2)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisBroker(fakeredis.FakeRedis(), prefix="test", max_attempts=2)
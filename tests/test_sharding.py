@@ -0,0 +1,69 @@
+import time
+
+from src.engine.sharding import DONE, FAILED, PENDING, RUNNING, Job
+
+
+def _jobs(n=2):
+    return [Job("MA_Cross", {"fast": 5 + k}, [f"day_{k}"], "IS", k, 0, {}) for k in range(n)]
+
+
+def _states(broker):
+    return {j["job_id"]: (j["state"], j["attempts"]) for j in broker.jobs()}
+
+
+def test_submit_is_idempotent(broker):
+    jobs = _jobs()
+    assert broker.submit(jobs) == 2
+    assert broker.submit(jobs) == 0
+    assert broker.status() == {PENDING: 2, RUNNING: 0, DONE: 0, FAILED: 0}
+
+
+def test_claim_complete_in_submission_order(broker):
+    jobs = _jobs()
+    broker.submit(jobs)
+    a = broker.claim("w1", lease_s=60)
+    b = broker.claim("w2", lease_s=60)
+    assert [a.job_id, b.job_id] == [j.job_id for j in jobs]
+    assert broker.claim("w3", lease_s=60) is None
+
+    broker.complete(a.job_id, "w1")
+    broker.complete(b.job_id, "w2")
+    assert broker.status()[DONE] == 2
+    assert broker.claim("w3", lease_s=60) is None
+
+
+def test_expired_lease_is_claimed_again(broker):
+    (job,) = _jobs(1)
+    broker.submit([job])
+    assert broker.claim("dead", lease_s=0.01).job_id == job.job_id
+    time.sleep(0.05)
+    assert _states(broker)[job.job_id] == (PENDING, 1)
+
+    again = broker.claim("w2", lease_s=60)
+    assert again.job_id == job.job_id
+    assert _states(broker)[job.job_id] == (RUNNING, 2)
+
+
+def test_fail_requeues_until_out_of_attempts(broker):
+    (job,) = _jobs(1)
+    broker.submit([job])
+    for _ in range(2):
+        assert broker.claim("w", lease_s=60).job_id == job.job_id
+        broker.fail(job.job_id, "w", "boom")
+    assert broker.claim("w", lease_s=60) is None
+    assert _states(broker)[job.job_id] == (FAILED, 2)
+
+
+def test_stale_worker_cannot_fail_a_reclaimed_job(broker):
+    (job,) = _jobs(1)
+    broker.submit([job])
+    broker.claim("slow", lease_s=0.01)
+    time.sleep(0.05)
+    broker.claim("w2", lease_s=60)
+
+    broker.fail(job.job_id, "slow", "stale")
+    assert _states(broker)[job.job_id] == (RUNNING, 2)
+    assert broker.claim("w3", lease_s=60) is None  # not requeued behind w2's back
+
+    broker.complete(job.job_id, "w2")
+    assert _states(broker)[job.job_id] == (DONE, 2)